@@ -6,12 +6,75 @@ Testet die grundlegenden Funktionen ohne kompletten Service-Start
 
 import sys
 import os
+import re
+import io
+import asyncio
+import threading
 from pathlib import Path
 
 # Projekt-Root hinzufügen
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# Temperatur-Feld in w1_slave (z.B. "... t=23125")
+_W1_TEMP_RE = re.compile(rb't=(-?\d+)')
+
+# Wiederverwendete HTTP-Session (wird erst bei Bedarf erstellt)
+_http_session = None
+
+def get_http_session():
+    """Gibt die gemeinsame requests-Session zurück (Keep-Alive zwischen Aufrufen)"""
+    global _http_session
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+    return _http_session
+
+def read_w1_temperature(sensor_id):
+    """
+    Liest einen DS18B20 direkt aus sysfs (Bytes, ohne Text-Dekodierung)
+    
+    Returns:
+        Temperatur in °C oder None bei CRC-/Lesefehler
+    """
+    fd = os.open(f"/sys/bus/w1/devices/{sensor_id}/w1_slave", os.O_RDONLY)
+    try:
+        data = os.read(fd, 128)
+    finally:
+        os.close(fd)
+    
+    if b"YES" not in data:
+        return None
+    
+    match = _W1_TEMP_RE.search(data)
+    return int(match.group(1)) / 1000.0 if match else None
+
+def query_docker_socket(path, socket_path="/var/run/docker.sock", timeout=5):
+    """
+    GET-Anfrage direkt an die Docker Engine API über den Unix-Socket
+    (erspart fork/exec des docker CLI)
+    
+    Returns:
+        Tuple (HTTP-Status, dekodierte JSON-Antwort)
+    """
+    import http.client
+    import json
+    import socket
+    
+    class UnixHTTPConnection(http.client.HTTPConnection):
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            self.sock.connect(socket_path)
+    
+    conn = UnixHTTPConnection("localhost", timeout=timeout)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
 def test_imports():
     """Testet alle wichtigen Imports"""
     print("🔍 Teste Python-Imports...")
@@ -101,15 +164,22 @@ def test_hardware():
     """Testet Hardware-Verfügbarkeit"""
     print("\n🔍 Teste Hardware...")
     
-    # 1-Wire Interface
-    w1_path = Path("/sys/bus/w1/devices")
-    if w1_path.exists():
-        sensors = list(w1_path.glob("28-*"))
+    # 1-Wire Interface (ein scandir statt exists() + glob)
+    try:
+        with os.scandir("/sys/bus/w1/devices") as entries:
+            sensors = [entry.name for entry in entries if entry.name.startswith("28-")]
         print(f"✅ 1-Wire Interface: {len(sensors)} DS18B20 Sensoren gefunden")
         
         for sensor in sensors[:3]:  # Zeige nur erste 3
-            print(f"   📡 {sensor.name}")
-    else:
+            try:
+                temp = read_w1_temperature(sensor)
+            except OSError:
+                temp = None
+            if temp is not None:
+                print(f"   📡 {sensor}: {temp:.1f}°C")
+            else:
+                print(f"   📡 {sensor}: Lesefehler")
+    except FileNotFoundError:
         print("❌ 1-Wire Interface nicht verfügbar")
     
     # GPIO für DHT22
@@ -123,11 +193,10 @@ def test_services():
     """Testet externe Services"""
     print("\n🔍 Teste Services...")
     
-    # InfluxDB
+    # InfluxDB (HEAD /ping - kein Response-Body)
     try:
-        import requests
-        response = requests.get("http://localhost:8086/health", timeout=5)
-        if response.status_code == 200:
+        response = get_http_session().head("http://localhost:8086/ping", timeout=2)
+        if response.status_code in (200, 204):
             print("✅ InfluxDB erreichbar")
         else:
             print(f"⚠️ InfluxDB antwortet mit Status {response.status_code}")
@@ -136,18 +205,17 @@ def test_services():
     except Exception as e:
         print(f"❌ InfluxDB nicht erreichbar: {e}")
     
-    # Docker Container
+    # Docker Container (via /var/run/docker.sock statt 'docker ps')
     try:
-        import subprocess
-        result = subprocess.run(['docker', 'ps'], capture_output=True, text=True)
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')
-            containers = len(lines) - 1  # Header abziehen
-            print(f"✅ Docker: {containers} Container laufen")
+        status, containers = query_docker_socket("/containers/json")
+        if status == 200:
+            print(f"✅ Docker: {len(containers)} Container laufen")
         else:
-            print("❌ Docker nicht verfügbar")
+            print(f"❌ Docker nicht verfügbar (Status {status})")
     except FileNotFoundError:
-        print("❌ Docker Command nicht gefunden")
+        print("❌ Docker-Socket nicht gefunden")
+    except PermissionError:
+        print("❌ Keine Berechtigung für Docker-Socket (Benutzer in Gruppe 'docker'?)")
     except Exception as e:
         print(f"❌ Docker-Fehler: {e}")
 
@@ -175,6 +243,32 @@ def test_minimal_run():
         print(f"❌ Minimaler Test fehlgeschlagen: {e}")
         return False
 
+class _ThreadBufferedStdout:
+    """Leitet print()-Ausgaben je Thread in einen eigenen Puffer um"""
+    
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self.target).write(text)
+    
+    def flush(self):
+        self.target.flush()
+    
+    def capture(self, func):
+        """Führt func aus und gibt (Ergebnis, Ausgabe) zurück"""
+        self._local.buffer = io.StringIO()
+        try:
+            return func(), self._local.buffer.getvalue()
+        finally:
+            self._local.buffer = None
+
+async def _run_concurrently(stdout, tests):
+    """Führt unabhängige, I/O-lastige Tests parallel in Threads aus"""
+    return await asyncio.gather(*(asyncio.to_thread(stdout.capture, test) for test in tests))
+
 def main():
     """Hauptfunktion für Service-Debug"""
     print("🔧 Heizungsüberwachung - Service Debug")
@@ -192,16 +286,28 @@ def main():
     if test_imports():
         tests_passed += 1
     
+    # Umgebung zuerst - lädt .env für den minimalen Programmlauf
     test_environment()
     tests_passed += 1
     
-    test_hardware()
-    tests_passed += 1
+    # Hardware-, Service- und Laufzeit-Test sind unabhängig und warten auf I/O
+    stdout = _ThreadBufferedStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        results = asyncio.run(_run_concurrently(
+            stdout, [test_hardware, test_services, test_minimal_run]
+        ))
+    finally:
+        sys.stdout = stdout.target
     
-    test_services()
-    tests_passed += 1
+    # Ausgaben in der ursprünglichen Reihenfolge anzeigen
+    for _, output in results:
+        print(output, end='')
+    
+    tests_passed += 2  # Hardware und Services sind rein informativ
     
-    if test_minimal_run():
+    minimal_ok, _ = results[2]
+    if minimal_ok:
         tests_passed += 1
     
     # Ergebnis
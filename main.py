@@ -7,9 +7,11 @@ Startet das kontinuierliche Monitoring-System
 import os
 import sys
 import time
+import importlib.util
 import signal
 import logging
-from datetime import datetime
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from pathlib import Path
 
@@ -17,39 +19,50 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-# Robuste Imports mit Fehlerbehandlung
-try:
-    from src.sensors.heating_sensors import HeatingSystemManager
-    HEATING_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ Heizungssensoren nicht verfügbar: {e}")
-    HEATING_AVAILABLE = False
+def module_available(*names: str) -> bool:
+    """Prüft per find_spec, ob Module importierbar sind - ohne sie auszuführen"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
 
-try:
-    from src.sensors.dht22_sensor import HeatingRoomSensor
-    DHT22_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ DHT22 Sensor nicht verfügbar: {e}")
-    DHT22_AVAILABLE = False
+# Verfügbarkeit nur prüfen - die eigentlichen Imports erfolgen erst in initialize(),
+# damit influxdb_client (urllib3, reactivex, ...) & Co. nicht beim Start geladen werden
+HEATING_AVAILABLE = module_available('src.sensors.heating_sensors', 'w1thermsensor')
+if not HEATING_AVAILABLE:
+    print("⚠️ Heizungssensoren nicht verfügbar")
 
-try:
-    from src.database.influxdb_client import HeatingInfluxDBClient
-    INFLUXDB_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ InfluxDB Client nicht verfügbar: {e}")
-    INFLUXDB_AVAILABLE = False
+# DHT22 ist optional - Modul (und damit board/adafruit_dht) erst in initialize() laden
+DHT22_AVAILABLE = module_available('src.sensors.dht22_sensor')
+if not DHT22_AVAILABLE:
+    print("⚠️ DHT22 Sensor nicht verfügbar")
 
-# Python-Bibliotheken prüfen
-try:
-    from dotenv import load_dotenv
-    DOTENV_AVAILABLE = True
-except ImportError:
-    print("⚠️ python-dotenv nicht verfügbar - verwende Umgebungsvariablen")
-    DOTENV_AVAILABLE = False
+INFLUXDB_AVAILABLE = module_available('src.database.influxdb_client', 'influxdb_client')
+if not INFLUXDB_AVAILABLE:
+    print("⚠️ InfluxDB Client nicht verfügbar")
 
 # Logging konfigurieren
 log_file = os.getenv('LOG_FILE', '/var/log/heizung-monitor.log')
 log_level = os.getenv('LOG_LEVEL', 'INFO')
+log_max_size = int(os.getenv('LOG_MAX_SIZE', 10485760))
+log_backup_count = int(os.getenv('LOG_BACKUP_COUNT', 5))
+log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def create_file_handler(path: str) -> logging.Handler:
+    """
+    Erstellt einen rotierenden File-Handler mit Pufferung
+    
+    Records werden gesammelt und erst bei vollem Puffer oder ab Level ERROR
+    geschrieben, die Log-Datei wird auf LOG_MAX_SIZE begrenzt.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=log_max_size, backupCount=log_backup_count
+    )
+    # Formatter am Ziel setzen - basicConfig formatiert nur den MemoryHandler
+    file_handler.setFormatter(logging.Formatter(log_format))
+    return logging.handlers.MemoryHandler(
+        capacity=64, flushLevel=logging.ERROR, target=file_handler
+    )
 
 # Robuste Log-Datei Konfiguration
 log_handlers = []
@@ -67,19 +80,24 @@ try:
         except PermissionError:
             log_file = 'heizung-monitor.log'  # Fallback auf lokales Log
     
-    # Teste Schreibberechtigung
-    test_file = log_file + '.test'
-    try:
-        with open(test_file, 'w') as f:
-            f.write('test')
-        os.remove(test_file)
-        # Log-Datei ist schreibbar
-        log_handlers.append(logging.FileHandler(log_file))
-    except (PermissionError, OSError):
+    # Schreibberechtigung prüfen (os.access statt Test-Datei schreiben/löschen)
+    if os.path.exists(log_file):
+        log_writable = os.access(log_file, os.W_OK)
+    else:
+        log_writable = os.access(os.path.dirname(log_file) or '.', os.W_OK)
+    
+    if log_writable:
+        try:
+            # Log-Datei ist schreibbar
+            log_handlers.append(create_file_handler(log_file))
+        except OSError:
+            log_writable = False
+    
+    if not log_writable:
         # Fallback auf lokales Log im Arbeitsverzeichnis
         local_log = 'heizung-monitor.log'
         try:
-            log_handlers.append(logging.FileHandler(local_log))
+            log_handlers.append(create_file_handler(local_log))
             print(f"⚠️ Verwende lokale Log-Datei: {local_log}")
         except Exception:
             print("⚠️ Nur Console-Logging verfügbar")
@@ -89,7 +107,7 @@ except Exception as e:
 
 logging.basicConfig(
     level=getattr(logging, log_level.upper(), logging.INFO),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=log_format,
     handlers=log_handlers
 )
 
@@ -103,11 +121,17 @@ class HeizungsMonitor:
         self.heating_manager = None
         self.room_sensor = None
         self.influx_client = None
-        self.monitoring_interval = int(os.getenv('MONITORING_INTERVAL', 30))
+        self._pool: Optional[ThreadPoolExecutor] = None
         
-        # Signal-Handler für sauberes Beenden
-        signal.signal(signal.SIGTERM, self.signal_handler)
-        signal.signal(signal.SIGINT, self.signal_handler)
+        # Wiederverwendete Puffer für die Messwerte eines Zyklus
+        self._temps_buf = {}
+        self._room_buf = None
+        
+        # Konfiguration einmalig übernehmen (nach load_dotenv in main())
+        self.monitoring_interval = int(os.getenv('MONITORING_INTERVAL', 30))
+        self.dht22_pin = int(os.getenv('DHT22_PIN', 18))
+        power_pin = os.getenv('DHT22_POWER_PIN')
+        self.dht22_power_pin = int(power_pin) if power_pin else None
     
     def signal_handler(self, signum, frame):
         """Handler für Shutdown-Signale"""
@@ -130,9 +154,20 @@ class HeizungsMonitor:
             
             # Heizungskreis-Manager
             try:
+                from src.sensors.heating_sensors import HeatingSystemManager
                 self.heating_manager = HeatingSystemManager()
                 circuit_count = self.heating_manager.get_circuit_count()
                 logger.info(f"✅ {circuit_count} Heizkreise geladen")
+                
+                # Thread-Pool für parallele Sensor-Abfragen (ein Worker je DS18B20 + Raumsensor)
+                self._pool = ThreadPoolExecutor(
+                    max_workers=2 * circuit_count + 1,
+                    thread_name_prefix='sensor'
+                )
+                self._temps_buf = {
+                    circuit.name: {'flow': None, 'return': None, 'difference': None}
+                    for circuit in self.heating_manager.heating_circuits
+                }
             except Exception as e:
                 logger.error(f"❌ Fehler beim Laden der Heizkreise: {e}")
                 return False
@@ -140,8 +175,9 @@ class HeizungsMonitor:
             # DHT22 Raumsensor (optional)
             if DHT22_AVAILABLE:
                 try:
-                    dht_pin = int(os.getenv('DHT22_PIN', 18))
-                    self.room_sensor = HeatingRoomSensor(pin=dht_pin)
+                    from src.sensors.dht22_sensor import HeatingRoomSensor, RoomConditions
+                    self.room_sensor = HeatingRoomSensor(pin=self.dht22_pin, power_pin=self.dht22_power_pin)
+                    self._room_buf = RoomConditions()
                     logger.info("✅ DHT22 Raumsensor initialisiert")
                 except Exception as e:
                     logger.warning(f"⚠️ DHT22 Sensor Fehler (wird übersprungen): {e}")
@@ -152,6 +188,7 @@ class HeizungsMonitor:
             
             # InfluxDB Client
             try:
+                from src.database.influxdb_client import HeatingInfluxDBClient
                 self.influx_client = HeatingInfluxDBClient()
                 logger.info("✅ InfluxDB-Verbindung hergestellt")
             except Exception as e:
@@ -167,85 +204,101 @@ class HeizungsMonitor:
     def run_monitoring_cycle(self):
         """Führt einen Monitoring-Zyklus aus"""
         try:
-            timestamp = datetime.utcnow()
+            # Ein Zeitstempel (ns) für alle Datenpunkte des Zyklus
+            timestamp = time.time_ns()
+            
+            # Raumsensor parallel zu den Heizkreisen abfragen
+            room_future = None
+            if self.room_sensor:
+                logger.debug("Lese Raumsensor-Daten...")
+                room_future = self._pool.submit(
+                    self.room_sensor.check_heating_room_conditions, self._room_buf
+                )
+            
+            # Alle Datenpunkte des Zyklus sammeln und gemeinsam schreiben
+            points = []
             
             # 1. Heizungskreise überwachen
             logger.debug("Lese Heizungskreis-Daten...")
             
             try:
-                all_temps = self.heating_manager.get_all_temperatures()
-                system_status = self.heating_manager.get_system_status()
+                all_temps = self.heating_manager.get_all_temperatures(
+                    executor=self._pool, out=self._temps_buf
+                )
+                system_status = self.heating_manager.get_system_status(all_temps)
                 
-                # Daten zu InfluxDB senden
+                # Kreisdaten sammeln
                 for circuit_name, temps in all_temps.items():
-                    circuit = self.heating_manager.get_circuit_by_name(circuit_name)
-                    if circuit and temps['flow'] is not None and temps['return'] is not None:
+                    if temps['flow'] is not None and temps['return'] is not None:
                         try:
-                            self.influx_client.write_circuit_data(
-                                circuit=circuit,
+                            points.extend(self.influx_client.build_heating_circuit_points(
+                                circuit_name=circuit_name,
                                 flow_temp=temps['flow'],
                                 return_temp=temps['return'],
                                 timestamp=timestamp
-                            )
+                            ))
                         except Exception as e:
-                            logger.error(f"❌ Fehler beim Schreiben der Kreisdaten {circuit_name}: {e}")
+                            logger.error("❌ Fehler beim Aufbereiten der Kreisdaten %s: %s", circuit_name, e)
                 
-                # System-Status schreiben
+                # System-Status sammeln
                 try:
-                    self.influx_client.write_system_status(
-                        total_circuits=system_status['total_circuits'],
-                        active_circuits=system_status['active_circuits'],
-                        system_efficiency=system_status['system_efficiency'],
-                        alerts=system_status['alerts'],
+                    points.extend(self.influx_client.build_system_status_points(
+                        total_circuits=system_status.total_circuits,
+                        active_circuits=system_status.active_circuits,
+                        system_efficiency=system_status.system_efficiency,
+                        alerts=system_status.alerts,
                         timestamp=timestamp
-                    )
+                    ))
                 except Exception as e:
-                    logger.error(f"❌ Fehler beim Schreiben des System-Status: {e}")
+                    logger.error("❌ Fehler beim Aufbereiten des System-Status: %s", e)
                     
             except Exception as e:
-                logger.error(f"❌ Fehler beim Lesen der Heizungskreise: {e}")
-                # Dummy-Status für Debugging
-                system_status = {
-                    'total_circuits': 0,
-                    'active_circuits': 0,
-                    'system_efficiency': 0.0,
-                    'alerts': [{'type': 'error', 'message': f'Sensor-Fehler: {e}'}]
-                }
+                logger.error("❌ Fehler beim Lesen der Heizungskreise: %s", e)
+                # Dummy-Status für Debugging (Modul ist seit initialize() bereits geladen)
+                from src.sensors.heating_sensors import SystemStatus
+                system_status = SystemStatus(
+                    system_efficiency=0.0,
+                    alerts=[{'type': 'error', 'message': f'Sensor-Fehler: {e}'}]
+                )
             
             # 2. Raumsensor überwachen (optional)
-            room_conditions = {'temperature': None, 'humidity': None, 'dew_point': None}
+            room_temp = None
             
-            if self.room_sensor:
+            if room_future is not None:
                 try:
-                    logger.debug("Lese Raumsensor-Daten...")
-                    room_conditions = self.room_sensor.check_heating_room_conditions()
+                    room_conditions = room_future.result()
+                    room_temp = room_conditions.temperature
                     
-                    if room_conditions['temperature'] is not None:
-                        self.influx_client.write_room_conditions(
-                            temperature=room_conditions['temperature'],
-                            humidity=room_conditions['humidity'],
-                            dew_point=room_conditions['dew_point'],
+                    if room_temp is not None:
+                        points.extend(self.influx_client.build_heating_room_points(
+                            sensor_name=self.room_sensor.name,
+                            temperature=room_temp,
+                            humidity=room_conditions.humidity,
+                            dew_point=room_conditions.dew_point,
                             timestamp=timestamp
-                        )
+                        ))
                 except Exception as e:
-                    logger.warning(f"⚠️ Raumsensor-Fehler (wird übersprungen): {e}")
+                    logger.warning("⚠️ Raumsensor-Fehler (wird übersprungen): %s", e)
+            
+            # 3. Ein einziger Schreibvorgang pro Zyklus
+            if points and not self.influx_client.write_batch(points):
+                logger.error("❌ Fehler beim Schreiben von %d Datenpunkten", len(points))
             
             # Status-Log
-            active_circuits = system_status.get('active_circuits', 0)
-            total_circuits = system_status.get('total_circuits', 0)
-            efficiency = system_status.get('system_efficiency', 0.0)
-            room_temp = room_conditions.get('temperature', 'N/A')
+            efficiency = system_status.system_efficiency
             
-            logger.info(f"📊 Status: {active_circuits}/{total_circuits} Kreise aktiv, "
-                       f"Effizienz: {efficiency:.1f}%, Raum: {room_temp}°C")
+            # %-Argumente: Formatierung nur, wenn INFO tatsächlich ausgegeben wird
+            logger.info("📊 Status: %d/%d Kreise aktiv, Effizienz: %.1f%%, Raum: %s°C",
+                        system_status.active_circuits, system_status.total_circuits,
+                        efficiency if efficiency is not None else 0.0,
+                        room_temp if room_temp is not None else 'N/A')
             
             # Alarme loggen
-            if system_status.get('alerts'):
-                for alert in system_status['alerts']:
-                    logger.warning(f"⚠️ {alert['type'].upper()}: {alert['message']}")
+            for alert in system_status.alerts:
+                logger.warning("⚠️ %s: %s", alert['type'].upper(), alert['message'])
             
         except Exception as e:
-            logger.error(f"❌ Kritischer Fehler im Monitoring-Zyklus: {e}")
+            logger.error("❌ Kritischer Fehler im Monitoring-Zyklus: %s", e)
             # Nicht beenden - versuche weiter
     
     def run(self):
@@ -269,8 +322,8 @@ class HeizungsMonitor:
                 if sleep_time > 0:
                     time.sleep(sleep_time)
                 else:
-                    logger.warning(f"⚠️ Monitoring-Zyklus dauerte {cycle_duration:.1f}s "
-                                 f"(länger als Intervall {self.monitoring_interval}s)")
+                    logger.warning("⚠️ Monitoring-Zyklus dauerte %.1fs (länger als Intervall %ds)",
+                                   cycle_duration, self.monitoring_interval)
         
         except KeyboardInterrupt:
             logger.info("Monitoring durch Benutzer beendet")
@@ -282,6 +335,12 @@ class HeizungsMonitor:
         """Cleanup-Ressourcen"""
         logger.info("🧹 Cleanup-Ressourcen...")
         
+        if self._pool:
+            self._pool.shutdown(wait=True)
+        
+        if self.heating_manager:
+            self.heating_manager.cleanup()
+        
         if self.room_sensor:
             self.room_sensor.cleanup()
         
@@ -290,12 +349,41 @@ class HeizungsMonitor:
         
         logger.info("✅ Heizungsüberwachung beendet")
 
+_signal_handlers_installed = False
+
+def install_signal_handlers(monitor: HeizungsMonitor) -> None:
+    """Registriert SIGTERM/SIGINT für sauberes Beenden (nur einmal pro Prozess)"""
+    global _signal_handlers_installed
+    if _signal_handlers_installed:
+        return
+    
+    signal.signal(signal.SIGTERM, monitor.signal_handler)
+    signal.signal(signal.SIGINT, monitor.signal_handler)
+    _signal_handlers_installed = True
+
+def load_environment() -> None:
+    """
+    Lädt die .env Datei über python-dotenv - aber nur, wenn das nötig ist
+    
+    Ohne .env Datei wäre load_dotenv() wirkungslos, dann entfällt der Import von
+    dotenv beim Start. Bereits gesetzte Variablen (z.B. per EnvironmentFile der
+    systemd-Unit) werden nicht überschrieben.
+    """
+    env_file = project_root / '.env'
+    if not env_file.is_file():
+        return
+    
+    # python-dotenv ist optional
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(env_file)
+    except ImportError:
+        logger.warning("⚠️ python-dotenv nicht verfügbar - verwende Umgebungsvariablen")
+
 def main():
     """Hauptfunktion"""
     try:
-        # Umgebungsvariablen laden
-        if DOTENV_AVAILABLE:
-            load_dotenv()
+        load_environment()
         
         # Grundlegende Systemprüfungen
         logger.info("🔍 Systemprüfungen...")
@@ -315,6 +403,7 @@ def main():
         
         # Monitor starten
         monitor = HeizungsMonitor()
+        install_signal_handlers(monitor)
         monitor.run()
         
     except KeyboardInterrupt:
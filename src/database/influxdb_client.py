@@ -3,39 +3,270 @@ InfluxDB Client speziell für Heizungsüberwachung
 Optimiert für Heizungskreis-Daten, Effizienz-Metriken und Grafana-Integration
 """
 
+import os
+import time
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+from operator import itemgetter
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Optional, Any, Tuple, Union
+from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client.client.write_api import WriteOptions
 from influxdb_client.client.exceptions import InfluxDBError
+from src.utils.cache import TTLCache
+
+# NumPy ist optional - nur für die Berechnung mehrerer Raumsensoren auf einmal
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Zeitstempel: datetime oder Unix-Zeit in Nanosekunden (z.B. time.time_ns())
+Timestamp = Union[datetime, int]
+
+# Datensatz für write_api: fertige Line-Protocol Zeile oder Point
+Record = Union[str, Point]
+
+# Messwerte eines Raumsensors: (Name, Temperatur, Luftfeuchtigkeit, Taupunkt)
+RoomReading = Tuple[str, Optional[float], Optional[float], Optional[float]]
+
+# Escaping für Tag-Werte im Line-Protocol (Komma, Gleichheitszeichen, Leerzeichen)
+_TAG_ESCAPE = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n'})
+
+def escape_tag(value: str) -> str:
+    """Escaped einen Tag-Wert für das InfluxDB Line-Protocol"""
+    return value.translate(_TAG_ESCAPE)
+
+# Line-Protocol Präfixe (Measurement, Tags, erstes Feld) hängen nur vom Namen ab und
+# werden je Heizkreis/Sensor einmal gebaut. Ohne "location"-Tag, wo er durch das
+# Measurement bereits feststeht - nur heating_alerts mischt System- und Raumzeilen.
+@lru_cache(maxsize=64)
+def circuit_prefixes(circuit_name: str) -> Tuple[str, str, str, str]:
+    """Präfixe für (Vorlauf, Rücklauf, Temperaturdifferenz, Effizienz-Score) eines Heizkreises"""
+    c = escape_tag(circuit_name)
+    return (
+        f'heating_temperature,circuit={c},type=flow temperature=',
+        f'heating_temperature,circuit={c},type=return temperature=',
+        f'heating_efficiency,circuit={c},metric=temperature_difference flow_temperature=',
+        f'heating_efficiency,circuit={c},metric=efficiency_score score=',
+    )
+
+@lru_cache(maxsize=64)
+def room_prefixes(sensor_name: str) -> Tuple[str, str, str]:
+    """Präfixe für (Temperatur, Luftfeuchtigkeit, Taupunkt) eines Raumsensors"""
+    c = escape_tag(sensor_name)
+    return (
+        f'room_climate,sensor={c},type=temperature value=',
+        f'room_climate,sensor={c},type=humidity value=',
+        f'room_climate,sensor={c},type=dew_point value=',
+    )
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+def field_value(value: float) -> str:
+    """
+    Formatiert einen Messwert als Float-Feld für das Line-Protocol
+    
+    Auf 0,01 gerundet (genauer messen die Sensoren nicht) in kürzester Darstellung,
+    z.B. 15.25 statt 15.250000000000002 aus einer Differenzbildung.
+    """
+    return repr(round(float(value), 2))
+
+def to_nanoseconds(timestamp: Optional[Timestamp]) -> int:
+    """Wandelt einen Zeitstempel in ns seit Epoch um (naive datetime = UTC, wie bei Point)"""
+    if timestamp is None:
+        return time.time_ns()
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return (timestamp - _EPOCH) // _ONE_MICROSECOND * 1000
+    return int(timestamp)
+
+# Effizienz-Score je Temperaturdifferenz: ab 3/5/7/10/15°C gibt es 20/40/60/80/100 Punkte
+EFFICIENCY_THRESHOLDS = (3, 5, 7, 10, 15)
+EFFICIENCY_SCORES = (0.0, 20.0, 40.0, 60.0, 80.0, 100.0)
+
+# Batching: Punkte werden gesammelt und gemeinsam (gzip) übertragen - größere
+# Batches komprimieren besser, der Flush-Intervall begrenzt die Verzögerung
+WRITE_OPTIONS = WriteOptions(
+    batch_size=1_000,
+    flush_interval=5_000,
+    jitter_interval=1_000,
+    retry_interval=5_000,
+    max_retries=3,
+    max_retry_delay=30_000,
+    exponential_base=2
+)
+
+_alert_fields = itemgetter('type', 'circuit', 'message')
+
+def alert_values(alert: Dict) -> Tuple[str, str, str]:
+    """Liefert (Typ, Heizkreis, Meldung) eines Alarms - fehlende Felder mit Standardwerten"""
+    try:
+        return _alert_fields(alert)
+    except KeyError:
+        return alert.get('type', 'unknown'), alert.get('circuit', 'system'), alert.get('message', '')
+
+def flux_string(value: str) -> str:
+    """Gibt einen Wert als Flux-String-Literal zurück (Backslash, Anführungszeichen, ${ escaped)"""
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"').replace('${', '\\${')
+    return f'"{escaped}"'
+
+def _circuit_filter(circuit_name: Optional[str]) -> str:
+    """Optionaler Flux-Filter auf einen Heizkreis"""
+    if not circuit_name:
+        return ''
+    return f'|> filter(fn: (r) => r["circuit"] == {flux_string(circuit_name)})'
+
+# Flux-Abfragen werden pro Parameter-Kombination nur einmal zusammengesetzt.
+# InfluxDB OSS 2.x unterstützt keine parametrisierten Abfragen (nur Cloud),
+# daher wird der fertige Abfragetext zwischengespeichert.
+@lru_cache(maxsize=64)
+def build_recent_temperatures_query(bucket: str, circuit_name: Optional[str], hours: int) -> str:
+    """Flux-Abfrage für die letzten Vor-/Rücklauftemperaturen"""
+    return f'''
+            from(bucket: {flux_string(bucket)})
+              |> range(start: -{int(hours)}h)
+              |> filter(fn: (r) => r["_measurement"] == "heating_temperature")
+              {_circuit_filter(circuit_name)}
+              |> sort(columns: ["_time"], desc: true)
+              |> limit(n: 1000)
+            '''
+
+@lru_cache(maxsize=64)
+def build_efficiency_trends_query(bucket: str, circuit_name: Optional[str], days: int) -> str:
+    """Flux-Abfrage für stündlich gemittelte Effizienz-Scores"""
+    return f'''
+            from(bucket: {flux_string(bucket)})
+              |> range(start: -{int(days)}d)
+              |> filter(fn: (r) => r["_measurement"] == "heating_efficiency")
+              |> filter(fn: (r) => r["metric"] == "efficiency_score")
+              {_circuit_filter(circuit_name)}
+              |> aggregateWindow(every: 1h, fn: mean, createEmpty: false)
+              |> keep(columns: ["_time", "_value", "circuit"])
+              |> sort(columns: ["_time"], desc: false)
+            '''
+
+@lru_cache(maxsize=8)
+def build_current_alerts_query(bucket: str) -> str:
+    """Flux-Abfrage für die aktiven Alarme der letzten Stunde"""
+    return f'''
+            from(bucket: {flux_string(bucket)})
+              |> range(start: -1h)
+              |> filter(fn: (r) => r["_measurement"] == "heating_alerts")
+              |> filter(fn: (r) => r["active"] == 1)
+              |> group(columns: ["type", "circuit"])
+              |> last()
+            '''
+
 class HeatingInfluxDBClient:
-    """InfluxDB Client für Heizungsüberwachung"""
+    """
+    InfluxDB Client für Heizungsüberwachung
+    
+    Pro Prozess nur eine Instanz verwenden: Batching-Writer und HTTP-Verbindungspool
+    gehören zum Client und sollen über alle Schreib-/Lesezugriffe geteilt werden.
+    """
+    
+    # Anzahl der zuletzt aufgetretenen Schreibfehler, die aufbewahrt werden
+    MAX_WRITE_ERRORS = 20
+    
+    # Unveränderter System-Status wird höchstens so oft (Sekunden) erneut geschrieben
+    STATUS_HEARTBEAT_INTERVAL = 300
     
-    def __init__(self, url: str, token: str, org: str, bucket: str):
+    # Maximale Wartezeit (Sekunden) zwischen Verbindungsversuchen nach einem Ausfall
+    MAX_RECONNECT_BACKOFF = 60
+    
+    # Offene HTTP-Verbindungen (Batching-Writer + parallele Dashboard-Abfragen)
+    CONNECTION_POOL_MAXSIZE = 16
+    
+    # Lokal vorgehaltene Temperaturwerte (reicht bei 3 Kreisen und 30 s für > 5 h)
+    RECENT_BUFFER_SIZE = 4096
+    # Abfragen bis zu diesem Zeitraum (Stunden) werden, wenn möglich, lokal beantwortet
+    RECENT_LOCAL_HOURS = 1
+    
+    # Lebensdauer zwischengespeicherter Abfrage-Ergebnisse in Sekunden
+    QUERY_CACHE_TTL = 30
+    ALERTS_CACHE_TTL = 5
+    
+    # Line-Protocol Vorlagen ohne Kreis-/Sensorbezug (t = Zeitstempel in ns); die
+    # Präfixe je Heizkreis/Sensor liefern circuit_prefixes() und room_prefixes()
+    _CONDENSATION_TMPL = ('heating_alerts,location=heating_room,type=condensation_risk '
+                          'dew_point={dew},estimated_pipe_temp={pipe},risk_percentage={v} {t}')
+    _STATUS_TMPL = ('heating_system_status,system=main '
+                    'active_circuits={active}i,inactive_circuits={inactive}i,total_circuits={total}i{eff} {t}')
+    _NO_ALERT_TMPL = 'heating_alerts,location=heating_system,type=status active=0i,message="System läuft normal" {t}'
+    
+    def __init__(self, url: Optional[str] = None, token: Optional[str] = None,
+                 org: Optional[str] = None, bucket: Optional[str] = None):
         """
         Initialisiert den InfluxDB Client für Heizungsdaten
         
         Args:
-            url: InfluxDB Server URL
-            token: Authentifizierung Token
-            org: Organisation
-            bucket: Bucket für Heizungsdaten
-        """
-        self.url = url
-        self.token = token
-        self.org = org
-        self.bucket = bucket
+            url: InfluxDB Server URL (Standard: INFLUXDB_URL)
+            token: Authentifizierung Token (Standard: INFLUXDB_TOKEN)
+            org: Organisation (Standard: INFLUXDB_ORG)
+            bucket: Bucket für Heizungsdaten (Standard: INFLUXDB_BUCKET)
+        """
+        self.url = url or os.getenv('INFLUXDB_URL', 'http://localhost:8086')
+        self.token = token or os.getenv('INFLUXDB_TOKEN', 'heizung-monitoring-token-2024')
+        self.org = org or os.getenv('INFLUXDB_ORG', 'heizung-monitoring')
+        self.bucket = bucket or os.getenv('INFLUXDB_BUCKET', 'heizung-daten')
         self.client: Optional[InfluxDBClient] = None
         self.write_api = None
         self.query_api = None
+        # Asynchrone Schreibfehler aus dem Batching-Thread: (Zeitpunkt, Fehlermeldung)
+        self.write_errors: Deque[Tuple[datetime, str]] = deque(maxlen=self.MAX_WRITE_ERRORS)
+        # Abfrage-Ergebnisse je (Methode, Heizkreis, Zeitraum) - Dashboards fragen oft identisch ab
+        self._query_cache = TTLCache(maxsize=128, ttl=self.QUERY_CACHE_TTL)
+        # Zuletzt geschriebener System-Status (Schlüssel, monotonic-Zeitpunkt)
+        self._last_status: Optional[Tuple] = None
+        self._last_status_time = 0.0
+        # Zuletzt geschriebene Temperaturen: (Zeitstempel ns, Heizkreis, Typ, Wert)
+        self._recent: Deque[Tuple[int, str, str, float]] = deque(maxlen=self.RECENT_BUFFER_SIZE)
+        # Zeitstempel (ns) des ersten erfolgreich geschriebenen Werts - None: Puffer deckt nichts ab
+        self._recent_since: Optional[int] = None
+        # Von den build_*_points Methoden vorgemerkt, übernommen erst nach erfolgreichem write_batch
+        self._pending_recent: List[Tuple[int, str, str, float]] = []
+        self._pending_status: Optional[Tuple[Tuple, float]] = None
+        # Wiederverbinden mit exponentiellem Backoff statt dauerhaft ohne Client
+        self._next_reconnect = 0.0
+        self._reconnect_backoff = 1
+        
+        self._ensure_connected()
+    
+    def _ensure_connected(self) -> bool:
+        """
+        Stellt sicher, dass eine Verbindung besteht - baut sie bei Bedarf neu auf
+        
+        Nach einem Fehlschlag wird erst nach 1, 2, 4, ... (max. MAX_RECONNECT_BACKOFF)
+        Sekunden erneut versucht; dazwischen kehrt der Aufruf sofort zurück.
+        
+        Returns:
+            True wenn ein Client verfügbar ist
+        """
+        if self.client is not None:
+            return True
+        
+        now = time.monotonic()
+        if now < self._next_reconnect:
+            return False
         
-        self._connect()
+        if self._connect():
+            self._reconnect_backoff = 1
+            return True
+        
+        self._next_reconnect = now + self._reconnect_backoff
+        self._reconnect_backoff = min(self._reconnect_backoff * 2, self.MAX_RECONNECT_BACKOFF)
+        return False
     
-    def _connect(self) -> None:
+    def _connect(self) -> bool:
         """Stellt Verbindung zur InfluxDB her"""
         try:
             self.client = InfluxDBClient(
@@ -43,26 +274,74 @@ class HeatingInfluxDBClient:
                 token=self.token,
                 org=self.org,
                 timeout=15000,
-                enable_gzip=True
+                # gzip für Schreib- (Content-Encoding) und Abfrage-Antworten (Accept-Encoding)
+                enable_gzip=True,
+                connection_pool_maxsize=self.CONNECTION_POOL_MAXSIZE
             )
             
-            self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+            self.write_api = self.client.write_api(
+                write_options=WRITE_OPTIONS,
+                success_callback=self._on_write_success,
+                error_callback=self._on_write_error,
+                retry_callback=self._on_write_retry
+            )
             self.query_api = self.client.query_api()
             
             if self.test_connection():
                 logger.info(f"InfluxDB Verbindung erfolgreich: {self.url}")
+                return True
             else:
                 raise ConnectionError("InfluxDB Verbindungstest fehlgeschlagen")
                 
         except Exception as e:
             logger.error(f"InfluxDB Verbindungsfehler: {e}")
-            self.client = None
+            self._disconnect()
+            return False
+    
+    def _disconnect(self) -> None:
+        """Verwirft Client und APIs nach einem fehlgeschlagenen Verbindungsaufbau"""
+        for resource in (self.write_api, self.client):
+            if resource is not None:
+                try:
+                    resource.close()
+                except Exception:
+                    pass
+        
+        self.client = None
+        self.write_api = None
+        self.query_api = None
+    
+    def _on_write_success(self, conf: Tuple[str, str, str], data: Union[str, bytes]) -> None:
+        """Callback des Batching-Writers nach erfolgreicher Übertragung"""
+        logger.debug(f"Batch geschrieben: {len(data.splitlines())} Zeilen nach {conf[0]}")
+    
+    def _on_write_error(self, conf: Tuple[str, str, str], data: Union[str, bytes],
+                        exception: InfluxDBError) -> None:
+        """Callback des Batching-Writers, wenn ein Batch endgültig verworfen wurde"""
+        logger.error(f"Fehler beim Schreiben der Datenpunkte: {exception}")
+        self.write_errors.append((datetime.now(timezone.utc), str(exception)))
+        # Verworfene Punkte fehlen in der Datenbank - lokalen Puffer und Status-Deduplizierung
+        # nicht mehr als vollständig betrachten
+        self._recent.clear()
+        self._recent_since = None
+        self._last_status = None
+    
+    def _on_write_retry(self, conf: Tuple[str, str, str], data: Union[str, bytes],
+                        exception: InfluxDBError) -> None:
+        """Callback des Batching-Writers vor einem erneuten Schreibversuch"""
+        logger.warning(f"Schreiben fehlgeschlagen, neuer Versuch folgt: {exception}")
     
     def test_connection(self) -> bool:
         """Testet die InfluxDB Verbindung"""
         if not self.client:
             return False
         
+        # Schreibfehler kommen asynchron - hier sichtbar machen
+        if self.write_errors:
+            last_time, last_error = self.write_errors[-1]
+            logger.warning(f"{len(self.write_errors)} Schreibfehler seit Start, "
+                           f"zuletzt {last_time.isoformat()}: {last_error}")
+        
         try:
             health = self.client.health()
             return health.status == "pass"
@@ -70,8 +349,98 @@ class HeatingInfluxDBClient:
             logger.error(f"InfluxDB Verbindungstest fehlgeschlagen: {e}")
             return False
     
+    def write_batch(self, points: List[Record]) -> bool:
+        """
+        Übergibt mehrere Datenpunkte an den Batching-Writer
+        
+        Die Punkte werden im Hintergrund gesammelt und gemeinsam übertragen;
+        Übertragungsfehler landen über den Error-Callback in write_errors.
+        
+        Args:
+            points: Line-Protocol Zeilen oder Points (z.B. aus den build_*_points Methoden)
+            
+        Returns:
+            True wenn die Punkte eingereiht wurden
+        """
+        if not points or not self._ensure_connected():
+            self._discard_pending()
+            return False
+        
+        try:
+            self.write_api.write(bucket=self.bucket, record=points, write_precision=WritePrecision.NS)
+            logger.debug(f"{len(points)} Datenpunkte eingereiht")
+            self._commit_pending()
+            return True
+        except Exception as e:
+            logger.error(f"Fehler beim Schreiben der Datenpunkte: {e}")
+        
+        self._discard_pending()
+        return False
+    
+    def _commit_pending(self) -> None:
+        """Übernimmt vorgemerkte Temperaturen und System-Status nach erfolgreichem Schreiben"""
+        if self._pending_recent:
+            if self._recent_since is None:
+                self._recent_since = self._pending_recent[0][0]
+            self._recent.extend(self._pending_recent)
+        
+        if self._pending_status is not None:
+            self._last_status, self._last_status_time = self._pending_status
+        
+        self._discard_pending()
+    
+    def _discard_pending(self) -> None:
+        """Verwirft Vormerkungen, deren Punkte nicht geschrieben wurden"""
+        self._pending_recent = []
+        self._pending_status = None
+    
+    def build_heating_circuit_points(self, circuit_name: str, flow_temp: float,
+                                     return_temp: float, timestamp: Optional[Timestamp] = None) -> List[Record]:
+        """
+        Erstellt die Datenpunkte für Heizkreis-Temperaturdaten ohne sie zu schreiben
+        
+        Args:
+            circuit_name: Name des Heizkreises
+            flow_temp: Vorlauftemperatur
+            return_temp: Rücklauftemperatur
+            timestamp: Zeitstempel (datetime oder ns seit Epoch)
+            
+        Returns:
+            Liste von Line-Protocol Zeilen
+        """
+        t = to_nanoseconds(timestamp)
+        flow_prefix, return_prefix, diff_prefix, score_prefix = circuit_prefixes(circuit_name)
+        
+        points = []
+        
+        # Vorlauftemperatur
+        if flow_temp is not None:
+            flow_value = field_value(flow_temp)
+            points.append(f'{flow_prefix}{flow_value} {t}')
+            self._pending_recent.append((t, circuit_name, 'flow', float(flow_value)))
+        
+        # Rücklauftemperatur
+        if return_temp is not None:
+            return_value = field_value(return_temp)
+            points.append(f'{return_prefix}{return_value} {t}')
+            self._pending_recent.append((t, circuit_name, 'return', float(return_value)))
+        
+        # Temperaturdifferenz berechnen und schreiben
+        if flow_temp is not None and return_temp is not None:
+            diff = float(flow_temp - return_temp)
+            diff_value = field_value(diff)
+            points.append(f'{diff_prefix}{flow_value},return_temperature={return_value},'
+                          f'value={diff_value} {t}')
+            
+            # Effizienz-Rating
+            efficiency_rating = self._calculate_efficiency_score(diff)
+            points.append(f'{score_prefix}{field_value(efficiency_rating)},'
+                          f'temperature_difference={diff_value} {t}')
+        
+        return points
+    
     def write_heating_circuit_data(self, circuit_name: str, flow_temp: float, 
-                                  return_temp: float, timestamp: Optional[datetime] = None) -> bool:
+                                  return_temp: float, timestamp: Optional[Timestamp] = None) -> bool:
         """
         Schreibt Heizkreis-Temperaturdaten
         
@@ -79,66 +448,18 @@ class HeatingInfluxDBClient:
             circuit_name: Name des Heizkreises
             flow_temp: Vorlauftemperatur
             return_temp: Rücklauftemperatur
-            timestamp: Zeitstempel
+            timestamp: Zeitstempel (datetime oder ns seit Epoch)
             
         Returns:
             True bei Erfolg
         """
-        if not self.write_api:
+        if not self._ensure_connected():
             return False
         
-        if timestamp is None:
-            timestamp = datetime.utcnow()
-        
         try:
-            points = []
-            
-            # Vorlauftemperatur
-            if flow_temp is not None:
-                flow_point = Point("heating_temperature") \
-                    .tag("circuit", circuit_name) \
-                    .tag("type", "flow") \
-                    .tag("location", "heating_system") \
-                    .field("temperature", float(flow_temp)) \
-                    .time(timestamp)
-                points.append(flow_point)
-            
-            # Rücklauftemperatur
-            if return_temp is not None:
-                return_point = Point("heating_temperature") \
-                    .tag("circuit", circuit_name) \
-                    .tag("type", "return") \
-                    .tag("location", "heating_system") \
-                    .field("temperature", float(return_temp)) \
-                    .time(timestamp)
-                points.append(return_point)
-            
-            # Temperaturdifferenz berechnen und schreiben
-            if flow_temp is not None and return_temp is not None:
-                diff = flow_temp - return_temp
-                diff_point = Point("heating_efficiency") \
-                    .tag("circuit", circuit_name) \
-                    .tag("metric", "temperature_difference") \
-                    .tag("location", "heating_system") \
-                    .field("value", float(diff)) \
-                    .field("flow_temperature", float(flow_temp)) \
-                    .field("return_temperature", float(return_temp)) \
-                    .time(timestamp)
-                points.append(diff_point)
-                
-                # Effizienz-Rating
-                efficiency_rating = self._calculate_efficiency_score(diff)
-                rating_point = Point("heating_efficiency") \
-                    .tag("circuit", circuit_name) \
-                    .tag("metric", "efficiency_score") \
-                    .tag("location", "heating_system") \
-                    .field("score", float(efficiency_rating)) \
-                    .field("temperature_difference", float(diff)) \
-                    .time(timestamp)
-                points.append(rating_point)
-            
-            if points:
-                self.write_api.write(bucket=self.bucket, record=points)
+            points = self.build_heating_circuit_points(circuit_name, flow_temp, return_temp, timestamp)
+            if self.write_batch(points):
+                self.invalidate_query_cache(circuit_name)
                 logger.debug(f"Heizkreis-Daten geschrieben: {circuit_name}")
                 return True
             
@@ -147,9 +468,54 @@ class HeatingInfluxDBClient:
         
         return False
     
+    def build_heating_room_points(self, sensor_name: str, temperature: float,
+                                  humidity: float, dew_point: float = None,
+                                  timestamp: Optional[Timestamp] = None) -> List[Record]:
+        """
+        Erstellt die Datenpunkte für Heizungsraum-Umgebungsdaten ohne sie zu schreiben
+        
+        Args:
+            sensor_name: Name des Sensors
+            temperature: Raumtemperatur
+            humidity: Luftfeuchtigkeit
+            dew_point: Taupunkt
+            timestamp: Zeitstempel (datetime oder ns seit Epoch)
+            
+        Returns:
+            Liste von Line-Protocol Zeilen
+        """
+        t = to_nanoseconds(timestamp)
+        temp_prefix, humidity_prefix, dew_point_prefix = room_prefixes(sensor_name)
+        
+        points = []
+        
+        # Raumtemperatur
+        if temperature is not None:
+            points.append(f'{temp_prefix}{field_value(temperature)} {t}')
+        
+        # Luftfeuchtigkeit
+        if humidity is not None:
+            points.append(f'{humidity_prefix}{field_value(humidity)} {t}')
+        
+        # Taupunkt
+        if dew_point is not None:
+            points.append(f'{dew_point_prefix}{field_value(dew_point)} {t}')
+        
+        # Kondensationsrisiko bewerten
+        if temperature is not None and dew_point is not None:
+            # Annahme: Kälteste Rohrleitung ist 5°C unter Raumtemperatur
+            pipe_temp = temperature - 5
+            condensation_risk = max(0, min(100, (dew_point - pipe_temp + 5) * 20))
+            
+            points.append(self._CONDENSATION_TMPL.format(
+                v=field_value(condensation_risk), dew=field_value(dew_point), pipe=field_value(pipe_temp), t=t
+            ))
+        
+        return points
+    
     def write_heating_room_data(self, sensor_name: str, temperature: float, 
                                humidity: float, dew_point: float = None,
-                               timestamp: Optional[datetime] = None) -> bool:
+                               timestamp: Optional[Timestamp] = None) -> bool:
         """
         Schreibt Heizungsraum-Umgebungsdaten
         
@@ -158,68 +524,112 @@ class HeatingInfluxDBClient:
             temperature: Raumtemperatur
             humidity: Luftfeuchtigkeit
             dew_point: Taupunkt
-            timestamp: Zeitstempel
+            timestamp: Zeitstempel (datetime oder ns seit Epoch)
             
         Returns:
             True bei Erfolg
         """
-        if not self.write_api:
+        if not self._ensure_connected():
             return False
         
-        if timestamp is None:
-            timestamp = datetime.utcnow()
-        
         try:
-            points = []
+            points = self.build_heating_room_points(sensor_name, temperature, humidity,
+                                                    dew_point, timestamp)
+            if self.write_batch(points):
+                logger.debug(f"Heizungsraum-Daten geschrieben: {sensor_name}")
+                return True
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Schreiben der Heizungsraum-Daten: {e}")
+        
+        return False
+    
+    @staticmethod
+    def _condensation_risks(temperatures: List[float],
+                            dew_points: List[float]) -> Tuple[List[float], List[float]]:
+        """
+        Berechnet Rohrtemperatur-Schätzung und Kondensationsrisiko für mehrere Sensoren
+        
+        Returns:
+            Tuple (geschätzte Rohrtemperaturen, Risiko in Prozent)
+        """
+        if NUMPY_AVAILABLE:
+            pipe = np.asarray(temperatures, dtype=np.float64) - 5
+            risk = np.clip((np.asarray(dew_points, dtype=np.float64) - pipe + 5) * 20, 0, 100)
+            return pipe.tolist(), risk.tolist()
+        
+        pipe = [temperature - 5 for temperature in temperatures]
+        risk = [max(0, min(100, (dew_point - pipe_temp + 5) * 20))
+                for dew_point, pipe_temp in zip(dew_points, pipe)]
+        return pipe, risk
+    
+    def build_heating_room_points_batch(self, readings: List[RoomReading],
+                                        timestamp: Optional[Timestamp] = None) -> List[Record]:
+        """
+        Erstellt die Datenpunkte mehrerer Raumsensoren in einem Durchgang
+        
+        Das Kondensationsrisiko wird für alle Sensoren gemeinsam (vektorisiert,
+        falls NumPy verfügbar ist) berechnet.
+        
+        Args:
+            readings: Liste von (Sensorname, Temperatur, Luftfeuchtigkeit, Taupunkt)
+            timestamp: Gemeinsamer Zeitstempel (datetime oder ns seit Epoch)
             
-            # Raumtemperatur
-            if temperature is not None:
-                temp_point = Point("room_climate") \
-                    .tag("sensor", sensor_name) \
-                    .tag("location", "heating_room") \
-                    .tag("type", "temperature") \
-                    .field("value", float(temperature)) \
-                    .time(timestamp)
-                points.append(temp_point)
+        Returns:
+            Liste von Line-Protocol Zeilen
+        """
+        t = to_nanoseconds(timestamp)
+        
+        # Kondensationsrisiko nur für Sensoren mit Temperatur und Taupunkt
+        complete = [i for i, (_, temperature, _, dew_point) in enumerate(readings)
+                    if temperature is not None and dew_point is not None]
+        risks = {}
+        if complete:
+            pipe_temps, risk_values = self._condensation_risks(
+                [readings[i][1] for i in complete],
+                [readings[i][3] for i in complete]
+            )
+            risks = dict(zip(complete, zip(pipe_temps, risk_values)))
+        
+        points = []
+        
+        for i, (sensor_name, temperature, humidity, dew_point) in enumerate(readings):
+            temp_prefix, humidity_prefix, dew_point_prefix = room_prefixes(sensor_name)
             
-            # Luftfeuchtigkeit
+            if temperature is not None:
+                points.append(f'{temp_prefix}{field_value(temperature)} {t}')
             if humidity is not None:
-                humidity_point = Point("room_climate") \
-                    .tag("sensor", sensor_name) \
-                    .tag("location", "heating_room") \
-                    .tag("type", "humidity") \
-                    .field("value", float(humidity)) \
-                    .time(timestamp)
-                points.append(humidity_point)
-            
-            # Taupunkt
+                points.append(f'{humidity_prefix}{field_value(humidity)} {t}')
             if dew_point is not None:
-                dew_point_point = Point("room_climate") \
-                    .tag("sensor", sensor_name) \
-                    .tag("location", "heating_room") \
-                    .tag("type", "dew_point") \
-                    .field("value", float(dew_point)) \
-                    .time(timestamp)
-                points.append(dew_point_point)
+                points.append(f'{dew_point_prefix}{field_value(dew_point)} {t}')
             
-            # Kondensationsrisiko bewerten
-            if temperature is not None and dew_point is not None:
-                # Annahme: Kälteste Rohrleitung ist 5°C unter Raumtemperatur
-                pipe_temp = temperature - 5
-                condensation_risk = max(0, min(100, (dew_point - pipe_temp + 5) * 20))
-                
-                risk_point = Point("heating_alerts") \
-                    .tag("type", "condensation_risk") \
-                    .tag("location", "heating_room") \
-                    .field("risk_percentage", float(condensation_risk)) \
-                    .field("dew_point", float(dew_point)) \
-                    .field("estimated_pipe_temp", float(pipe_temp)) \
-                    .time(timestamp)
-                points.append(risk_point)
+            if i in risks:
+                pipe_temp, condensation_risk = risks[i]
+                points.append(self._CONDENSATION_TMPL.format(
+                    v=field_value(condensation_risk), dew=field_value(dew_point), pipe=field_value(pipe_temp), t=t
+                ))
+        
+        return points
+    
+    def write_heating_room_data_batch(self, readings: List[RoomReading],
+                                      timestamp: Optional[Timestamp] = None) -> bool:
+        """
+        Schreibt die Umgebungsdaten mehrerer Raumsensoren mit einem Aufruf
+        
+        Args:
+            readings: Liste von (Sensorname, Temperatur, Luftfeuchtigkeit, Taupunkt)
+            timestamp: Gemeinsamer Zeitstempel (datetime oder ns seit Epoch)
             
-            if points:
-                self.write_api.write(bucket=self.bucket, record=points)
-                logger.debug(f"Heizungsraum-Daten geschrieben: {sensor_name}")
+        Returns:
+            True bei Erfolg
+        """
+        if not self._ensure_connected():
+            return False
+        
+        try:
+            points = self.build_heating_room_points_batch(readings, timestamp)
+            if self.write_batch(points):
+                logger.debug(f"Heizungsraum-Daten von {len(readings)} Sensoren geschrieben")
                 return True
                 
         except Exception as e:
@@ -227,9 +637,70 @@ class HeatingInfluxDBClient:
         
         return False
     
+    def build_system_status_points(self, total_circuits: int, active_circuits: int,
+                                   system_efficiency: float = None, alerts: List[Dict] = None,
+                                   timestamp: Optional[Timestamp] = None) -> List[Record]:
+        """
+        Erstellt die Datenpunkte für den Gesamtsystem-Status ohne sie zu schreiben
+        
+        Args:
+            total_circuits: Anzahl Heizkreise gesamt
+            active_circuits: Anzahl aktive Heizkreise
+            system_efficiency: Gesamteffizienz des Systems
+            alerts: Liste von Alarmen
+            timestamp: Zeitstempel (datetime oder ns seit Epoch)
+            
+        Returns:
+            Liste von Line-Protocol Zeilen (Alarme als Point); leer, wenn sich der
+            Status seit dem letzten erfolgreichen Schreiben nicht geändert hat und
+            noch kein Heartbeat fällig ist
+        """
+        # Alarme einmal entpacken - für Vergleich und Datenpunkte
+        alert_rows = tuple(map(alert_values, alerts)) if alerts else ()
+        
+        status_key = (total_circuits, active_circuits, system_efficiency, alert_rows)
+        now = time.monotonic()
+        if (status_key == self._last_status
+                and now - self._last_status_time < self.STATUS_HEARTBEAT_INTERVAL):
+            return []
+        
+        # Erst nach erfolgreichem write_batch als geschrieben merken
+        self._pending_status = (status_key, now)
+        
+        t = to_nanoseconds(timestamp)
+        
+        points = []
+        
+        # System-Status
+        efficiency = f',efficiency={field_value(system_efficiency)}' if system_efficiency is not None else ''
+        points.append(self._STATUS_TMPL.format(
+            active=int(active_circuits),
+            inactive=int(total_circuits - active_circuits),
+            total=int(total_circuits),
+            eff=efficiency,
+            t=t
+        ))
+        
+        # Alarm-Status (selten, freie Texte - hier übernimmt Point das Escaping)
+        if alert_rows:
+            for alert_type, circuit, message in alert_rows:
+                alert_point = Point("heating_alerts") \
+                    .tag("type", alert_type) \
+                    .tag("circuit", circuit) \
+                    .tag("location", "heating_system") \
+                    .field("message", message) \
+                    .field("active", 1) \
+                    .time(t, WritePrecision.NS)
+                points.append(alert_point)
+        else:
+            # Keine Alarme aktiv
+            points.append(self._NO_ALERT_TMPL.format(t=t))
+        
+        return points
+    
     def write_system_status(self, total_circuits: int, active_circuits: int,
                            system_efficiency: float = None, alerts: List[Dict] = None,
-                           timestamp: Optional[datetime] = None) -> bool:
+                           timestamp: Optional[Timestamp] = None) -> bool:
         """
         Schreibt Gesamtsystem-Status
         
@@ -238,57 +709,22 @@ class HeatingInfluxDBClient:
             active_circuits: Anzahl aktive Heizkreise
             system_efficiency: Gesamteffizienz des Systems
             alerts: Liste von Alarmen
-            timestamp: Zeitstempel
+            timestamp: Zeitstempel (datetime oder ns seit Epoch)
             
         Returns:
             True bei Erfolg
         """
-        if not self.write_api:
+        if not self._ensure_connected():
             return False
         
-        if timestamp is None:
-            timestamp = datetime.utcnow()
-        
         try:
-            points = []
-            
-            # System-Status
-            status_point = Point("heating_system_status") \
-                .tag("system", "main") \
-                .tag("location", "heating_system") \
-                .field("total_circuits", int(total_circuits)) \
-                .field("active_circuits", int(active_circuits)) \
-                .field("inactive_circuits", int(total_circuits - active_circuits)) \
-                .time(timestamp)
-            
-            if system_efficiency is not None:
-                status_point = status_point.field("efficiency", float(system_efficiency))
-            
-            points.append(status_point)
-            
-            # Alarm-Status
-            if alerts:
-                for alert in alerts:
-                    alert_point = Point("heating_alerts") \
-                        .tag("type", alert.get('type', 'unknown')) \
-                        .tag("circuit", alert.get('circuit', 'system')) \
-                        .tag("location", "heating_system") \
-                        .field("message", alert.get('message', '')) \
-                        .field("active", 1) \
-                        .time(timestamp)
-                    points.append(alert_point)
-            else:
-                # Keine Alarme aktiv
-                no_alert_point = Point("heating_alerts") \
-                    .tag("type", "status") \
-                    .tag("location", "heating_system") \
-                    .field("message", "System läuft normal") \
-                    .field("active", 0) \
-                    .time(timestamp)
-                points.append(no_alert_point)
+            points = self.build_system_status_points(total_circuits, active_circuits,
+                                                     system_efficiency, alerts, timestamp)
+            if not points:
+                # Unverändert - nichts zu schreiben
+                return True
             
-            if points:
-                self.write_api.write(bucket=self.bucket, record=points)
+            if self.write_batch(points):
                 logger.debug("System-Status geschrieben")
                 return True
                 
@@ -297,7 +733,8 @@ class HeatingInfluxDBClient:
         
         return False
     
-    def _calculate_efficiency_score(self, temperature_diff: float) -> float:
+    @staticmethod
+    def _calculate_efficiency_score(temperature_diff: float) -> float:
         """
         Berechnet Effizienz-Score basierend auf Temperaturdifferenz
         
@@ -307,18 +744,7 @@ class HeatingInfluxDBClient:
         Returns:
             Score zwischen 0-100
         """
-        if temperature_diff >= 15:
-            return 100.0
-        elif temperature_diff >= 10:
-            return 80.0
-        elif temperature_diff >= 7:
-            return 60.0
-        elif temperature_diff >= 5:
-            return 40.0
-        elif temperature_diff >= 3:
-            return 20.0
-        else:
-            return 0.0
+        return EFFICIENCY_SCORES[bisect_right(EFFICIENCY_THRESHOLDS, temperature_diff)]
     
     def query_recent_temperatures(self, circuit_name: str = None, hours: int = 24) -> List[Dict]:
         """
@@ -331,39 +757,77 @@ class HeatingInfluxDBClient:
         Returns:
             Liste von Datenpunkten
         """
-        if not self.query_api:
+        # Kurze Zeiträume direkt aus den selbst geschriebenen Werten beantworten
+        if hours <= self.RECENT_LOCAL_HOURS:
+            local_points = self._query_recent_local(circuit_name, hours)
+            if local_points is not None:
+                return local_points
+        
+        if not self._ensure_connected():
             return []
         
+        cache_key = ('recent_temperatures', circuit_name, hours)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
-            circuit_filter = f'|> filter(fn: (r) => r["circuit"] == "{circuit_name}")' if circuit_name else ''
-            
-            query = f'''
-            from(bucket: "{self.bucket}")
-              |> range(start: -{hours}h)
-              |> filter(fn: (r) => r["_measurement"] == "heating_temperature")
-              {circuit_filter}
-              |> sort(columns: ["_time"], desc: true)
-              |> limit(n: 1000)
-            '''
-            
-            result = self.query_api.query(query)
-            
-            data_points = []
-            for table in result:
-                for record in table.records:
-                    data_points.append({
-                        'time': record.get_time(),
-                        'circuit': record.values.get('circuit'),
-                        'type': record.values.get('type'),
-                        'temperature': record.get_value()
-                    })
-            
-            return data_points
+            query = build_recent_temperatures_query(self.bucket, circuit_name, hours)
+            
+            # Datensätze direkt aus dem Stream übernehmen statt FluxTables zu materialisieren
+            data_points = [
+                {
+                    'time': record.get_time(),
+                    'circuit': record.values.get('circuit'),
+                    'type': record.values.get('type'),
+                    'temperature': record.get_value()
+                }
+                for record in self.query_api.query_stream(query)
+            ]
+            
+            self._query_cache.set(cache_key, data_points)
+            return list(data_points)
             
         except Exception as e:
             logger.error(f"Fehler bei Temperatur-Abfrage: {e}")
             return []
     
+    def _query_recent_local(self, circuit_name: Optional[str], hours: float) -> Optional[List[Dict]]:
+        """
+        Beantwortet eine Temperatur-Abfrage aus dem lokalen Puffer
+        
+        Returns:
+            Datenpunkte (neueste zuerst, wie die Flux-Abfrage) oder None, wenn der
+            Puffer den Zeitraum nicht vollständig abdeckt
+        """
+        recent = list(self._recent)
+        covered_since = self._recent_since
+        # Nur lesende Clients (Dashboard, zweiter Prozess) haben nichts selbst geschrieben
+        if not recent or covered_since is None:
+            return None
+        
+        start = time.time_ns() - int(hours * 3600 * 1_000_000_000)
+        
+        # Abgedeckt ist der Zeitraum seit dem ersten erfolgreichen Schreiben - bzw. seit
+        # dem ältesten Eintrag, sobald der Puffer voll ist und alte Werte verdrängt
+        if len(recent) == self._recent.maxlen:
+            covered_since = recent[0][0]
+        if covered_since > start:
+            return None
+        
+        data_points = [
+            {
+                'time': datetime.fromtimestamp(ts / 1_000_000_000, tz=timezone.utc),
+                'circuit': circuit,
+                'type': kind,
+                'temperature': value
+            }
+            for ts, circuit, kind, value in reversed(recent)
+            if ts >= start and (circuit_name is None or circuit == circuit_name)
+        ]
+        
+        return data_points[:1000]
+    
     def query_efficiency_trends(self, circuit_name: str = None, days: int = 7) -> List[Dict]:
         """
         Fragt Effizienz-Trends ab
@@ -375,34 +839,28 @@ class HeatingInfluxDBClient:
         Returns:
             Liste von Effizienz-Datenpunkten
         """
-        if not self.query_api:
+        if not self._ensure_connected():
             return []
         
+        cache_key = ('efficiency_trends', circuit_name, days)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
-            circuit_filter = f'|> filter(fn: (r) => r["circuit"] == "{circuit_name}")' if circuit_name else ''
+            query = build_efficiency_trends_query(self.bucket, circuit_name, days)
             
-            query = f'''
-            from(bucket: "{self.bucket}")
-              |> range(start: -{days}d)
-              |> filter(fn: (r) => r["_measurement"] == "heating_efficiency")
-              |> filter(fn: (r) => r["metric"] == "efficiency_score")
-              {circuit_filter}
-              |> aggregateWindow(every: 1h, fn: mean, createEmpty: false)
-              |> sort(columns: ["_time"], desc: false)
-            '''
-            
-            result = self.query_api.query(query)
+            data_points = [
+                {
+                    'time': record.get_time(),
+                    'circuit': record.values.get('circuit'),
+                    'efficiency_score': record.get_value()
+                }
+                for record in self.query_api.query_stream(query)
+            ]
             
-            data_points = []
-            for table in result:
-                for record in table.records:
-                    data_points.append({
-                        'time': record.get_time(),
-                        'circuit': record.values.get('circuit'),
-                        'efficiency_score': record.get_value()
-                    })
-            
-            return data_points
+            self._query_cache.set(cache_key, data_points)
+            return list(data_points)
             
         except Exception as e:
             logger.error(f"Fehler bei Effizienz-Abfrage: {e}")
@@ -415,39 +873,58 @@ class HeatingInfluxDBClient:
         Returns:
             Liste von aktiven Alarmen
         """
-        if not self.query_api:
+        if not self._ensure_connected():
             return []
         
+        cache_key = ('current_alerts', None, None)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
-            query = f'''
-            from(bucket: "{self.bucket}")
-              |> range(start: -1h)
-              |> filter(fn: (r) => r["_measurement"] == "heating_alerts")
-              |> filter(fn: (r) => r["active"] == 1)
-              |> group(columns: ["type", "circuit"])
-              |> last()
-            '''
-            
-            result = self.query_api.query(query)
-            
-            alerts = []
-            for table in result:
-                for record in table.records:
-                    alerts.append({
-                        'type': record.values.get('type'),
-                        'circuit': record.values.get('circuit'),
-                        'message': record.values.get('message'),
-                        'time': record.get_time()
-                    })
-            
-            return alerts
+            query = build_current_alerts_query(self.bucket)
+            
+            alerts = [
+                {
+                    'type': record.values.get('type'),
+                    'circuit': record.values.get('circuit'),
+                    'message': record.values.get('message'),
+                    'time': record.get_time()
+                }
+                for record in self.query_api.query_stream(query)
+            ]
+            
+            # Alarme sollen schnell sichtbar werden - kürzere Lebensdauer
+            self._query_cache.set(cache_key, alerts, ttl=self.ALERTS_CACHE_TTL)
+            return list(alerts)
             
         except Exception as e:
             logger.error(f"Fehler bei Alarm-Abfrage: {e}")
             return []
     
+    def invalidate_query_cache(self, circuit_name: Optional[str] = None) -> None:
+        """
+        Verwirft zwischengespeicherte Abfrage-Ergebnisse
+        
+        Args:
+            circuit_name: Nur Einträge dieses Heizkreises (und kreisübergreifende)
+                          verwerfen; None leert den gesamten Cache
+        """
+        if circuit_name is None:
+            self._query_cache.clear()
+            return
+        
+        self._query_cache.invalidate(lambda key: key[1] in (circuit_name, None))
+    
     def close(self) -> None:
         """Schließt die InfluxDB Verbindung"""
+        if self.write_api:
+            try:
+                # Schreibt ausstehende Batches, bevor der Writer beendet wird
+                self.write_api.close()
+            except Exception as e:
+                logger.error(f"Fehler beim Leeren des Schreibpuffers: {e}")
+        
         if self.client:
             try:
                 self.client.close()
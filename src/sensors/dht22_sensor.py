@@ -3,10 +3,26 @@ DHT22 Sensor für Umgebungstemperatur und Luftfeuchtigkeit im Heizungsraum
 Erweitert um heizungsspezifische Berechnungen
 """
 
+import math
 import time
+from bisect import bisect_right
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional, Dict, Tuple, List
+import threading
+from datetime import datetime, timezone
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Optional, Dict, Tuple, List, Sequence
+
+# NumPy ist optional - nur für die Taupunkt-Berechnung vieler Messwerte auf einmal
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
 # Robust DHT22 Import mit Fallback-Optionen
 DHT_AVAILABLE = False
@@ -18,7 +34,6 @@ try:
     import adafruit_dht
     DHT_AVAILABLE = True
     DHT_METHOD = "adafruit"
-    logger = logging.getLogger(__name__)
     logger.info("DHT22: Adafruit CircuitPython verfügbar")
 except ImportError as e:
     try:
@@ -26,7 +41,6 @@ except ImportError as e:
         import Adafruit_DHT
         DHT_AVAILABLE = True
         DHT_METHOD = "legacy"
-        logger = logging.getLogger(__name__)
         logger.info("DHT22: Legacy Adafruit_DHT verfügbar")
     except ImportError:
         try:
@@ -35,33 +49,198 @@ except ImportError as e:
             import DHT22
             DHT_AVAILABLE = True
             DHT_METHOD = "pigpio"
-            logger = logging.getLogger(__name__)
             logger.info("DHT22: Pigpio DHT22 verfügbar")
         except ImportError:
             # Fallback: Dummy-Implementation für Entwicklung
             DHT_AVAILABLE = False
             DHT_METHOD = "dummy"
-            logger = logging.getLogger(__name__)
             logger.warning("DHT22: Keine DHT-Bibliothek verfügbar - verwende Dummy-Implementation")
 
-logger = logging.getLogger(__name__)
+# GPIO-Nummer (BCM) -> board-Pin, einmalig beim Import aufgebaut
+BOARD_PINS = {}
+if DHT_METHOD == "adafruit":
+    BOARD_PINS = {
+        gpio: getattr(board, f'D{gpio}')
+        for gpio in range(0, 28)
+        if hasattr(board, f'D{gpio}')
+    }
+
+def _now_iso() -> str:
+    """Aktueller Zeitstempel (UTC) als ISO-String - ersetzt das veraltete datetime.utcnow()"""
+    return datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat()
+
+
+# Komfort-Bereiche (Arbeitsplatz-Standards) als Schwellen für bisect_right. Die oberen
+# Grenzen sind inklusive (z.B. 24°C noch optimal) - daher math.nextafter.
+_TEMP_COMFORT_BOUNDS = (15, 18, math.nextafter(24, math.inf), math.nextafter(27, math.inf))
+_HUMIDITY_COMFORT_BOUNDS = (30, 40, math.nextafter(60, math.inf), math.nextafter(70, math.inf))
+_COMFORT_LABELS = ('unkomfortabel', 'akzeptabel', 'optimal', 'akzeptabel', 'unkomfortabel')
+
+# Empfehlungen: (Bedingung(temperatur, feuchte), Text) - Reihenfolge = Ausgabereihenfolge
+_COMFORT_RULES: Tuple[Tuple[Callable[[float, float], bool], str], ...] = (
+    (lambda t, h: t < 15, "Heizung erhöhen - Temperatur zu niedrig"),
+    (lambda t, h: t > 27, "Belüftung verbessern - Temperatur zu hoch"),
+    (lambda t, h: h < 30, "Luftfeuchtigkeit zu niedrig - Luftbefeuchter erwägen"),
+    (lambda t, h: h > 70, "Luftfeuchtigkeit zu hoch - Entfeuchtung oder Belüftung verbessern"),
+)
+
+# Kondensationsrisiko nach Abstand Rohrtemperatur - Taupunkt (°C)
+_CONDENSATION_BOUNDS = (0, 2, 5)
+_CONDENSATION_LEVELS = ('hoch', 'mittel', 'gering', 'minimal')
+_CONDENSATION_MESSAGES = (
+    'Kondensation wahrscheinlich! Rohr: {pipe:.1f}°C < Taupunkt: {dew:.1f}°C',
+    'Kondensationsrisiko vorhanden. Differenz: {diff:.1f}°C',
+    'Geringes Risiko. Sicherheitsabstand: {diff:.1f}°C',
+    'Kein Kondensationsrisiko. Sicherheitsabstand: {diff:.1f}°C',
+)
+
+# Magnus-Koeffizienten für die Taupunkt-Berechnung
+MAGNUS_A = 17.27
+MAGNUS_B = 237.7
+
+@lru_cache(maxsize=256)
+def _dew_point_cached(temperature_dd: int, humidity_dd: int) -> float:
+    """
+    Taupunkt nach Magnus-Formel für Werte in Zehntel °C bzw. Zehntel %RH
+    
+    Der DHT22 löst ohnehin nur 0,1 auf - wiederholte Messwerte kommen aus dem Cache.
+    """
+    temperature = temperature_dd / 10.0
+    alpha = ((MAGNUS_A * temperature) / (MAGNUS_B + temperature)) + math.log(humidity_dd / 1000.0)
+    return round((MAGNUS_B * alpha) / (MAGNUS_A - alpha), 1)
+
+def compute_dew_points(temperatures: Sequence[float], humidities: Sequence[float]):
+    """
+    Berechnet Taupunkte für viele Messwerte auf einmal (z.B. Historie oder mehrere Sensoren)
+    
+    Args:
+        temperatures: Temperaturen in °C
+        humidities: Relative Luftfeuchtigkeiten in %
+        
+    Returns:
+        Taupunkte in °C (auf 0,1 gerundet) - als NumPy-Array, falls NumPy verfügbar
+        ist, sonst als Liste
+    """
+    if NUMPY_AVAILABLE:
+        t = np.asarray(temperatures, dtype=np.float64)
+        h = np.asarray(humidities, dtype=np.float64)
+        alpha = (MAGNUS_A * t) / (MAGNUS_B + t) + np.log(h / 100.0)
+        return np.round((MAGNUS_B * alpha) / (MAGNUS_A - alpha), 1)
+    
+    dew_points = []
+    for temperature, humidity in zip(temperatures, humidities):
+        alpha = (MAGNUS_A * temperature) / (MAGNUS_B + temperature) + math.log(humidity / 100.0)
+        dew_points.append(round((MAGNUS_B * alpha) / (MAGNUS_A - alpha), 1))
+    return dew_points
+
+@dataclass(slots=True)
+class RoomConditions:
+    """Zustandsbewertung des Heizungsraums"""
+    status: str = 'fehler'
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    dew_point: Optional[float] = None
+    alerts: List[Dict[str, str]] = field(default_factory=list)
+    timestamp: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary für Serialisierung (JSON/API)"""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class CondensationRisk:
+    """Kondensationsrisiko an Rohrleitungen"""
+    risk_level: str = 'unbekannt'
+    message: str = ''
+    dew_point: Optional[float] = None
+    pipe_temperature: Optional[float] = None
+    temperature_difference: Optional[float] = None
+    timestamp: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary für Serialisierung (JSON/API)"""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class ComfortAssessment:
+    """Komfort-Bewertung des Heizungsraums"""
+    comfort_level: str = 'unbekannt'
+    message: str = ''
+    temperature_comfort: Optional[str] = None
+    humidity_comfort: Optional[str] = None
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    recommendations: List[str] = field(default_factory=list)
+    timestamp: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary für Serialisierung (JSON/API)"""
+        return asdict(self)
+
 
 class HeatingRoomSensor:
     """DHT22 Sensor für Heizungsraum-Überwachung"""
     
-    def __init__(self, pin: int = 18, name: str = "Heizungsraum"):
+    # Älter darf die Messung des Hintergrund-Pollers nicht sein (Sekunden, mindestens
+    # zwei Poll-Intervalle), sonst wird wieder direkt gemessen (Sensorausfall sichtbar)
+    MAX_SNAPSHOT_AGE = 60.0
+    
+    # Adaptives Poll-Intervall: stabile Raumluft -> seltener, schnelle Änderung -> öfter
+    POLL_INTERVAL_MIN = 2.0
+    POLL_INTERVAL_MAX = 60.0
+    # Änderung pro Messung, die als "normal" gilt (°C bzw. %RH)
+    POLL_TARGET_TEMP_DELTA = 0.2
+    POLL_TARGET_HUMIDITY_DELTA = 1.0
+    POLL_EWMA_WEIGHT = 0.2
+    
+    # Wiederholungen: exponentielle Pause zwischen Versuchen (Sekunden)
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_MAX = 4.0
+    # Fehlmessungen in Folge, ab denen der Sensor als hängend gilt (Circuit Breaker)
+    MAX_CONSECUTIVE_FAILURES = 5
+    # Versorgung aus/an beim Neustart eines hängenden Sensors über power_pin
+    POWER_CYCLE_OFF_TIME = 2.0
+    POWER_CYCLE_ON_TIME = 2.0
+    
+    # Gemeinsame adafruit_dht-Instanzen je GPIO: (Referenzzähler, Instanz). Jede Instanz
+    # belegt die GPIO-Leitung exklusiv - doppelte Sensor-Objekte teilen sich daher eine
+    _handles: ClassVar[Dict[int, Tuple[int, Any]]] = {}
+    _handles_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    def __init__(self, pin: int = 18, name: str = "Heizungsraum", power_pin: Optional[int] = None):
         """
         Initialisiert den DHT22 Sensor für den Heizungsraum
         
         Args:
             pin: GPIO Pin (BCM Nummerierung)
             name: Name/Standort des Sensors
+            power_pin: Optionaler GPIO Pin (BCM), der die Versorgung des Sensors schaltet
         """
         self.pin = pin
         self.name = name
+        self.power_pin = power_pin
+        self._power_io = None  # digitalio-Ausgang für power_pin, erst beim ersten Neustart belegt
+        self._consecutive_failures = 0
         self.dht = None
-        self.last_reading_time = 0
+        self.pi = None  # pigpio-Verbindung (nur Methode "pigpio")
+        self._method = DHT_METHOD
+        self.last_reading_time = 0.0  # time.monotonic() der letzten Messung
         self.min_reading_interval = 2.0
+        # Letzte gültige Messung - Aufrufe innerhalb von min_reading_interval teilen sie sich
+        self._cache: Optional[Dict[str, Optional[float]]] = None
+        self._cache_ts = 0.0
+        self._lock = threading.Lock()       # schützt _cache/_cache_ts
+        self._read_lock = threading.Lock()  # nur eine Messung gleichzeitig
+        
+        # Optionaler Hintergrund-Poller (start_background)
+        self._poll_thread: Optional[threading.Thread] = None
+        self._poll_stop = threading.Event()
+        self.poll_interval = self.POLL_INTERVAL_MIN
+        self._last_temp: Optional[float] = None
+        self._last_hum: Optional[float] = None
+        self._delta_ewma = 1.0  # Änderung pro Messung relativ zum Zielwert
         
         # Heizungsraum-spezifische Grenzwerte
         self.temp_min = 5.0   # Mindesttemperatur (Frostschutz)
@@ -71,7 +250,7 @@ class HeatingRoomSensor:
         # DHT Sensor je nach verfügbarer Bibliothek initialisieren
         self._init_dht_sensor()
         
-        logger.info(f"Heizungsraum-Sensor initialisiert: {self.name} (GPIO {self.pin}, Methode: {DHT_METHOD})")
+        logger.info(f"Heizungsraum-Sensor initialisiert: {self.name} (GPIO {self.pin}, Methode: {self._method})")
     
     def _init_dht_sensor(self):
         """Initialisiert den DHT22 Sensor basierend auf verfügbarer Bibliothek"""
@@ -80,21 +259,15 @@ class HeatingRoomSensor:
             return
             
         try:
-            if DHT_METHOD == "adafruit":
+            if self._method == "adafruit":
                 # Adafruit CircuitPython
-                if self.pin == 18:
-                    self.dht = adafruit_dht.DHT22(board.D18)
-                elif self.pin == 4:
-                    self.dht = adafruit_dht.DHT22(board.D4)
-                else:
-                    # Dynamisch für andere Pins
-                    self.dht = adafruit_dht.DHT22(getattr(board, f'D{self.pin}'))
+                self.dht = self._acquire_handle(self.pin)
                     
-            elif DHT_METHOD == "legacy":
+            elif self._method == "legacy":
                 # Legacy Adafruit_DHT
                 self.dht = Adafruit_DHT.DHT22
                 
-            elif DHT_METHOD == "pigpio":
+            elif self._method == "pigpio":
                 # Pigpio DHT22
                 self.pi = pigpio.pi()
                 self.dht = DHT22.sensor(self.pi, self.pin)
@@ -103,33 +276,196 @@ class HeatingRoomSensor:
             logger.error(f"DHT22 Initialisierung fehlgeschlagen: {e}")
             self.dht = None
     
+    @classmethod
+    def _acquire_handle(cls, pin: int):
+        """Gibt die adafruit_dht-Instanz für den Pin zurück (bei Bedarf neu angelegt)"""
+        with cls._handles_lock:
+            handle = cls._handles.get(pin)
+            if handle is not None:
+                cls._handles[pin] = (handle[0] + 1, handle[1])
+                return handle[1]
+            
+            board_pin = BOARD_PINS.get(pin)
+            if board_pin is None:
+                raise ValueError(f"GPIO {pin} ist auf diesem Board nicht verfügbar")
+            dht = adafruit_dht.DHT22(board_pin)
+            cls._handles[pin] = (1, dht)
+            return dht
+    
+    @classmethod
+    def _release_handle(cls, pin: int) -> bool:
+        """
+        Gibt eine Referenz auf die Instanz des Pins frei
+        
+        Returns:
+            True wenn die letzte Referenz freigegeben wurde (Instanz beenden)
+        """
+        with cls._handles_lock:
+            handle = cls._handles.get(pin)
+            if handle is None:
+                return True
+            if handle[0] > 1:
+                cls._handles[pin] = (handle[0] - 1, handle[1])
+                return False
+            del cls._handles[pin]
+            return True
+    
+    @property
+    def is_available(self) -> bool:
+        """True wenn ein DHT22 initialisiert ist (sonst Dummy-Modus)"""
+        return DHT_AVAILABLE and self.dht is not None
+    
     def _wait_for_reading_interval(self) -> None:
         """Wartet die erforderliche Zeit zwischen Messungen ab"""
-        current_time = time.time()
+        current_time = time.monotonic()
         time_since_last = current_time - self.last_reading_time
         
         if time_since_last < self.min_reading_interval:
             wait_time = self.min_reading_interval - time_since_last
             time.sleep(wait_time)
     
-    def read_sensor_data(self, retries: int = 3) -> Dict[str, Optional[float]]:
+    def read_sensor_data(self, retries: int = 3, force: bool = False) -> Dict[str, Optional[float]]:
         """
         Liest Temperatur und Luftfeuchtigkeit vom DHT22
         
+        Eine gültige Messung wird für min_reading_interval Sekunden wiederverwendet,
+        damit mehrere Auswertungen pro Zyklus nicht jeweils blockierend messen.
+        Läuft der Hintergrund-Poller (start_background), wird nur die letzte
+        Messung zurückgegeben, ohne zu blockieren.
+        
         Args:
             retries: Anzahl Wiederholungsversuche
+            force: Zwischengespeicherte Messung ignorieren und neu messen
             
         Returns:
             Dictionary mit 'temperature', 'humidity', 'dew_point'
         """
-        if not DHT_AVAILABLE or self.dht is None:
-            logger.warning(f"{self.name}: DHT22 nicht verfügbar - verwende Dummy-Daten")
-            return {
-                'temperature': 20.0,  # Dummy-Werte für Tests
-                'humidity': 50.0,
-                'dew_point': 9.3,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+        # Ohne Sensor weder Cache noch Mess-Sperre - Dummy-Werte sofort liefern
+        if not self.is_available:
+            return self._dummy_reading()
+        
+        if not force:
+            with self._lock:
+                cache = self._cache
+                age = time.monotonic() - self._cache_ts
+            # Poller aktiv: letzte Messung genügt, solange sie nicht veraltet ist
+            if self.is_polling():
+                max_age = max(self.MAX_SNAPSHOT_AGE, 2 * self.poll_interval)
+            else:
+                max_age = self.min_reading_interval
+            if cache is not None and age < max_age:
+                return dict(cache)
+        
+        return self._read_once(retries)
+    
+    async def aread(self, retries: int = 3) -> Dict[str, Optional[float]]:
+        """Liest den Sensor, ohne die Event-Loop zu blockieren (Messung im Thread-Pool)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.read_sensor_data, retries)
+    
+    def start_background(self) -> None:
+        """
+        Startet einen Hintergrund-Thread, der den Sensor regelmäßig ausliest
+        
+        read_sensor_data() liefert danach sofort die letzte Messung - die 2-3 s
+        einer DHT22-Messung fallen nicht mehr im aufrufenden Thread an.
+        """
+        if self.is_polling():
+            return
+        
+        if not self.is_available:
+            logger.warning(f"{self.name}: Kein DHT22 verfügbar - Hintergrund-Messung nicht gestartet")
+            return
+        
+        self._poll_stop.clear()
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop,
+            name=f'dht22-{self.pin}',
+            daemon=True
+        )
+        self._poll_thread.start()
+        logger.info(f"{self.name}: Hintergrund-Messung gestartet")
+    
+    def stop_background(self) -> None:
+        """Beendet den Hintergrund-Thread"""
+        if self._poll_thread is None:
+            return
+        
+        self._poll_stop.set()
+        self._poll_thread.join(timeout=10)
+        self._poll_thread = None
+    
+    def is_polling(self) -> bool:
+        """Prüft ob der Hintergrund-Thread läuft"""
+        return self._poll_thread is not None and self._poll_thread.is_alive()
+    
+    def _poll_loop(self) -> None:
+        """Misst im adaptiven Intervall, bis stop_background() aufgerufen wird"""
+        while not self._poll_stop.is_set():
+            try:
+                self._read_once()
+            except Exception as e:
+                logger.error("%s: Fehler in Hintergrund-Messung: %s", self.name, e)
+            
+            self._poll_stop.wait(self.schedule_next_poll())
+    
+    def _track_change(self, temperature: float, humidity: float) -> None:
+        """Aktualisiert den gleitenden Mittelwert der Änderung zwischen zwei Messungen"""
+        if self._last_temp is not None and self._last_hum is not None:
+            delta = max(abs(temperature - self._last_temp) / self.POLL_TARGET_TEMP_DELTA,
+                        abs(humidity - self._last_hum) / self.POLL_TARGET_HUMIDITY_DELTA)
+            weight = self.POLL_EWMA_WEIGHT
+            self._delta_ewma = (1 - weight) * self._delta_ewma + weight * delta
+        
+        self._last_temp = temperature
+        self._last_hum = humidity
+    
+    def schedule_next_poll(self) -> float:
+        """
+        Berechnet das nächste Poll-Intervall aus der beobachteten Änderungsrate
+        
+        Ändern sich die Werte pro Messung um mehr als die Zielwerte, wird das
+        Intervall kürzer, bei ruhiger Raumluft länger (POLL_INTERVAL_MIN..MAX).
+        
+        Returns:
+            Wartezeit bis zur nächsten Messung in Sekunden
+        """
+        interval = self.poll_interval / max(self._delta_ewma, 1e-3)
+        self.poll_interval = min(self.POLL_INTERVAL_MAX,
+                                 max(self.POLL_INTERVAL_MIN, self.min_reading_interval, interval))
+        return self.poll_interval
+    
+    def _read_once(self, retries: int = 3) -> Dict[str, Optional[float]]:
+        """Führt eine Messung durch (Hardware-Zugriffe sind gegeneinander gesperrt)"""
+        with self._read_lock:
+            return self._measure(retries)
+    
+    def _dummy_reading(self) -> Dict[str, Optional[float]]:
+        """Feste Dummy-Werte für Entwicklung ohne DHT22"""
+        logger.warning("%s: DHT22 nicht verfügbar - verwende Dummy-Daten", self.name)
+        return {
+            'temperature': 20.0,  # Dummy-Werte für Tests
+            'humidity': 50.0,
+            'dew_point': 9.3,
+            'timestamp': _now_iso()
+        }
+    
+    def _measure(self, retries: int) -> Dict[str, Optional[float]]:
+        """Eigentliche DHT22-Messung mit Wiederholungsversuchen"""
+        if not self.is_available:
+            return self._dummy_reading()
+        
+        if self._consecutive_failures >= self.MAX_CONSECUTIVE_FAILURES:
+            if self.power_pin is not None:
+                self._power_cycle()
+            else:
+                # Hängender Sensor: letzte gültige Messung statt erneuter Versuche
+                with self._lock:
+                    cache = self._cache
+                    age = time.monotonic() - self._cache_ts
+                if cache is not None and age < self.MAX_SNAPSHOT_AGE:
+                    return dict(cache)
+                retries = 1
         
         self._wait_for_reading_interval()
         
@@ -138,62 +474,130 @@ class HeatingRoomSensor:
                 temperature = None
                 humidity = None
                 
-                if DHT_METHOD == "adafruit":
+                if self._method == "adafruit":
                     # Adafruit CircuitPython DHT
                     temperature = self.dht.temperature
                     humidity = self.dht.humidity
                     
-                elif DHT_METHOD == "legacy":
+                elif self._method == "legacy":
                     # Legacy Adafruit_DHT
                     humidity, temperature = Adafruit_DHT.read_retry(self.dht, self.pin)
                     
-                elif DHT_METHOD == "pigpio":
+                elif self._method == "pigpio":
                     # Pigpio DHT22
-                    self.dht.trigger()
-                    time.sleep(0.2)
+                    self._trigger_pigpio()
                     humidity = self.dht.humidity()
                     temperature = self.dht.temperature()
                 
-                self.last_reading_time = time.time()
+                self.last_reading_time = time.monotonic()
                 
                 if humidity is not None and temperature is not None:
                     # Plausibilitätsprüfung
                     if 0 <= humidity <= 100 and -20 <= temperature <= 50:
-                        logger.debug(f"{self.name}: {temperature:.1f}°C, {humidity:.1f}%RH")
+                        logger.debug("%s: %.1f°C, %.1f%%RH", self.name, temperature, humidity)
                         
                         # Taupunkt berechnen
                         dew_point = self._calculate_dew_point(temperature, humidity)
                         
-                        return {
+                        reading = {
                             'temperature': round(temperature, 1),
                             'humidity': round(humidity, 1),
                             'dew_point': dew_point,
-                            'timestamp': datetime.utcnow().isoformat()
+                            'timestamp': _now_iso()
                         }
+                        with self._lock:
+                            self._cache = reading
+                            self._cache_ts = self.last_reading_time
+                        self._consecutive_failures = 0
+                        self._track_change(reading['temperature'], reading['humidity'])
+                        return dict(reading)
                     else:
-                        logger.warning(f"{self.name}: Ungültige Werte - T:{temperature}°C, H:{humidity}%")
+                        logger.warning("%s: Ungültige Werte - T:%s°C, H:%s%%", self.name, temperature, humidity)
                 
                 if attempt < retries - 1:
-                    time.sleep(1)
+                    time.sleep(self._retry_delay(attempt))
                     
             except RuntimeError as e:
-                # DHT22 spezifische Fehler (z.B. Timing, Checksum)
-                logger.warning(f"{self.name}: DHT22-Fehler (Versuch {attempt + 1}): {e}")
+                # DHT22 spezifische Fehler (z.B. Timing, Checksum) - der Treiber misst
+                # frühestens nach min_reading_interval neu
+                logger.warning("%s: DHT22-Fehler (Versuch %d): %s", self.name, attempt + 1, e)
                 if attempt < retries - 1:
-                    time.sleep(2)  # Längere Pause bei DHT-Fehlern
+                    time.sleep(max(self._retry_delay(attempt), self.min_reading_interval))
             except Exception as e:
-                logger.error(f"{self.name}: Messfehler (Versuch {attempt + 1}): {e}")
+                logger.error("%s: Messfehler (Versuch %d): %s", self.name, attempt + 1, e)
                 if attempt < retries - 1:
-                    time.sleep(1)
+                    time.sleep(self._retry_delay(attempt))
         
-        logger.error(f"{self.name}: Alle Messversuche fehlgeschlagen")
+        self._consecutive_failures += 1
+        logger.error("%s: Alle Messversuche fehlgeschlagen (%d in Folge)",
+                     self.name, self._consecutive_failures)
         return {
             'temperature': None,
             'humidity': None,
             'dew_point': None,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }
     
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Pause nach dem Fehlversuch attempt (0.5 s, 1 s, 2 s, ... begrenzt)
+        
+        adafruit_dht liefert innerhalb von min_reading_interval die zwischengespeicherte
+        Messung erneut - kürzere Pausen würden denselben ungültigen Frame noch einmal lesen.
+        """
+        delay = min(self.RETRY_BACKOFF_BASE * 2 ** attempt, self.RETRY_BACKOFF_MAX)
+        if self._method == "adafruit":
+            delay = max(delay, self.min_reading_interval)
+        return delay
+    
+    def _power_cycle(self) -> None:
+        """Startet einen hängenden DHT22 neu, indem power_pin die Versorgung kurz abschaltet"""
+        logger.warning("%s: %d Fehlmessungen in Folge - Neustart über GPIO %d",
+                       self.name, self._consecutive_failures, self.power_pin)
+        try:
+            # Blinka (digitalio/board) statt RPi.GPIO - funktioniert auch mit dem RP1 des Pi 5
+            if self._power_io is None:
+                import board
+                import digitalio
+                
+                board_pin = BOARD_PINS.get(self.power_pin) or getattr(board, f'D{self.power_pin}')
+                self._power_io = digitalio.DigitalInOut(board_pin)
+                self._power_io.switch_to_output(value=True)
+            
+            self._power_io.value = False
+            time.sleep(self.POWER_CYCLE_OFF_TIME)
+            # Ausgang bleibt belegt und hält die Versorgung eingeschaltet
+            self._power_io.value = True
+            time.sleep(self.POWER_CYCLE_ON_TIME)
+        except Exception as e:
+            # Ohne schaltbare Versorgung zurück auf die letzte gültige Messung
+            logger.error("%s: Neustart über GPIO %d fehlgeschlagen: %s", self.name, self.power_pin, e)
+            self.power_pin = None
+        
+        self._consecutive_failures = 0
+    
+    def _trigger_pigpio(self, timeout: float = 0.3) -> None:
+        """
+        Startet eine pigpio-Messung und wartet nur so lange, bis sie vorliegt
+        
+        Das DHT22-Modul dekodiert die Antwort per Flanken-Callback im pigpio-Daemon;
+        staleness() sinkt unter die seit dem Trigger vergangene Zeit, sobald eine
+        neue Messung eingetroffen ist (typisch nach ~20 ms statt fester 200 ms).
+        """
+        staleness = getattr(self.dht, 'staleness', None)
+        start = time.monotonic()
+        self.dht.trigger()
+        
+        if staleness is None:
+            time.sleep(0.2)
+            return
+        
+        while True:
+            elapsed = time.monotonic() - start
+            if 0 <= staleness() < elapsed or elapsed >= timeout:
+                return
+            time.sleep(0.01)
+    
     def _calculate_dew_point(self, temperature: float, humidity: float) -> Optional[float]:
         """
         Berechnet den Taupunkt nach Magnus-Formel
@@ -206,21 +610,13 @@ class HeatingRoomSensor:
             Taupunkt in °C
         """
         try:
-            import math
-            
-            a = 17.27
-            b = 237.7
-            
-            alpha = ((a * temperature) / (b + temperature)) + math.log(humidity / 100.0)
-            dew_point = (b * alpha) / (a - alpha)
-            
-            return round(dew_point, 1)
+            return _dew_point_cached(round(temperature * 10), round(humidity * 10))
             
         except Exception as e:
-            logger.error(f"Taupunkt-Berechnung fehlgeschlagen: {e}")
+            logger.error("Taupunkt-Berechnung fehlgeschlagen: %s", e)
             return None
     
-    def check_condensation_risk(self, pipe_temperature: float = None) -> Dict[str, any]:
+    def check_condensation_risk(self, pipe_temperature: float = None) -> CondensationRisk:
         """
         Prüft das Kondensationsrisiko an Rohrleitungen
         
@@ -228,15 +624,12 @@ class HeatingRoomSensor:
             pipe_temperature: Temperatur der kältesten Rohrleitung
             
         Returns:
-            Dictionary mit Kondensationsrisiko-Bewertung
+            CondensationRisk mit Kondensationsrisiko-Bewertung
         """
         data = self.read_sensor_data()
         
         if data['dew_point'] is None:
-            return {
-                'risk_level': 'unbekannt',
-                'message': 'Sensor-Daten nicht verfügbar'
-            }
+            return CondensationRisk(message='Sensor-Daten nicht verfügbar')
         
         dew_point = data['dew_point']
         
@@ -245,42 +638,35 @@ class HeatingRoomSensor:
             if data['temperature'] is not None:
                 pipe_temperature = data['temperature'] - 5
             else:
-                return {
-                    'risk_level': 'unbekannt',
-                    'message': 'Keine Referenztemperatur verfügbar'
-                }
+                return CondensationRisk(message='Keine Referenztemperatur verfügbar')
         
         # Kondensationsrisiko bewerten
         temp_diff = pipe_temperature - dew_point
         
-        if temp_diff < 0:
-            risk_level = 'hoch'
-            message = f'Kondensation wahrscheinlich! Rohr: {pipe_temperature:.1f}°C < Taupunkt: {dew_point:.1f}°C'
-        elif temp_diff < 2:
-            risk_level = 'mittel'
-            message = f'Kondensationsrisiko vorhanden. Differenz: {temp_diff:.1f}°C'
-        elif temp_diff < 5:
-            risk_level = 'gering'
-            message = f'Geringes Risiko. Sicherheitsabstand: {temp_diff:.1f}°C'
-        else:
-            risk_level = 'minimal'
-            message = f'Kein Kondensationsrisiko. Sicherheitsabstand: {temp_diff:.1f}°C'
-        
-        return {
-            'risk_level': risk_level,
-            'message': message,
-            'dew_point': dew_point,
-            'pipe_temperature': pipe_temperature,
-            'temperature_difference': temp_diff,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        level = bisect_right(_CONDENSATION_BOUNDS, temp_diff)
+        risk_level = _CONDENSATION_LEVELS[level]
+        message = _CONDENSATION_MESSAGES[level].format(
+            pipe=pipe_temperature, dew=dew_point, diff=temp_diff
+        )
+        
+        return CondensationRisk(
+            risk_level=risk_level,
+            message=message,
+            dew_point=dew_point,
+            pipe_temperature=pipe_temperature,
+            temperature_difference=temp_diff,
+            timestamp=_now_iso()
+        )
     
-    def check_heating_room_conditions(self) -> Dict[str, any]:
+    def check_heating_room_conditions(self, out: Optional[RoomConditions] = None) -> RoomConditions:
         """
         Überprüft die Heizungsraum-Bedingungen auf Probleme
         
+        Args:
+            out: Optionales RoomConditions-Objekt, das wiederverwendet und in-place befüllt wird
+        
         Returns:
-            Dictionary mit Zustandsbewertung und Alarmen
+            RoomConditions mit Zustandsbewertung und Alarmen
         """
         data = self.read_sensor_data()
         temperature = data['temperature']
@@ -323,51 +709,33 @@ class HeatingRoomSensor:
             })
             status = 'fehler'
         
-        return {
-            'status': status,
-            'temperature': temperature,
-            'humidity': humidity,
-            'dew_point': data['dew_point'],
-            'alerts': alerts,
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        result = out if out is not None else RoomConditions()
+        result.status = status
+        result.temperature = temperature
+        result.humidity = humidity
+        result.dew_point = data['dew_point']
+        result.alerts = alerts
+        result.timestamp = _now_iso()
+        
+        return result
     
-    def get_comfort_assessment(self) -> Dict[str, any]:
+    def get_comfort_assessment(self) -> ComfortAssessment:
         """
         Bewertet die Komfort-Bedingungen im Heizungsraum
         
         Returns:
-            Dictionary mit Komfort-Bewertung
+            ComfortAssessment mit Komfort-Bewertung
         """
         data = self.read_sensor_data()
         temperature = data['temperature']
         humidity = data['humidity']
         
         if temperature is None or humidity is None:
-            return {
-                'comfort_level': 'unbekannt',
-                'message': 'Sensor-Daten nicht verfügbar'
-            }
+            return ComfortAssessment(message='Sensor-Daten nicht verfügbar')
         
         # Komfort-Bewertung für Heizungsraum (Arbeitsplatz-Standards)
-        temp_comfort = 'unbekannt'
-        humidity_comfort = 'unbekannt'
-        
-        # Temperatur-Komfort
-        if 18 <= temperature <= 24:
-            temp_comfort = 'optimal'
-        elif 15 <= temperature <= 27:
-            temp_comfort = 'akzeptabel'
-        else:
-            temp_comfort = 'unkomfortabel'
-        
-        # Luftfeuchtigkeit-Komfort
-        if 40 <= humidity <= 60:
-            humidity_comfort = 'optimal'
-        elif 30 <= humidity <= 70:
-            humidity_comfort = 'akzeptabel'
-        else:
-            humidity_comfort = 'unkomfortabel'
+        temp_comfort = _COMFORT_LABELS[bisect_right(_TEMP_COMFORT_BOUNDS, temperature)]
+        humidity_comfort = _COMFORT_LABELS[bisect_right(_HUMIDITY_COMFORT_BOUNDS, humidity)]
         
         # Gesamt-Komfort
         if temp_comfort == 'optimal' and humidity_comfort == 'optimal':
@@ -377,34 +745,20 @@ class HeatingRoomSensor:
         else:
             overall_comfort = 'verbesserungsbedürftig'
         
-        return {
-            'comfort_level': overall_comfort,
-            'temperature_comfort': temp_comfort,
-            'humidity_comfort': humidity_comfort,
-            'temperature': temperature,
-            'humidity': humidity,
-            'recommendations': self._get_comfort_recommendations(temperature, humidity),
-            'timestamp': datetime.utcnow().isoformat()
-        }
+        return ComfortAssessment(
+            comfort_level=overall_comfort,
+            temperature_comfort=temp_comfort,
+            humidity_comfort=humidity_comfort,
+            temperature=temperature,
+            humidity=humidity,
+            recommendations=self._get_comfort_recommendations(temperature, humidity),
+            timestamp=_now_iso()
+        )
     
     def _get_comfort_recommendations(self, temperature: float, humidity: float) -> List[str]:
         """Gibt Empfehlungen zur Verbesserung der Raumbedingungen"""
-        recommendations = []
-        
-        if temperature < 15:
-            recommendations.append("Heizung erhöhen - Temperatur zu niedrig")
-        elif temperature > 27:
-            recommendations.append("Belüftung verbessern - Temperatur zu hoch")
-        
-        if humidity < 30:
-            recommendations.append("Luftfeuchtigkeit zu niedrig - Luftbefeuchter erwägen")
-        elif humidity > 70:
-            recommendations.append("Luftfeuchtigkeit zu hoch - Entfeuchtung oder Belüftung verbessern")
-        
-        if not recommendations:
-            recommendations.append("Raumbedingungen sind optimal")
-        
-        return recommendations
+        recommendations = [text for rule, text in _COMFORT_RULES if rule(temperature, humidity)]
+        return recommendations or ["Raumbedingungen sind optimal"]
     
     def test_sensor(self) -> bool:
         """
@@ -416,7 +770,7 @@ class HeatingRoomSensor:
         logger.info(f"Teste {self.name} Sensor...")
         
         try:
-            data = self.read_sensor_data(retries=5)
+            data = self.read_sensor_data(retries=5, force=True)
             
             if data['temperature'] is not None and data['humidity'] is not None:
                 logger.info(f"✅ {self.name}: {data['temperature']:.1f}°C, {data['humidity']:.1f}%RH")
@@ -425,7 +779,7 @@ class HeatingRoomSensor:
                 
                 # Kondensationsrisiko-Check
                 condensation = self.check_condensation_risk()
-                logger.info(f"💧 Kondensationsrisiko: {condensation['risk_level']}")
+                logger.info(f"💧 Kondensationsrisiko: {condensation.risk_level}")
                 
                 return True
             else:
@@ -438,10 +792,26 @@ class HeatingRoomSensor:
     
     def cleanup(self):
         """Sensor-Ressourcen freigeben"""
+        self.stop_background()
+        
+        dht, self.dht = self.dht, None
+        pi, self.pi = self.pi, None
+        power_io, self._power_io = self._power_io, None
+        
         try:
-            if hasattr(self, 'dht'):
-                self.dht.exit()
+            if power_io is not None:
+                power_io.deinit()
+            if self._method == "adafruit" and dht is not None:
+                if self._release_handle(self.pin):
+                    dht.exit()
+                logger.info(f"{self.name}: Sensor-Ressourcen freigegeben")
+            elif self._method == "pigpio" and dht is not None:
+                # Flanken-Callback beenden und pigpiod-Verbindung schließen
+                dht.cancel()
+                if pi is not None:
+                    pi.stop()
                 logger.info(f"{self.name}: Sensor-Ressourcen freigegeben")
+            # legacy (Adafruit_DHT) hält keine Ressourcen - self.dht ist nur die Typ-Konstante
         except Exception as e:
             logger.warning(f"{self.name}: Cleanup-Warnung - {e}")
     
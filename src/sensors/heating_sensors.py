@@ -3,56 +3,254 @@ Heizungskreis-spezifische Sensor-Logik
 Verwaltet DS18B20 Sensoren für Vor- und Rückläufe der Heizungskreise
 """
 
+import os
 import time
+import asyncio
 import logging
+from bisect import bisect_right
+from statistics import fmean
 import yaml
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import InitVar, dataclass, field
+from concurrent.futures import Executor
 from w1thermsensor import W1ThermSensor, Sensor
 
+# libyaml-Bindings sind optional - sonst reine Python-Implementierung
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
 logger = logging.getLogger(__name__)
 
+# Sysfs-Pfad der 1-Wire Geräte (Temperatur steht in w1_slave als "... t=21375")
+W1_DEVICES_DIR = '/sys/bus/w1/devices'
+# Neuere Kernel (w1_therm, Linux >= 5.10) liefern zusätzlich "temperature" mit bereits
+# geprüftem Wert in Milligrad ("21375\n") - kein CRC-Text mehr zu parsen
+W1_TEMPERATURE_ATTR = 'temperature'
+W1_SLAVE_ATTR = 'w1_slave'
+# Kernel-Schnittstelle für gleichzeitige Messung aller Sensoren eines Busses (w1_therm,
+# Linux >= 5.10): "trigger" sendet SKIP ROM + CONVERT T an alle DS18B20 auf einmal
+W1_BULK_READ_ATTR = 'therm_bulk_read'
+# Power-On-Reset Wert des DS18B20 - kein gültiger Messwert
+_W1_RESET_VALUE = 85000
+
+# Ab dieser Temperaturdifferenz (°C) gilt ein Heizkreis als aktiv
+ACTIVE_DIFF_THRESHOLD = 2.0
+
+# Effizienz-Rating nach Temperaturdifferenz: < 5°C, ab 5°C, ab 10°C, ab 15°C
+EFFICIENCY_RATING_THRESHOLDS = (5, 10, 15)
+EFFICIENCY_RATINGS = ("schlecht", "befriedigend", "gut", "sehr_gut")
+
+
+def discover_sensors() -> Dict[str, W1ThermSensor]:
+    """Durchsucht den 1-Wire Bus einmalig nach DS18B20 Sensoren ({ID: Sensor})"""
+    return {sensor.id: sensor for sensor in W1ThermSensor.get_available_sensors([Sensor.DS18B20])}
+
+
+def find_bulk_read_paths() -> List[str]:
+    """therm_bulk_read Pfade aller Bus-Master (leer, wenn der Kernel keinen Bulk-Read kennt)"""
+    try:
+        with os.scandir(W1_DEVICES_DIR) as entries:
+            masters = [entry.path for entry in entries if entry.name.startswith('w1_bus_master')]
+    except OSError:
+        return []
+    
+    paths = (os.path.join(master, W1_BULK_READ_ATTR) for master in sorted(masters))
+    return [path for path in paths if os.path.exists(path)]
+
+
+def temperature_difference(flow_temp: Optional[float], return_temp: Optional[float]) -> Optional[float]:
+    """Differenz Vorlauf - Rücklauf (None, falls ein Wert fehlt)"""
+    if flow_temp is None or return_temp is None:
+        return None
+    return round(flow_temp - return_temp, 2)
+
+
+def is_active_diff(diff: Optional[float]) -> bool:
+    """Prüft anhand der Temperaturdifferenz, ob ein Heizkreis aktiv ist"""
+    return diff is not None and diff > ACTIVE_DIFF_THRESHOLD
+
+
+def classify_efficiency(diff: Optional[float]) -> Optional[str]:
+    """Effizienz-Rating zur Temperaturdifferenz ("sehr_gut", "gut", "befriedigend" oder "schlecht")"""
+    if diff is None:
+        return None
+    return EFFICIENCY_RATINGS[bisect_right(EFFICIENCY_RATING_THRESHOLDS, diff)]
+
 @dataclass
 class HeatingCircuit:
-    """Repräsentiert einen Heizungskreis mit Vor- und Rücklauf"""
+    """
+    Repräsentiert einen Heizungskreis mit Vor- und Rücklauf
+    
+    resolution legt die DS18B20-Auflösung fest: 9 Bit misst in ~94 ms mit 0.5°C
+    Schritten, 12 Bit (Werkseinstellung) braucht ~750 ms für 0.0625°C. Für die
+    Vor-/Rücklauf-Differenz (Schwellen 2-15°C) genügen 9 Bit. None = unverändert.
+    
+    Gültige Messungen werden cache_ttl Sekunden wiederverwendet (0 = immer neu messen),
+    damit häufige Abfragen (Dashboard, Alarme) nicht jedes Mal den Bus belegen.
+    """
     name: str
     flow_sensor_id: str
     return_sensor_id: str
     target_temp: float
+    resolution: Optional[int] = None
+    cache_ttl: float = 5.0
     flow_sensor: Optional[W1ThermSensor] = None
     return_sensor: Optional[W1ThermSensor] = None
+    _flow_fd: Optional[int] = field(default=None, init=False, repr=False)
+    _return_fd: Optional[int] = field(default=None, init=False, repr=False)
+    # True, wenn die Deskriptoren auf das "temperature" Attribut zeigen (sonst w1_slave)
+    _fd_parsed: bool = field(default=False, init=False, repr=False)
+    _cache: Tuple[Optional[float], Optional[float]] = field(default=(None, None), init=False, repr=False)
+    _cache_ts: Optional[float] = field(default=None, init=False, repr=False)
+    # Bereits ermittelte Sensoren {ID: Sensor} - spart den Bus-Scan pro Heizkreis
+    available_sensors: InitVar[Optional[Dict[str, W1ThermSensor]]] = None
     
-    def __post_init__(self):
+    def __post_init__(self, available_sensors: Optional[Dict[str, W1ThermSensor]]):
         """Initialisiert die Sensoren nach der Erstellung"""
-        self._initialize_sensors()
+        self._initialize_sensors(available_sensors)
+        
+        # Sysfs-Dateien einmalig öffnen - pro Zyklus nur noch ein pread()
+        # "temperature" bevorzugen, wenn der Kernel es für beide Sensoren anbietet
+        ids = [sensor_id for sensor_id, sensor in ((self.flow_sensor_id, self.flow_sensor),
+                                                   (self.return_sensor_id, self.return_sensor))
+               if sensor]
+        self._fd_parsed = bool(ids) and all(
+            os.path.exists(os.path.join(W1_DEVICES_DIR, sensor_id, W1_TEMPERATURE_ATTR))
+            for sensor_id in ids
+        )
+        attr = W1_TEMPERATURE_ATTR if self._fd_parsed else W1_SLAVE_ATTR
+        if self.flow_sensor:
+            self._flow_fd = self._open_w1_attr(self.flow_sensor_id, attr)
+        if self.return_sensor:
+            self._return_fd = self._open_w1_attr(self.return_sensor_id, attr)
     
-    def _initialize_sensors(self) -> None:
-        """Initialisiert die DS18B20 Sensoren für diesen Heizkreis"""
+    def _initialize_sensors(self, available_sensors: Optional[Dict[str, W1ThermSensor]] = None) -> None:
+        """
+        Initialisiert die DS18B20 Sensoren für diesen Heizkreis
+        
+        Args:
+            available_sensors: Ergebnis von discover_sensors() (None = Bus selbst durchsuchen)
+        """
         try:
-            available_sensors = W1ThermSensor.get_available_sensors([Sensor.DS18B20])
+            if available_sensors is None:
+                available_sensors = discover_sensors()
             
             # Vorlauf-Sensor finden
-            for sensor in available_sensors:
-                if sensor.id == self.flow_sensor_id:
-                    self.flow_sensor = sensor
-                    logger.info(f"Vorlauf-Sensor für {self.name} gefunden: {self.flow_sensor_id}")
-                    break
+            self.flow_sensor = available_sensors.get(self.flow_sensor_id)
+            if self.flow_sensor is not None:
+                logger.info(f"Vorlauf-Sensor für {self.name} gefunden: {self.flow_sensor_id}")
             else:
                 logger.warning(f"Vorlauf-Sensor {self.flow_sensor_id} für {self.name} nicht gefunden")
             
             # Rücklauf-Sensor finden
-            for sensor in available_sensors:
-                if sensor.id == self.return_sensor_id:
-                    self.return_sensor = sensor
-                    logger.info(f"Rücklauf-Sensor für {self.name} gefunden: {self.return_sensor_id}")
-                    break
+            self.return_sensor = available_sensors.get(self.return_sensor_id)
+            if self.return_sensor is not None:
+                logger.info(f"Rücklauf-Sensor für {self.name} gefunden: {self.return_sensor_id}")
             else:
                 logger.warning(f"Rücklauf-Sensor {self.return_sensor_id} für {self.name} nicht gefunden")
+            
+            if self.resolution is not None:
+                for sensor in (self.flow_sensor, self.return_sensor):
+                    if sensor is not None:
+                        self._apply_resolution(sensor)
                 
         except Exception as e:
             logger.error(f"Fehler beim Initialisieren der Sensoren für {self.name}: {e}")
     
+    def _apply_resolution(self, sensor: W1ThermSensor) -> None:
+        """Setzt die konfigurierte Auflösung (nur bei Abweichung - das EEPROM hat begrenzte Schreibzyklen)"""
+        try:
+            if sensor.get_resolution() != self.resolution:
+                sensor.set_resolution(self.resolution, persist=True)
+                logger.info(f"{self.name}: Sensor {sensor.id} auf {self.resolution} Bit gesetzt")
+        except Exception as e:
+            # Schreiben erfordert Root-Rechte - Sensor misst dann weiter mit bisheriger Auflösung
+            logger.warning(f"{self.name}: Auflösung für {sensor.id} nicht setzbar: {e}")
+    
+    @staticmethod
+    def _open_w1_attr(sensor_id: str, attr: str = W1_SLAVE_ATTR) -> Optional[int]:
+        """Öffnet eine Sysfs-Datei eines Sensors dauerhaft (None falls nicht möglich)"""
+        try:
+            return os.open(os.path.join(W1_DEVICES_DIR, sensor_id, attr), os.O_RDONLY)
+        except OSError as e:
+            logger.debug(f"{attr} für {sensor_id} nicht direkt lesbar, nutze w1thermsensor: {e}")
+            return None
+    
+    @staticmethod
+    def _read_w1_fd(fd: int, parsed: bool = False) -> float:
+        """
+        Liest die Temperatur über einen bereits geöffneten Sysfs-Deskriptor
+        
+        Der Kernel führt bei jedem Lesen ab Offset 0 eine neue 1-Wire Messung durch
+        (bzw. liefert nach einem Bulk-Trigger den bereits gewandelten Wert).
+        
+        Args:
+            fd: Deskriptor auf "temperature" (parsed=True) oder "w1_slave"
+            parsed: Kernel liefert bereits den geprüften Milligrad-Wert
+        """
+        if parsed:
+            # CRC prüft der Kernel selbst - Lesefehler kommen als OSError
+            return HeatingCircuit._check_raw(int(os.pread(fd, 16, 0)))
+        
+        data = os.pread(fd, 128, 0)
+        
+        if b'YES' not in data:
+            raise ValueError("CRC-Prüfung fehlgeschlagen")
+        
+        # Format: "<scratchpad> : crc=.. YES\n<scratchpad> t=21375\n"
+        pos = data.rfind(b't=')
+        if pos < 0:
+            raise ValueError(f"Unerwartetes w1_slave Format: {data!r}")
+        
+        return HeatingCircuit._check_raw(int(data[pos + 2:]))
+    
+    @staticmethod
+    def _check_raw(raw: int) -> float:
+        """Wandelt einen Milligrad-Rohwert um und verwirft den Power-On-Reset Wert"""
+        if raw == _W1_RESET_VALUE:
+            raise ValueError("Sensor meldet Reset-Wert (85°C)")
+        
+        return raw / 1000.0
+    
+    def _read_sensor(self, sensor: Optional[W1ThermSensor], label: str,
+                     fd: Optional[int] = None) -> Optional[float]:
+        """Liest einen einzelnen Sensor dieses Heizkreises"""
+        if not sensor:
+            return None
+        
+        try:
+            if fd is not None:
+                temperature = round(self._read_w1_fd(fd, self._fd_parsed), 2)
+            else:
+                temperature = round(sensor.get_temperature(), 2)
+            logger.debug(f"{self.name} {label}: {temperature}°C")
+            return temperature
+        except Exception as e:
+            logger.error(f"Fehler beim Lesen des {label}-Sensors {self.name}: {e}")
+            return None
+    
+    def read_flow_temperature(self) -> Optional[float]:
+        """Liest die Vorlauf-Temperatur"""
+        return self._read_sensor(self.flow_sensor, "Vorlauf", self._flow_fd)
+    
+    def read_return_temperature(self) -> Optional[float]:
+        """Liest die Rücklauf-Temperatur"""
+        return self._read_sensor(self.return_sensor, "Rücklauf", self._return_fd)
+    
+    def close(self) -> None:
+        """Schließt die dauerhaft geöffneten Sysfs-Deskriptoren"""
+        for fd in (self._flow_fd, self._return_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._flow_fd = None
+        self._return_fd = None
+    
     def read_temperatures(self) -> Tuple[Optional[float], Optional[float]]:
         """
         Liest Vor- und Rücklauf-Temperaturen
@@ -60,28 +258,41 @@ class HeatingCircuit:
         Returns:
             Tuple (Vorlauf-Temperatur, Rücklauf-Temperatur)
         """
-        flow_temp = None
-        return_temp = None
-        
-        # Vorlauf-Temperatur lesen
-        if self.flow_sensor:
-            try:
-                flow_temp = round(self.flow_sensor.get_temperature(), 2)
-                logger.debug(f"{self.name} Vorlauf: {flow_temp}°C")
-            except Exception as e:
-                logger.error(f"Fehler beim Lesen des Vorlauf-Sensors {self.name}: {e}")
-        
-        # Kurze Pause zwischen Sensoren
-        time.sleep(0.1)
-        
-        # Rücklauf-Temperatur lesen
-        if self.return_sensor:
-            try:
-                return_temp = round(self.return_sensor.get_temperature(), 2)
-                logger.debug(f"{self.name} Rücklauf: {return_temp}°C")
-            except Exception as e:
-                logger.error(f"Fehler beim Lesen des Rücklauf-Sensors {self.name}: {e}")
+        cached = self.cached_temperatures()
+        if cached is not None:
+            return cached
         
+        flow_temp, return_temp = self.read_flow_temperature(), self.read_return_temperature()
+        self.remember_temperatures(flow_temp, return_temp)
+        return flow_temp, return_temp
+    
+    def cached_temperatures(self) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        """Gibt die letzte Messung zurück, solange sie jünger als cache_ttl ist (sonst None)"""
+        if self._cache_ts is None or time.monotonic() - self._cache_ts >= self.cache_ttl:
+            return None
+        return self._cache
+    
+    def remember_temperatures(self, flow_temp: Optional[float], return_temp: Optional[float]) -> None:
+        """Merkt sich eine vollständige Messung - Fehlmessungen werden nicht zwischengespeichert"""
+        if flow_temp is not None and return_temp is not None:
+            self._cache = (flow_temp, return_temp)
+            self._cache_ts = time.monotonic()
+    
+    def invalidate(self) -> None:
+        """Verwirft die zwischengespeicherte Messung (nächster Aufruf liest die Sensoren)"""
+        self._cache_ts = None
+    
+    async def aread_temperatures(self) -> Tuple[Optional[float], Optional[float]]:
+        """Liest Vor- und Rücklauf gleichzeitig in Worker-Threads (für asyncio-Aufrufer)"""
+        cached = self.cached_temperatures()
+        if cached is not None:
+            return cached
+        
+        flow_temp, return_temp = await asyncio.gather(
+            asyncio.to_thread(self.read_flow_temperature),
+            asyncio.to_thread(self.read_return_temperature)
+        )
+        self.remember_temperatures(flow_temp, return_temp)
         return flow_temp, return_temp
     
     def calculate_temperature_difference(self) -> Optional[float]:
@@ -91,14 +302,10 @@ class HeatingCircuit:
         Returns:
             Temperaturdifferenz in °C oder None bei Fehlern
         """
-        flow_temp, return_temp = self.read_temperatures()
-        
-        if flow_temp is not None and return_temp is not None:
-            diff = round(flow_temp - return_temp, 2)
+        diff = temperature_difference(*self.read_temperatures())
+        if diff is not None:
             logger.debug(f"{self.name} Temperaturdifferenz: {diff}°C")
-            return diff
-        
-        return None
+        return diff
     
     def is_active(self) -> bool:
         """
@@ -107,8 +314,7 @@ class HeatingCircuit:
         Returns:
             True wenn Heizkreis aktiv ist
         """
-        diff = self.calculate_temperature_difference()
-        return diff is not None and diff > 2.0
+        return is_active_diff(self.calculate_temperature_difference())
     
     def get_efficiency_rating(self) -> Optional[str]:
         """
@@ -117,42 +323,51 @@ class HeatingCircuit:
         Returns:
             Effizienz-Rating: "sehr_gut", "gut", "befriedigend", "schlecht"
         """
-        diff = self.calculate_temperature_difference()
-        
-        if diff is None:
-            return None
-        
-        if diff >= 15:
-            return "sehr_gut"
-        elif diff >= 10:
-            return "gut"
-        elif diff >= 5:
-            return "befriedigend"
-        else:
-            return "schlecht"
+        return classify_efficiency(self.calculate_temperature_difference())
     
     def is_available(self) -> bool:
         """Prüft ob beide Sensoren verfügbar sind"""
         return self.flow_sensor is not None and self.return_sensor is not None
     
     def get_status(self) -> Dict[str, any]:
-        """Gibt den aktuellen Status des Heizkreises zurück"""
-        flow_temp, return_temp = self.read_temperatures()
-        diff = self.calculate_temperature_difference()
+        """Gibt den aktuellen Status des Heizkreises zurück (ein Lesevorgang pro Sensor)"""
+        return self.status_from(*self.read_temperatures())
+    
+    def status_from(self, flow_temp: Optional[float], return_temp: Optional[float],
+                    timestamp: Optional[str] = None) -> Dict[str, any]:
+        """
+        Baut den Status aus bereits gelesenen Temperaturen, ohne die Sensoren erneut zu lesen
+        
+        Args:
+            timestamp: Gemeinsamer ISO-Zeitstempel des Snapshots (Standard: jetzt)
+        """
+        diff = temperature_difference(flow_temp, return_temp)
         
         return {
             'name': self.name,
             'flow_temperature': flow_temp,
             'return_temperature': return_temp,
             'temperature_difference': diff,
-            'is_active': self.is_active(),
-            'efficiency_rating': self.get_efficiency_rating(),
+            'is_active': is_active_diff(diff),
+            'efficiency_rating': classify_efficiency(diff),
             'target_temperature': self.target_temp,
             'sensors_available': self.is_available(),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': timestamp or datetime.utcnow().isoformat()
         }
 
 
+@dataclass(slots=True)
+class SystemStatus:
+    """Momentaufnahme des gesamten Heizungssystems"""
+    timestamp: Optional[str] = None
+    total_circuits: int = 0
+    available_circuits: int = 0
+    active_circuits: int = 0
+    circuits: List[Dict[str, any]] = field(default_factory=list)
+    system_efficiency: Optional[float] = None
+    alerts: List[Dict[str, str]] = field(default_factory=list)
+
+
 class HeatingSystemManager:
     """Verwaltet alle Heizungskreise des Systems"""
     
@@ -165,25 +380,42 @@ class HeatingSystemManager:
         """
         self.config_file = config_file
         self.heating_circuits: List[HeatingCircuit] = []
+        self._by_name: Dict[str, HeatingCircuit] = {}  # casefold(Name) -> Heizkreis
         self._load_configuration()
+        
+        # Bus-Master mit Bulk-Read Unterstützung (leer = Sensoren einzeln messen)
+        self._bulk_read_paths = find_bulk_read_paths()
+        if self._bulk_read_paths:
+            logger.info(f"1-Wire Bulk-Read aktiv ({len(self._bulk_read_paths)} Bus-Master)")
     
     def _load_configuration(self) -> None:
         """Lädt die Heizungskreis-Konfiguration aus YAML-Datei"""
         try:
             with open(self.config_file, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
+                config = yaml.load(file, Loader=YamlLoader)
             
             circuits_config = config.get('heating_circuits', {})
             
+            # Bus nur einmal für alle Heizkreise durchsuchen
+            try:
+                available_sensors = discover_sensors()
+                logger.info(f"{len(available_sensors)} DS18B20 Sensoren gefunden")
+            except Exception as e:
+                logger.error(f"Fehler bei der Sensor-Suche: {e}")
+                available_sensors = {}
+            
             for circuit_id, circuit_config in circuits_config.items():
                 heating_circuit = HeatingCircuit(
                     name=circuit_config['name'],
                     flow_sensor_id=circuit_config['flow_sensor'],
                     return_sensor_id=circuit_config['return_sensor'],
-                    target_temp=circuit_config['target_temp']
+                    target_temp=circuit_config['target_temp'],
+                    resolution=circuit_config.get('resolution'),
+                    available_sensors=available_sensors
                 )
                 
                 self.heating_circuits.append(heating_circuit)
+                self._by_name.setdefault(heating_circuit.name.casefold(), heating_circuit)
                 logger.info(f"Heizkreis geladen: {heating_circuit.name}")
             
             logger.info(f"{len(self.heating_circuits)} Heizungskreise konfiguriert")
@@ -203,29 +435,32 @@ class HeatingSystemManager:
                     'name': 'Erdgeschoss',
                     'flow_sensor': '28-0000000001',
                     'return_sensor': '28-0000000002',
-                    'target_temp': 21.0
+                    'target_temp': 21.0,
+                    'resolution': 9
                 },
                 'obergeschoss': {
                     'name': 'Obergeschoss',
                     'flow_sensor': '28-0000000003',
                     'return_sensor': '28-0000000004',
-                    'target_temp': 20.0
+                    'target_temp': 20.0,
+                    'resolution': 9
                 },
                 'warmwasser': {
                     'name': 'Warmwasser',
                     'flow_sensor': '28-0000000005',
                     'return_sensor': '28-0000000006',
-                    'target_temp': 45.0
+                    'target_temp': 45.0,
+                    'resolution': 9
                 }
             }
         }
         
         try:
-            import os
             os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
             
             with open(self.config_file, 'w', encoding='utf-8') as file:
-                yaml.dump(example_config, file, default_flow_style=False, allow_unicode=True)
+                yaml.dump(example_config, file, Dumper=YamlDumper,
+                          default_flow_style=False, allow_unicode=True)
             
             logger.info(f"Beispiel-Konfiguration erstellt: {self.config_file}")
             logger.info("Bitte passe die Sensor-IDs an deine Hardware an!")
@@ -233,38 +468,181 @@ class HeatingSystemManager:
         except Exception as e:
             logger.error(f"Fehler beim Erstellen der Beispiel-Konfiguration: {e}")
     
-    def get_all_temperatures(self) -> Dict[str, Dict[str, Optional[float]]]:
+    def _trigger_bulk_conversion(self) -> bool:
+        """
+        Startet die Temperaturmessung aller DS18B20 gleichzeitig
+        
+        Returns:
+            True wenn die Messung gestartet wurde (sonst einzeln messen)
+        """
+        if not self._bulk_read_paths:
+            return False
+        
+        try:
+            for path in self._bulk_read_paths:
+                with open(path, 'w') as f:
+                    f.write('trigger\n')
+            return True
+        except OSError as e:
+            logger.warning(f"1-Wire Bulk-Read nicht möglich, messe Sensoren einzeln: {e}")
+            self._bulk_read_paths = []
+            return False
+    
+    def read_all_bulk(self) -> Optional[Dict[str, Optional[float]]]:
+        """
+        Liest alle Sensoren mit einer gemeinsamen Wandlung (~750 ms statt ~750 ms pro Sensor)
+        
+        Der Kernel wartet beim ersten Lesen auf das Ende der Wandlung, alle weiteren
+        Sensoren liefern ihr Scratchpad sofort.
+        
+        Returns:
+            Dictionary {Sensor-ID: Temperatur} oder None ohne Bulk-Read Unterstützung
+        """
+        if not self._trigger_bulk_conversion():
+            return None
+        
+        readings = {}
+        for circuit in self.heating_circuits:
+            readings[circuit.flow_sensor_id] = circuit.read_flow_temperature()
+            readings[circuit.return_sensor_id] = circuit.read_return_temperature()
+        
+        return readings
+    
+    @staticmethod
+    def _store_temperatures(all_temperatures: Dict[str, Dict[str, Optional[float]]],
+                            circuit: HeatingCircuit,
+                            flow_temp: Optional[float], return_temp: Optional[float]) -> None:
+        """Trägt die Temperaturen eines Heizkreises in das (wiederverwendete) Ergebnis ein"""
+        circuit.remember_temperatures(flow_temp, return_temp)
+        
+        temps = all_temperatures.get(circuit.name)
+        if temps is None:
+            temps = all_temperatures[circuit.name] = {}
+        temps['flow'] = flow_temp
+        temps['return'] = return_temp
+        temps['difference'] = temperature_difference(flow_temp, return_temp)
+    
+    def _store_bulk_readings(self, all_temperatures: Dict[str, Dict[str, Optional[float]]],
+                             readings: Dict[str, Optional[float]]) -> Dict[str, Dict[str, Optional[float]]]:
+        """Ordnet die Bulk-Messwerte (nach Sensor-ID) den Heizkreisen zu"""
+        for circuit in self.heating_circuits:
+            self._store_temperatures(
+                all_temperatures, circuit,
+                readings[circuit.flow_sensor_id], readings[circuit.return_sensor_id]
+            )
+        return all_temperatures
+    
+    def _store_cached(self, all_temperatures: Dict[str, Dict[str, Optional[float]]]) -> bool:
+        """
+        Übernimmt die zwischengespeicherten Messungen aller Heizkreise
+        
+        Returns:
+            True wenn für jeden Heizkreis eine gültige Messung vorlag (kein Buszugriff nötig)
+        """
+        cached = [circuit.cached_temperatures() for circuit in self.heating_circuits]
+        if any(temps is None for temps in cached):
+            return False
+        
+        for circuit, (flow_temp, return_temp) in zip(self.heating_circuits, cached):
+            self._store_temperatures(all_temperatures, circuit, flow_temp, return_temp)
+        return True
+    
+    def get_all_temperatures(self, executor: Optional[Executor] = None,
+                             out: Optional[Dict[str, Dict[str, Optional[float]]]] = None
+                             ) -> Dict[str, Dict[str, Optional[float]]]:
         """
         Liest alle Temperaturen aller Heizungskreise
         
+        Args:
+            executor: Optionaler Thread-Pool - Heizkreise werden dann parallel gelesen
+                      (nur ohne Bulk-Read, der alle Sensoren ohnehin gemeinsam misst)
+            out: Optionales Dictionary, das wiederverwendet und in-place befüllt wird
+        
         Returns:
             Dictionary mit Temperaturdaten aller Kreise
         """
-        all_temperatures = {}
+        all_temperatures = out if out is not None else {}
+        
+        # Messungen jünger als cache_ttl wiederverwenden
+        if self._store_cached(all_temperatures):
+            return all_temperatures
+        
+        # Bevorzugt: eine gemeinsame Wandlung für alle Sensoren des Busses
+        readings = self.read_all_bulk()
+        if readings is not None:
+            return self._store_bulk_readings(all_temperatures, readings)
+        
+        if executor is not None:
+            # Alle Sensoren auf einmal einreichen - blockierende 1-Wire Zugriffe überlappen
+            futures = [
+                (circuit,
+                 executor.submit(circuit.read_flow_temperature),
+                 executor.submit(circuit.read_return_temperature))
+                for circuit in self.heating_circuits
+            ]
+            for circuit, flow_future, return_future in futures:
+                self._store_temperatures(
+                    all_temperatures, circuit, flow_future.result(), return_future.result()
+                )
+            
+            return all_temperatures
         
         for circuit in self.heating_circuits:
-            flow_temp, return_temp = circuit.read_temperatures()
-            
-            all_temperatures[circuit.name] = {
-                'flow': flow_temp,
-                'return': return_temp,
-                'difference': circuit.calculate_temperature_difference()
-            }
-            
-            # Kurze Pause zwischen Heizkreisen
-            time.sleep(0.2)
+            self._store_temperatures(all_temperatures, circuit, *circuit.read_temperatures())
+        
+        return all_temperatures
+    
+    async def aget_all_temperatures(self, out: Optional[Dict[str, Dict[str, Optional[float]]]] = None
+                                    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        asyncio-Variante von get_all_temperatures - alle Sensoren werden gleichzeitig gelesen
+        
+        Args:
+            out: Optionales Dictionary, das wiederverwendet und in-place befüllt wird
+        
+        Returns:
+            Dictionary mit Temperaturdaten aller Kreise
+        """
+        all_temperatures = out if out is not None else {}
+        
+        if self._store_cached(all_temperatures):
+            return all_temperatures
+        
+        readings = await asyncio.to_thread(self.read_all_bulk)
+        if readings is not None:
+            return self._store_bulk_readings(all_temperatures, readings)
+        
+        results = await asyncio.gather(
+            *(circuit.aread_temperatures() for circuit in self.heating_circuits)
+        )
+        for circuit, (flow_temp, return_temp) in zip(self.heating_circuits, results):
+            self._store_temperatures(all_temperatures, circuit, flow_temp, return_temp)
         
         return all_temperatures
     
-    def get_system_status(self) -> Dict[str, any]:
-        """Gibt den Status des gesamten Heizungssystems zurück"""
+    def get_system_status(self, temperatures: Optional[Dict[str, Dict[str, Optional[float]]]] = None
+                          ) -> SystemStatus:
+        """
+        Gibt den Status des gesamten Heizungssystems zurück
+        
+        Args:
+            temperatures: Ergebnis von get_all_temperatures() aus demselben Zyklus - wird
+                          wiederverwendet statt die Sensoren erneut zu lesen
+        """
+        if temperatures is None:
+            temperatures = self.get_all_temperatures()
+        
+        # Ein Zeitstempel für System, Heizkreise und Alarme des Snapshots
+        timestamp = datetime.utcnow().isoformat()
+        
         circuit_statuses = []
         active_circuits = 0
         total_circuits = len(self.heating_circuits)
         available_circuits = 0
         
         for circuit in self.heating_circuits:
-            status = circuit.get_status()
+            temps = temperatures.get(circuit.name) or {}
+            status = circuit.status_from(temps.get('flow'), temps.get('return'), timestamp)
             circuit_statuses.append(status)
             
             if status['is_active']:
@@ -273,36 +651,36 @@ class HeatingSystemManager:
             if status['sensors_available']:
                 available_circuits += 1
         
-        return {
-            'timestamp': datetime.utcnow().isoformat(),
-            'total_circuits': total_circuits,
-            'available_circuits': available_circuits,
-            'active_circuits': active_circuits,
-            'circuits': circuit_statuses,
-            'system_efficiency': self._calculate_system_efficiency(),
-            'alerts': self._check_alerts()
-        }
+        return SystemStatus(
+            timestamp=timestamp,
+            total_circuits=total_circuits,
+            available_circuits=available_circuits,
+            active_circuits=active_circuits,
+            circuits=circuit_statuses,
+            system_efficiency=self._calculate_system_efficiency(circuit_statuses),
+            alerts=self._check_alerts(circuit_statuses, timestamp)
+        )
     
-    def _calculate_system_efficiency(self) -> Optional[float]:
+    def _calculate_system_efficiency(self, circuit_statuses: List[Dict[str, any]]) -> Optional[float]:
         """
         Berechnet die Gesamteffizienz des Heizungssystems
         
+        Args:
+            circuit_statuses: Status aller Heizkreise (aus get_system_status)
+        
         Returns:
             Effizienz-Wert zwischen 0 und 100
         """
-        total_diff = 0
-        active_circuits = 0
-        
-        for circuit in self.heating_circuits:
-            diff = circuit.calculate_temperature_difference()
-            if diff is not None and diff > 2:  # Nur aktive Kreise
-                total_diff += diff
-                active_circuits += 1
+        # Nur aktive Kreise
+        active_diffs = [
+            diff for diff in (status['temperature_difference'] for status in circuit_statuses)
+            if is_active_diff(diff)
+        ]
         
-        if active_circuits == 0:
+        if not active_diffs:
             return None
         
-        avg_diff = total_diff / active_circuits
+        avg_diff = fmean(active_diffs)
         
         # Effizienz basierend auf durchschnittlicher Temperaturdifferenz
         # 15°C+ = 100%, 5°C = 33%, linear interpoliert
@@ -310,18 +688,23 @@ class HeatingSystemManager:
         
         return round(efficiency, 1)
     
-    def _check_alerts(self) -> List[Dict[str, str]]:
+    def _check_alerts(self, circuit_statuses: List[Dict[str, any]],
+                      timestamp: str) -> List[Dict[str, str]]:
         """
         Prüft auf Alarm-Bedingungen im Heizungssystem
         
+        Args:
+            circuit_statuses: Status aller Heizkreise (aus get_system_status)
+            timestamp: ISO-Zeitstempel des Snapshots
+        
         Returns:
             Liste von Alarmen
         """
         alerts = []
         
-        for circuit in self.heating_circuits:
-            flow_temp, return_temp = circuit.read_temperatures()
-            diff = circuit.calculate_temperature_difference()
+        for circuit, status in zip(self.heating_circuits, circuit_statuses):
+            flow_temp = status['flow_temperature']
+            diff = status['temperature_difference']
             
             # Überhitzung prüfen
             if flow_temp is not None and flow_temp > 80:
@@ -329,7 +712,7 @@ class HeatingSystemManager:
                     'type': 'kritisch',
                     'circuit': circuit.name,
                     'message': f'Überhitzung: Vorlauf {flow_temp}°C',
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': timestamp
                 })
             
             # Schlechte Effizienz prüfen
@@ -338,7 +721,7 @@ class HeatingSystemManager:
                     'type': 'warnung',
                     'circuit': circuit.name,
                     'message': f'Geringe Effizienz: nur {diff}°C Temperaturdifferenz',
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': timestamp
                 })
             
             # Sensor-Ausfall prüfen
@@ -347,7 +730,7 @@ class HeatingSystemManager:
                     'type': 'fehler',
                     'circuit': circuit.name,
                     'message': 'Sensor-Ausfall erkannt',
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': timestamp
                 })
         
         return alerts
@@ -371,6 +754,8 @@ class HeatingSystemManager:
                 overall_success = False
                 continue
             
+            # Test misst immer neu
+            circuit.invalidate()
             flow_temp, return_temp = circuit.read_temperatures()
             
             if flow_temp is not None:
@@ -385,13 +770,10 @@ class HeatingSystemManager:
                 logger.error(f"❌ Rücklauf-Sensor defekt")
                 overall_success = False
             
-            diff = circuit.calculate_temperature_difference()
+            diff = temperature_difference(flow_temp, return_temp)
             if diff is not None:
                 logger.info(f"📊 Temperaturdifferenz: {diff}°C")
-                logger.info(f"🏆 Effizienz: {circuit.get_efficiency_rating()}")
-            
-            # Kurze Pause zwischen Tests
-            time.sleep(1)
+                logger.info(f"🏆 Effizienz: {classify_efficiency(diff)}")
         
         if overall_success:
             logger.info("\n✅ Alle Heizungskreise funktionieren korrekt!")
@@ -401,12 +783,14 @@ class HeatingSystemManager:
         return overall_success
     
     def get_circuit_by_name(self, name: str) -> Optional[HeatingCircuit]:
-        """Gibt einen Heizkreis anhand des Namens zurück"""
-        for circuit in self.heating_circuits:
-            if circuit.name.lower() == name.lower():
-                return circuit
-        return None
+        """Gibt einen Heizkreis anhand des Namens zurück (Groß-/Kleinschreibung egal)"""
+        return self._by_name.get(name.casefold())
     
     def get_circuit_count(self) -> int:
         """Gibt die Anzahl der konfigurierten Heizkreise zurück"""
         return len(self.heating_circuits)
+    
+    def cleanup(self) -> None:
+        """Gibt die Sensor-Ressourcen aller Heizkreise frei"""
+        for circuit in self.heating_circuits:
+            circuit.close()
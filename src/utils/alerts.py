@@ -5,22 +5,52 @@ Sendet Benachrichtigungen bei kritischen Ereignissen
 
 import logging
 import smtplib
+import threading
+import time
+from string import Template
 import requests
 import json
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Dict, Hashable, List, Optional, Tuple
 import os
 
 logger = logging.getLogger(__name__)
 
+# Text der Alarm-E-Mail - nur Zeit, Ereignis und Details ändern sich
+_EMAIL_BODY = Template("""
+Heizungsüberwachung - Alarm
+
+Zeit: $time
+Ereignis: $subject
+
+Details:
+$message
+
+--
+Automatische Benachrichtigung der Heizungsüberwachung
+""")
+
 class AlertManager:
     """Verwaltet Alarme und Benachrichtigungen"""
     
+    # Maximale Wartezeit auf alle Kanäle eines Alarms (Sekunden) - über den 10 s
+    # HTTP-Timeouts, damit ein langsamer Kanal nicht fälschlich als fehlgeschlagen zählt
+    SEND_TIMEOUT = 15.0
+    
+    # Höchstzahl gemerkter Alarme für den Cooldown (älteste werden verdrängt)
+    MAX_TRACKED_ALERTS = 512
+    
+    # Nach so langer Ruhe (Sekunden) wird die SMTP-Verbindung vor dem Senden per NOOP geprüft
+    SMTP_IDLE_CHECK = 30.0
+    
     def __init__(self):
-        self.last_alerts = {}  # Verhindert Spam
-        self.alert_cooldown = timedelta(minutes=30)  # 30 Min zwischen gleichen Alarmen
+        # (Typ, Kreis, Meldung) -> letzter Versand (time.monotonic()), älteste zuerst - verhindert Spam
+        self.last_alerts: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._cooldown_s = 1800.0  # 30 Min zwischen gleichen Alarmen
         
         # E-Mail Konfiguration
         self.email_enabled = os.getenv('ALERT_EMAIL_ENABLED', 'false').lower() == 'true'
@@ -29,6 +59,10 @@ class AlertManager:
         self.smtp_user = os.getenv('SMTP_USER', '')
         self.smtp_password = os.getenv('SMTP_PASSWORD', '')
         self.alert_email = os.getenv('ALERT_EMAIL', '')
+        # SMTP-Verbindung wird bei Bedarf aufgebaut und weiterverwendet
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_last_used = 0.0
+        self._smtp_lock = threading.Lock()
         
         # Telegram Konfiguration
         self.telegram_enabled = os.getenv('TELEGRAM_ENABLED', 'false').lower() == 'true'
@@ -38,64 +72,116 @@ class AlertManager:
         # Discord Webhook
         self.discord_enabled = os.getenv('DISCORD_ENABLED', 'false').lower() == 'true'
         self.discord_webhook = os.getenv('DISCORD_WEBHOOK_URL', '')
+        
+        # Eine HTTP-Session für Telegram/Discord - TCP/TLS-Verbindungen bleiben offen
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        
+        # Kanäle werden gleichzeitig bedient - Dauer = langsamster statt Summe aller Kanäle
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='alert')
+    
+    def close(self) -> None:
+        """Schließt die offenen HTTP-/SMTP-Verbindungen und beendet die Sende-Threads"""
+        self._executor.shutdown(wait=True)
+        self._http.close()
+        
+        with self._smtp_lock:
+            self._close_smtp()
+    
+    def _smtp_connection(self) -> smtplib.SMTP:
+        """Gibt die SMTP-Verbindung zurück (baut sie bei Bedarf auf)"""
+        if self._smtp is not None and time.monotonic() - self._smtp_last_used > self.SMTP_IDLE_CHECK:
+            # Länger ungenutzt - Server trennt ruhende Verbindungen oft nach wenigen Minuten
+            try:
+                code, _ = self._smtp.noop()
+            except (OSError, smtplib.SMTPException):
+                code = None
+            if code != 250:
+                self._close_smtp()
+        
+        if self._smtp is None:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+            server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+            self._smtp = server
+        self._smtp_last_used = time.monotonic()
+        return self._smtp
+    
+    def _close_smtp(self) -> None:
+        """Beendet die SMTP-Verbindung (Fehler beim Abmelden werden ignoriert)"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except OSError:  # umfasst smtplib.SMTPException
+                pass
+            self._smtp = None
     
-    def should_send_alert(self, alert_key: str) -> bool:
+    def should_send_alert(self, alert_key: Hashable) -> bool:
         """Prüft ob ein Alarm gesendet werden soll (Cooldown-Logik)"""
-        now = datetime.now()
+        # Monotone Uhr - unempfindlich gegen NTP-Sprünge und Zeitumstellung
+        now = time.monotonic()
+        
+        # Längst abgelaufene Einträge vorne entfernen - die Historie wächst nicht unbegrenzt
+        expired_before = now - 2 * self._cooldown_s
+        while self.last_alerts:
+            oldest_key, oldest_sent = next(iter(self.last_alerts.items()))
+            if oldest_sent >= expired_before:
+                break
+            del self.last_alerts[oldest_key]
         
-        if alert_key in self.last_alerts:
-            last_sent = self.last_alerts[alert_key]
-            if now - last_sent < self.alert_cooldown:
-                return False
+        last_sent = self.last_alerts.get(alert_key)
+        if last_sent is not None and now - last_sent < self._cooldown_s:
+            return False
         
         self.last_alerts[alert_key] = now
+        self.last_alerts.move_to_end(alert_key)
+        while len(self.last_alerts) > self.MAX_TRACKED_ALERTS:
+            self.last_alerts.popitem(last=False)
+        
         return True
     
-    def send_email_alert(self, subject: str, message: str) -> bool:
-        """Sendet E-Mail-Alarm"""
+    def send_email_alert(self, subject: str, message: str, now: Optional[datetime] = None) -> bool:
+        """Sendet E-Mail-Alarm (now: gemeinsamer Zeitpunkt des Alarms, Standard: jetzt)"""
         if not self.email_enabled or not self.alert_email:
             return False
         
         try:
-            msg = MIMEMultipart()
+            body = _EMAIL_BODY.substitute(
+                time=(now or datetime.now()).strftime('%d.%m.%Y %H:%M:%S'),
+                subject=subject,
+                message=message
+            )
+            
+            msg = MIMEText(body, 'plain', 'utf-8')
             msg['From'] = self.smtp_user
             msg['To'] = self.alert_email
             msg['Subject'] = f"🔥 Heizungsalarm: {subject}"
             
-            body = f"""
-Heizungsüberwachung - Alarm
-
-Zeit: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}
-Ereignis: {subject}
-
-Details:
-{message}
-
---
-Automatische Benachrichtigung der Heizungsüberwachung
-"""
-            
-            msg.attach(MIMEText(body, 'plain', 'utf-8'))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            with self._smtp_lock:
+                try:
+                    self._smtp_connection().send_message(msg)
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException):
+                    # Server hat die Verbindung geschlossen oder abgewiesen (z.B. 421) - einmal neu verbinden
+                    self._close_smtp()
+                    self._smtp_connection().send_message(msg)
             
             logger.info(f"✅ E-Mail-Alarm gesendet: {subject}")
             return True
             
         except Exception as e:
             logger.error(f"❌ E-Mail-Alarm fehlgeschlagen: {e}")
+            # Verbindung in unklarem Zustand - beim nächsten Alarm neu aufbauen
+            with self._smtp_lock:
+                self._close_smtp()
             return False
     
-    def send_telegram_alert(self, message: str) -> bool:
-        """Sendet Telegram-Alarm"""
+    def send_telegram_alert(self, message: str, now: Optional[datetime] = None) -> bool:
+        """Sendet Telegram-Alarm (now: gemeinsamer Zeitpunkt des Alarms, Standard: jetzt)"""
         if not self.telegram_enabled or not self.telegram_token:
             return False
         
         try:
-            text = f"🔥 *Heizungsalarm*\n\n{message}\n\n⏰ {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}"
+            text = f"🔥 *Heizungsalarm*\n\n{message}\n\n⏰ {(now or datetime.now()).strftime('%d.%m.%Y %H:%M:%S')}"
             
             url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
             data = {
@@ -104,7 +190,7 @@ Automatische Benachrichtigung der Heizungsüberwachung
                 'parse_mode': 'Markdown'
             }
             
-            response = requests.post(url, data=data, timeout=10)
+            response = self._http.post(url, data=data, timeout=10)
             response.raise_for_status()
             
             logger.info(f"✅ Telegram-Alarm gesendet")
@@ -114,8 +200,8 @@ Automatische Benachrichtigung der Heizungsüberwachung
             logger.error(f"❌ Telegram-Alarm fehlgeschlagen: {e}")
             return False
     
-    def send_discord_alert(self, message: str) -> bool:
-        """Sendet Discord-Alarm"""
+    def send_discord_alert(self, message: str, now: Optional[datetime] = None) -> bool:
+        """Sendet Discord-Alarm (now: gemeinsamer Zeitpunkt des Alarms, Standard: jetzt)"""
         if not self.discord_enabled or not self.discord_webhook:
             return False
         
@@ -125,17 +211,17 @@ Automatische Benachrichtigung der Heizungsüberwachung
                     "title": "🔥 Heizungsalarm",
                     "description": message,
                     "color": 0xff0000,  # Rot
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": (now or datetime.now()).astimezone(timezone.utc).isoformat(),
                     "footer": {
                         "text": "Heizungsüberwachung"
                     }
                 }]
             }
             
-            response = requests.post(
+            # json= setzt Content-Type: application/json selbst
+            response = self._http.post(
                 self.discord_webhook, 
                 json=data,
-                headers={'Content-Type': 'application/json'},
                 timeout=10
             )
             response.raise_for_status()
@@ -149,7 +235,7 @@ Automatische Benachrichtigung der Heizungsüberwachung
     
     def send_alert(self, alert_type: str, circuit: str, message: str):
         """Sendet einen Alarm über alle konfigurierten Kanäle"""
-        alert_key = f"{alert_type}_{circuit}_{message}"
+        alert_key = (alert_type, circuit, message)
         
         if not self.should_send_alert(alert_key):
             logger.debug(f"Alarm-Cooldown aktiv für: {alert_key}")
@@ -158,33 +244,75 @@ Automatische Benachrichtigung der Heizungsüberwachung
         subject = f"{alert_type.upper()} - {circuit}"
         full_message = f"Heizkreis: {circuit}\nTyp: {alert_type}\nMeldung: {message}"
         
-        # Über alle Kanäle senden
-        sent_count = 0
-        
-        if self.send_email_alert(subject, full_message):
-            sent_count += 1
+        self._dispatch(subject, full_message)
+    
+    def _dispatch(self, subject: str, full_message: str) -> int:
+        """
+        Sendet eine Nachricht gleichzeitig über alle Kanäle
         
-        if self.send_telegram_alert(full_message):
-            sent_count += 1
+        Returns:
+            Anzahl Kanäle, über die gesendet wurde
+        """
+        # Gemeinsamer Alarm-Zeitpunkt für alle Kanäle
+        now = datetime.now()
+        futures = [
+            self._executor.submit(self.send_email_alert, subject, full_message, now),
+            self._executor.submit(self.send_telegram_alert, full_message, now),
+            self._executor.submit(self.send_discord_alert, full_message, now),
+        ]
         
-        if self.send_discord_alert(full_message):
-            sent_count += 1
+        sent_count = 0
+        try:
+            for future in as_completed(futures, timeout=self.SEND_TIMEOUT):
+                if future.result():
+                    sent_count += 1
+        except FutureTimeoutError:
+            logger.warning(f"⚠️ Nicht alle Alarm-Kanäle haben innerhalb von {self.SEND_TIMEOUT:.0f}s geantwortet")
         
         if sent_count > 0:
             logger.info(f"📢 Alarm über {sent_count} Kanal(e) gesendet: {subject}")
         else:
             logger.warning(f"⚠️ Kein Alarm-Kanal verfügbar für: {subject}")
+        
+        return sent_count
     
     def process_system_alerts(self, alerts: List[Dict]):
-        """Verarbeitet System-Alarme"""
+        """
+        Verarbeitet System-Alarme
+        
+        Alarme gleichen Typs werden zu einer Nachricht pro Kanal zusammengefasst - bei
+        einer Störung über mehrere Heizkreise geht so nur eine Benachrichtigung raus.
+        Der Cooldown gilt weiterhin pro einzelnem Alarm.
+        """
+        grouped: Dict[str, List[Tuple[str, str]]] = {}
+        
         for alert in alerts:
             alert_type = alert.get('type', 'info')
             circuit = alert.get('circuit', 'system')
             message = alert.get('message', 'Unbekannter Alarm')
             
             # Nur kritische und Warnungen senden
-            if alert_type in ['kritisch', 'critical', 'warnung', 'warning']:
-                self.send_alert(alert_type, circuit, message)
+            if alert_type not in ['kritisch', 'critical', 'warnung', 'warning']:
+                continue
+            
+            if not self.should_send_alert((alert_type, circuit, message)):
+                logger.debug(f"Alarm-Cooldown aktiv für: {alert_type} {circuit}")
+                continue
+            
+            grouped.setdefault(alert_type, []).append((circuit, message))
+        
+        for alert_type, items in grouped.items():
+            if len(items) == 1:
+                circuit, message = items[0]
+                subject = f"{alert_type.upper()} - {circuit}"
+                full_message = f"Heizkreis: {circuit}\nTyp: {alert_type}\nMeldung: {message}"
+            else:
+                circuits = sorted({circuit for circuit, _ in items})
+                subject = f"{alert_type.upper()} - {len(items)} Alarme ({', '.join(circuits)})"
+                lines = "\n".join(f"• {circuit}: {message}" for circuit, message in items)
+                full_message = f"Typ: {alert_type}\n{lines}"
+            
+            self._dispatch(subject, full_message)
     
     def test_notifications(self) -> Dict[str, bool]:
         """Testet alle Benachrichtigungskanäle"""
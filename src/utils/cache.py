@@ -0,0 +1,80 @@
+"""
+Einfacher Zeit-basierter Cache (TTL) für wiederholte Abfragen
+Threadsicher, da Dashboard-Requests parallel eintreffen können
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Cache mit begrenzter Größe, dessen Einträge nach einer Lebensdauer verfallen"""
+    
+    def __init__(self, maxsize: int = 128, ttl: float = 30.0):
+        """
+        Initialisiert den Cache
+        
+        Args:
+            maxsize: Maximale Anzahl Einträge (älteste werden zuerst verdrängt)
+            ttl: Standard-Lebensdauer eines Eintrags in Sekunden
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Schlüssel -> (Ablaufzeit time.monotonic(), Wert), älteste zuerst
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Gibt einen gültigen Eintrag zurück (sonst default)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Speichert einen Eintrag
+        
+        Args:
+            key: Schlüssel
+            value: Wert
+            ttl: Abweichende Lebensdauer in Sekunden (Standard: self.ttl)
+        """
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Entfernt alle Einträge, deren Schlüssel die Bedingung erfüllt
+        
+        Returns:
+            Anzahl entfernter Einträge
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+    
+    def clear(self) -> None:
+        """Leert den Cache vollständig"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
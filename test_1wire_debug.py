@@ -5,11 +5,45 @@ Detaillierte Diagnose für 1-Wire Temperatur-Sensoren
 """
 
 import os
-import glob
+import io
+import json
+import contextlib
+import functools
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+W1_DEVICES_DIR = "/sys/bus/w1/devices"
+
+def _sys_read(path, n=128):
+    """
+    Liest eine kleine sysfs/procfs Datei ohne Python-IO-Stack (Puffer, Dekoder)
+    
+    Args:
+        path: Dateipfad
+        n: Maximale Anzahl Bytes (None = bis Dateiende)
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if n is not None:
+            return os.read(fd, n)
+        
+        # procfs liefert pro read() höchstens eine Seite
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+@functools.lru_cache(maxsize=1)
+def _proc_modules_bytes():
+    """Liest /proc/modules einmal pro Lauf (als Bytes, ohne Dekodierung)"""
+    return _sys_read('/proc/modules', None)
+
 def test_1wire_interface():
     """Test 1-Wire Interface und Module"""
     print("🔍 1-Wire Interface Test")
@@ -19,61 +53,198 @@ def test_1wire_interface():
     print("\n1. Kernel Module:")
     modules_loaded = []
     try:
-        with open('/proc/modules', 'r') as f:
-            content = f.read()
-            if 'w1_gpio' in content:
-                modules_loaded.append('w1_gpio')
-                print("   ✅ w1_gpio geladen")
-            else:
-                print("   ❌ w1_gpio NICHT geladen")
-                
-            if 'w1_therm' in content:
-                modules_loaded.append('w1_therm')
-                print("   ✅ w1_therm geladen")
-            else:
-                print("   ❌ w1_therm NICHT geladen")
+        buf = _proc_modules_bytes()
+        if b'w1_gpio' in buf:
+            modules_loaded.append('w1_gpio')
+            print("   ✅ w1_gpio geladen")
+        else:
+            print("   ❌ w1_gpio NICHT geladen")
+            
+        if b'w1_therm' in buf:
+            modules_loaded.append('w1_therm')
+            print("   ✅ w1_therm geladen")
+        else:
+            print("   ❌ w1_therm NICHT geladen")
                 
     except Exception as e:
         print(f"   ❌ Fehler beim Lesen der Module: {e}")
     
     # 2. 1-Wire Master prüfen
     print("\n2. 1-Wire Master:")
-    w1_master_path = "/sys/bus/w1/devices/w1_bus_master1"
-    if os.path.exists(w1_master_path):
-        print("   ✅ 1-Wire Master gefunden")
+    w1_master_path = W1_DEVICES_DIR + "/w1_bus_master1"
+    
+    # Slave-Liste direkt öffnen - Fehlerfall klärt, ob Master oder Datei fehlt
+    try:
+        slaves = _sys_read(w1_master_path + "/w1_master_slaves", None).decode('ascii', 'replace').strip().split('\n')
         
-        # Slave-Liste anzeigen
-        slaves_file = os.path.join(w1_master_path, "w1_master_slaves")
-        if os.path.exists(slaves_file):
-            try:
-                with open(slaves_file, 'r') as f:
-                    slaves = f.read().strip().split('\n')
-                    if slaves and slaves[0]:
-                        print(f"   📡 {len(slaves)} Slave(s) registriert:")
-                        for slave in slaves:
-                            if slave.strip():
-                                print(f"      - {slave.strip()}")
-                    else:
-                        print("   ⚠️ Keine Slaves registriert")
-            except Exception as e:
-                print(f"   ❌ Fehler beim Lesen der Slaves: {e}")
+        print("   ✅ 1-Wire Master gefunden")
+        if slaves and slaves[0]:
+            print(f"   📡 {len(slaves)} Slave(s) registriert:")
+            for slave in slaves:
+                if slave.strip():
+                    print(f"      - {slave.strip()}")
         else:
+            print("   ⚠️ Keine Slaves registriert")
+    except FileNotFoundError:
+        if os.path.isdir(w1_master_path):
+            print("   ✅ 1-Wire Master gefunden")
             print("   ❌ w1_master_slaves Datei nicht gefunden")
-    else:
-        print("   ❌ 1-Wire Master NICHT gefunden")
-        print("      Prüfe GPIO-Konfiguration und Module")
+        else:
+            print("   ❌ 1-Wire Master NICHT gefunden")
+            print("      Prüfe GPIO-Konfiguration und Module")
+    except Exception as e:
+        print("   ✅ 1-Wire Master gefunden")
+        print(f"   ❌ Fehler beim Lesen der Slaves: {e}")
     
     return len(modules_loaded) == 2
 
-def test_sensors_detailed():
-    """Detaillierte Sensor-Tests"""
+def read_all_w1_slaves(paths, fds=None):
+    """
+    Liest mehrere w1_slave Dateien gemeinsam statt nacheinander
+    
+    Unterstützt der Kernel therm_bulk_read, wandeln alle Sensoren eines Busses
+    gleichzeitig; das Lesen liefert danach sofort das Scratchpad. Die Reads selbst
+    laufen parallel, sodass die Gesamtdauer etwa einer Wandlung (~750 ms) entspricht.
+    
+    Args:
+        paths: w1_slave Pfade
+        fds: Optional {Pfad: Deskriptor} - Dateien bleiben über mehrere Aufrufe
+             geöffnet (pread ab Offset 0 startet eine neue Messung), Schließen
+             übernimmt der Aufrufer mit close_w1_slaves()
+    
+    Returns:
+        Dictionary {Pfad: Rohdaten (bytes) oder Exception}
+    """
+    # Gleichzeitige Wandlung aller Sensoren eines Busses (w1_therm, Linux >= 5.10)
+    try:
+        with os.scandir(W1_DEVICES_DIR) as entries:
+            masters = [e.path for e in entries if e.name.startswith("w1_bus_master")]
+    except OSError:
+        masters = []
+    
+    for master in masters:
+        try:
+            with open(master + "/therm_bulk_read", 'w') as f:
+                f.write('trigger\n')
+        except OSError:
+            pass  # Ohne Bulk-Read wandelt jeder Sensor beim Lesen einzeln
+    
+    def read_raw(path):
+        if fds is None:
+            return _sys_read(path)
+        
+        fd = fds.get(path)
+        if fd is None:
+            fd = fds[path] = os.open(path, os.O_RDONLY)
+        return os.pread(fd, 128, 0)
+    
+    results = {}
+    # Threads warten im Kernel auf die 1-Wire Wandlung - der GIL ist dabei freigegeben
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(paths)))) as executor:
+        futures = {path: executor.submit(read_raw, path) for path in paths}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                results[path] = e
+    
+    return results
+
+def close_w1_slaves(fds):
+    """Schließt die von read_all_w1_slaves() offen gehaltenen Deskriptoren"""
+    for fd in fds.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    fds.clear()
+
+def _parse_w1(buf):
+    """
+    Zerlegt w1_slave Rohdaten in einem Durchgang
+    
+    Returns:
+        Tuple (CRC ok, Temperatur in Milligrad oder None)
+    """
+    # Format: "<scratchpad> : crc=.. YES\n<scratchpad> t=21375\n"
+    crc_ok = b" YES" in buf
+    idx = buf.rfind(b"t=")
+    if idx == -1:
+        return crc_ok, None
+    try:
+        return crc_ok, int(buf[idx + 2:])
+    except ValueError:
+        return crc_ok, None
+
+def check_w1_data(buf, out, verbose=True):
+    """
+    Prüft die Rohdaten (bytes) eines DS18B20 direkt auf Byte-Ebene
+    
+    Args:
+        buf: Inhalt der w1_slave Datei
+        out: Liste, an die die Ausgabezeilen angehängt werden
+        verbose: Rohdaten und Zwischenschritte anzeigen
+    
+    Returns:
+        True wenn eine plausible Temperatur gelesen wurde (sonst erneut versuchen)
+    """
+    if not buf.strip():
+        out.append("   ⚠️ Datei ist leer")
+        return False
+    
+    if verbose:
+        out.append("   📄 Rohdaten:")
+        for line in buf.decode('ascii', 'replace').strip().splitlines():
+            out.append(f"      {line}")
+    
+    crc_ok, temp_raw = _parse_w1(buf)
+    
+    if not crc_ok:
+        out.append("   ❌ CRC Check: FEHLER")
+        return False
+    if verbose:
+        out.append("   ✅ CRC Check: OK")
+    
+    if temp_raw is None:
+        out.append("   ❌ Keine Temperatur ('t=') in den Rohdaten gefunden")
+        return False
+    
+    if verbose:
+        out.append(f"   📊 Raw-Wert: {temp_raw}")
+    # Umrechnung nur für die Anzeige - Prüfungen laufen auf dem Milligrad-Integer
+    out.append(f"   🌡️ Temperatur: {temp_raw / 1000:.1f}°C")
+    
+    # Plausibilitäts-Check
+    if not -55000 <= temp_raw <= 125000:
+        out.append(f"   ❌ Temperatur außerhalb gültiger Bereich (-55°C bis 125°C)")
+        return False
+    
+    if temp_raw == 85000:  # 85°C = Standard-Fehlerwert
+        out.append("   ⚠️ Sensor nicht initialisiert (85°C)")
+        return False
+    
+    out.append("   ✅ Temperatur plausibel")
+    return True
+
+def test_sensors_detailed(verbose=True, quiet=False):
+    """
+    Detaillierte Sensor-Tests
+    
+    Args:
+        verbose: Rohdaten jedes Sensors anzeigen
+        quiet: Keine Ausgabe pro Sensor (Health-Check aus cron/systemd-Timer)
+    """
     print("\n🌡️ DS18B20 Sensor-Diagnose")
     print("=" * 50)
     
-    # Sensor-Verzeichnisse finden
-    sensor_dirs = glob.glob("/sys/bus/w1/devices/28-*")
+    # Sensoren einmalig ermitteln: (ID, w1_slave Pfad) - wird für alle Versuche wiederverwendet
+    try:
+        with os.scandir(W1_DEVICES_DIR) as entries:
+            sensors = sorted((e.name, e.path + "/w1_slave") for e in entries if e.name.startswith("28-"))
+    except OSError:
+        sensors = []
     
-    if not sensor_dirs:
+    if not sensors:
         print("❌ Keine DS18B20 Sensoren gefunden!")
         print("\nMögliche Ursachen:")
         print("   - 1-Wire Interface nicht aktiviert")
@@ -82,100 +253,62 @@ def test_sensors_detailed():
         print("   - Pull-up Widerstand fehlt (4.7kΩ)")
         return False
     
-    print(f"✅ {len(sensor_dirs)} DS18B20 Sensor(en) gefunden")
+    print(f"✅ {len(sensors)} DS18B20 Sensor(en) gefunden")
     
     working_sensors = 0
+    # Fehlende w1_slave Dateien zeigen sich als FileNotFoundError beim Lesen
+    pending = [(i, sensor_id, slave_file) for i, (sensor_id, slave_file) in enumerate(sensors, 1)]
     
-    for i, sensor_dir in enumerate(sorted(sensor_dirs), 1):
-        sensor_id = os.path.basename(sensor_dir)
-        print(f"\n--- Sensor {i}: {sensor_id} ---")
+    # Mehrere Leseversuche - pro Versuch werden alle offenen Sensoren gemeinsam gelesen,
+    # die w1_slave Dateien bleiben dabei über alle Versuche geöffnet
+    fds = {}
+    for attempt in range(3):
+        if not pending:
+            break
         
-        # w1_slave Datei prüfen
-        slave_file = os.path.join(sensor_dir, "w1_slave")
+        print(f"\n🔄 Leseversuch {attempt + 1}/3 für {len(pending)} Sensor(en)...")
+        start = time.monotonic()
+        results = read_all_w1_slaves([slave_file for _, _, slave_file in pending], fds)
+        print(f"   ⏱️ Gelesen in {time.monotonic() - start:.2f}s")
         
-        if not os.path.exists(slave_file):
-            print("   ❌ w1_slave Datei nicht gefunden")
-            continue
+        still_pending = []
+        for i, sensor_id, slave_file in pending:
+            # Ausgabe pro Sensor sammeln und mit einem write() ausgeben
+            out = [f"\n--- Sensor {i}: {sensor_id} ---"]
+            
+            result = results[slave_file]
+            if quiet:
+                # Nur Ergebnis ermitteln - Ausgabezeilen werden gar nicht erst gebaut
+                crc_ok, temp_raw = _parse_w1(result) if isinstance(result, bytes) else (False, None)
+                if crc_ok and temp_raw is not None and -55000 <= temp_raw <= 125000 and temp_raw != 85000:
+                    working_sensors += 1
+                elif not isinstance(result, FileNotFoundError):
+                    still_pending.append((i, sensor_id, slave_file))
+                continue
+            
+            if isinstance(result, FileNotFoundError):
+                out.append("   ❌ w1_slave Datei nicht gefunden")
+            elif isinstance(result, Exception):
+                out.append(f"   ❌ Fehler beim Lesen: {result}")
+                still_pending.append((i, sensor_id, slave_file))
+            elif check_w1_data(result, out, verbose):
+                working_sensors += 1
+            else:
+                still_pending.append((i, sensor_id, slave_file))
             
-        print("   ✅ w1_slave Datei gefunden")
+            sys.stdout.write("\n".join(out) + "\n")
         
-        # Mehrere Leseversuche
-        for attempt in range(3):
-            try:
-                print(f"   🔄 Leseversuch {attempt + 1}/3...")
-                
-                with open(slave_file, 'r') as f:
-                    data = f.read().strip()
-                
-                if not data:
-                    print("   ⚠️ Datei ist leer")
-                    time.sleep(1)
-                    continue
-                
-                lines = data.split('\n')
-                print(f"   📄 Rohdaten ({len(lines)} Zeilen):")
-                for line_num, line in enumerate(lines, 1):
-                    print(f"      Zeile {line_num}: {line}")
-                
-                # CRC Check (erste Zeile)
-                if len(lines) >= 1:
-                    crc_line = lines[0]
-                    if "YES" in crc_line:
-                        print("   ✅ CRC Check: OK")
-                        crc_ok = True
-                    else:
-                        print(f"   ❌ CRC Check: FEHLER - {crc_line}")
-                        crc_ok = False
-                else:
-                    print("   ❌ Keine CRC-Zeile gefunden")
-                    crc_ok = False
-                
-                # Temperatur extrahieren (zweite Zeile)
-                temp_found = False
-                if len(lines) >= 2 and crc_ok:
-                    temp_line = lines[1]
-                    print(f"   🌡️ Temperatur-Zeile: {temp_line}")
-                    
-                    if "t=" in temp_line:
-                        temp_str = temp_line.split("t=")[1]
-                        try:
-                            temp_raw = int(temp_str)
-                            temp_celsius = temp_raw / 1000.0
-                            
-                            print(f"   📊 Raw-Wert: {temp_raw}")
-                            print(f"   🌡️ Temperatur: {temp_celsius:.1f}°C")
-                            
-                            # Plausibilitäts-Check
-                            if -55 <= temp_celsius <= 125:
-                                if temp_celsius != 85.0:  # 85°C = Standard-Fehlerwert
-                                    print("   ✅ Temperatur plausibel")
-                                    working_sensors += 1
-                                    temp_found = True
-                                    break
-                                else:
-                                    print("   ⚠️ Sensor nicht initialisiert (85°C)")
-                            else:
-                                print(f"   ❌ Temperatur außerhalb gültiger Bereich (-55°C bis 125°C)")
-                        except ValueError:
-                            print(f"   ❌ Kann Temperatur nicht parsen: {temp_str}")
-                    else:
-                        print("   ❌ Kein 't=' in Temperatur-Zeile gefunden")
-                
-                if not temp_found and attempt < 2:
-                    print("   ⏳ Warte 2 Sekunden vor nächstem Versuch...")
-                    time.sleep(2)
-                elif temp_found:
-                    break
-                    
-            except Exception as e:
-                print(f"   ❌ Fehler beim Lesen: {e}")
-                if attempt < 2:
-                    time.sleep(1)
+        pending = still_pending
+        if pending and attempt < 2:
+            print("\n   ⏳ Warte 2 Sekunden vor nächstem Versuch...")
+            time.sleep(2)
+    
+    close_w1_slaves(fds)
     
     print(f"\n📊 Zusammenfassung:")
-    print(f"   Erkannte Sensoren: {len(sensor_dirs)}")
+    print(f"   Erkannte Sensoren: {len(sensors)}")
     print(f"   Funktionierende Sensoren: {working_sensors}")
-    print(f"   Defekte/Problematische: {len(sensor_dirs) - working_sensors}")
+    print(f"   Defekte/Problematische: {len(sensors) - working_sensors}")
     
     return working_sensors > 0
 
@@ -206,10 +339,27 @@ def show_troubleshooting():
     print("   dmesg | grep -i w1")
     print("   journalctl | grep -i w1")
 
+def run_health_check():
+    """
+    Prüft Interface und Sensoren ohne Diagnose-Ausgabe
+    
+    Returns:
+        Dictionary {"interface_ok": bool, "sensors_ok": bool}
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        interface_ok = test_1wire_interface()
+        sensors_ok = test_sensors_detailed(verbose=False, quiet=True)
+    return {"interface_ok": interface_ok, "sensors_ok": sensors_ok}
+
 def main():
-    """Hauptfunktion"""
-    print("🧪 DS18B20 1-Wire Debug Tool")
-    print("============================")
+    """Hauptfunktion (--quiet: nur JSON-Ergebnis, Exit-Code 0 = OK)"""
+    if "--quiet" in sys.argv:
+        result = run_health_check() if os.path.exists("/sys/bus/w1") else {"interface_ok": False, "sensors_ok": False}
+        print(json.dumps(result))
+        sys.exit(0 if all(result.values()) else 1)
+    
+    print("🧪 DS18B20 1-Wire Debug Tool\n"
+          "============================")
     
     # Prüfen ob auf Raspberry Pi
     if not os.path.exists("/sys/bus/w1"):
@@ -8,6 +8,7 @@ import sys
 import time
 import logging
 import os
+import functools
 from typing import Dict, Optional
 
 # Pfad für lokale Module
@@ -20,6 +21,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=16)
+def _board_pin(pin: int):
+    """board-Pin zur GPIO-Nummer (BCM) - Lookup nur einmal pro Pin"""
+    import board
+    return getattr(board, f'D{pin}')
+
 def test_dht_libraries():
     """Teste verfügbare DHT22-Bibliotheken"""
     print("🔍 DHT22 Bibliotheken-Test")
@@ -62,29 +69,40 @@ def test_dht_libraries():
     print(f"\n📊 Verfügbare Bibliotheken: {len(libraries_found)}")
     return libraries_found
 
-def test_dht22_adafruit(pin: int = 18, attempts: int = 5):
-    """Test DHT22 mit Adafruit CircuitPython"""
+def test_dht22_adafruit(pin: int = 18, attempts: int = 5, target_successes: int = 3,
+                        min_interval: float = 2.0):
+    """
+    Test DHT22 mit Adafruit CircuitPython
+    
+    Args:
+        pin: GPIO-Nummer (BCM)
+        attempts: Maximale Anzahl Leseversuche
+        target_successes: Nach so vielen plausiblen Messungen abbrechen
+        min_interval: Mindestabstand zwischen zwei Messungen (DHT22: 2 s)
+    """
     print(f"\n🌡️ DHT22 Test - Adafruit CircuitPython (GPIO {pin})")
     print("-" * 50)
     
     try:
-        import board
         import adafruit_dht
         
-        # DHT22 Sensor erstellen
-        if pin == 18:
-            dht = adafruit_dht.DHT22(board.D18)
-        elif pin == 4:
-            dht = adafruit_dht.DHT22(board.D4)
-        else:
-            print(f"⚠️ GPIO {pin} - verwende dynamischen Zugriff")
-            dht = adafruit_dht.DHT22(getattr(board, f'D{pin}'))
+        # DHT22 Sensor einmalig erstellen - alle Leseversuche nutzen denselben Handle
+        dht = adafruit_dht.DHT22(_board_pin(pin))
         
         print(f"✅ DHT22 Sensor initialisiert (GPIO {pin})")
         
         successful_readings = 0
+        last_read = None
         
         for i in range(attempts):
+            # Nur die Restzeit bis zum Mindestabstand warten - schneller liefert
+            # die Bibliothek lediglich den vorherigen Wert erneut
+            if last_read is not None:
+                remaining = min_interval - (time.monotonic() - last_read)
+                if remaining > 0:
+                    time.sleep(remaining)
+            last_read = time.monotonic()
+            
             try:
                 print(f"\n🔄 Leseversuch {i+1}/{attempts}...")
                 
@@ -99,13 +117,12 @@ def test_dht22_adafruit(pin: int = 18, attempts: int = 5):
                     if -20 <= temperature <= 50 and 0 <= humidity <= 100:
                         print("✅ Werte sind plausibel")
                         successful_readings += 1
+                        if successful_readings >= target_successes:
+                            break
                     else:
                         print("⚠️ Werte außerhalb normaler Bereiche")
                 else:
                     print("❌ Keine gültigen Daten erhalten")
-                
-                if i < attempts - 1:
-                    time.sleep(2)
                     
             except RuntimeError as e:
                 print(f"⚠️ DHT-Fehler: {e}")
@@ -120,7 +137,7 @@ def test_dht22_adafruit(pin: int = 18, attempts: int = 5):
         except:
             pass
             
-        print(f"\n📊 Erfolgreiche Messungen: {successful_readings}/{attempts}")
+        print(f"\n📊 Erfolgreiche Messungen: {successful_readings}/{i + 1}")
         return successful_readings > 0
         
     except Exception as e:
@@ -174,6 +191,9 @@ def test_heating_room_sensor():
                 time.sleep(3)
         
         print(f"\n📊 Erfolgreiche Sensor-Tests: {successful_tests}/3")
+        
+        # GPIO-Handle freigeben, damit nachfolgende Tests den Pin neu belegen können
+        sensor.cleanup()
         return successful_tests > 0
         
     except ImportError as e:
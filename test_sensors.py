@@ -7,33 +7,339 @@ Test-Skript für alle Sensoren der Heizungsüberwachung
 import sys
 import time
 import logging
-import subprocess
-import argparse
-import glob
+import math
+import logging.handlers
+import queue
+import atexit
+import contextlib
+import io
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import os
 import statistics
+from datetime import datetime, timezone
 from pathlib import Path
 
+import yaml
+
 # Projekt-Root zum Python-Pfad hinzufügen
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-# Logging konfigurieren
+from src.utils.cache import TTLCache
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# .env Unterstützung ist optional
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+# Logging konfigurieren - die Ausgabe übernimmt ein Hintergrund-Thread, damit ein
+# langsames Terminal (z.B. über SSH) die Messschleifen nicht ausbremst
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# Formatter am Ziel - die Queue übergibt nur die fertige Meldung
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _console_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
+# NumPy ist optional - Statistiken über viele Messwerte in einem Durchgang
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+def describe(values):
+    """
+    Mittelwert, Minimum, Maximum und Standardabweichung einer Messreihe
+    
+    Returns:
+        Tuple (avg, min, max, std)
+    """
+    if NUMPY_AVAILABLE:
+        arr = np.asarray(values, dtype=np.float64)
+        return float(arr.mean()), float(arr.min()), float(arr.max()), float(arr.std())
+    
+    # Ohne NumPy: fmean rechnet in float (pstdev würde intern mit Fraction arbeiten)
+    avg = statistics.fmean(values)
+    std = math.sqrt(statistics.fmean([(v - avg) ** 2 for v in values]))
+    return avg, min(values), max(values), std
+
+W1_DEVICES_DIR = '/sys/bus/w1/devices'
+
+# Trennlinie der Test-Ausgabe
+_SEP = "=" * 50
+
+# Mindestabstand zwischen zwei DHT22-Messungen laut Datenblatt (Sekunden)
+DHT22_MIN_INTERVAL = 2.0
+
+# Messreihe gilt als stabil unterhalb dieser Standardabweichung (°C)
+TEMP_STABILITY_STD = 0.5
+
+# Bucket-Liste ändert sich selten - bei wiederholten Tests höchstens einmal pro Minute abfragen
+BUCKET_CACHE_TTL = 60.0
+
+# Anzahl synthetischer Punkte für den Batch-Schreibtest (ein HTTP-Request)
+INFLUX_TEST_BATCH_SIZE = 5000
+INFLUX_TEST_MEASUREMENT = 'verbindungstest'
+
+# Obergrenze für test_dht22.main() - ein hängender adafruit_dht/pulseio-Read blockiert sonst ewig
+DHT22_SCRIPT_TIMEOUT = 60
+
+# Hardware-Bibliotheken (CircuitPython/Blinka) erst beim ersten GPIO-Test laden -
+# --1wire und --influxdb kommen ohne sie aus
+board = digitalio = adafruit_dht = None
+
+@functools.lru_cache(maxsize=1)
+def gpio_import_error():
+    """
+    Importiert board, digitalio und adafruit_dht beim ersten Aufruf
+    
+    Returns:
+        None wenn die GPIO-Bibliotheken verfügbar sind, sonst die Exception
+    """
+    global board, digitalio, adafruit_dht
+    try:
+        import board
+        import digitalio
+        import adafruit_dht
+    except (ImportError, NotImplementedError) as e:  # Blinka: NotImplementedError auf fremder Hardware
+        return e
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _get_dht22():
+    """
+    DHT22 an GPIO 18 - einmal initialisiert und von allen Tests gemeinsam genutzt
+    
+    Der GPIO wird beim Beenden des Skripts wieder freigegeben.
+    """
+    dht = adafruit_dht.DHT22(board.D18)
+    atexit.register(dht.exit)
+    return dht
+
+# Plausibilitätsgrenzen je Messgröße: (Icon, Einheit, Minimum, Maximum, max. Standardabweichung)
+DHT22_PLAUSIBILITY = {
+    'Temperatur': ('🌡️', '°C', -40, 80, TEMP_STABILITY_STD),
+    'Luftfeuchtigkeit': ('💧', '%', 0, 100, None),
+    'Taupunkt': ('🌫️', '°C', -40, 80, None),
+}
+
+def check_dht22_series(name, values):
+    """
+    Gibt die Statistik einer DHT22-Messreihe aus und prüft sie gegen DHT22_PLAUSIBILITY
+    
+    Returns:
+        True wenn Mittelwert plausibel und Messreihe (falls geprüft) stabil ist
+    """
+    icon, unit, low, high, max_std = DHT22_PLAUSIBILITY[name]
+    avg, vmin, vmax, std = describe(values)
+    logger.info("  %s %s: %.1f%s (Min: %.1f%s, Max: %.1f%s, σ: %.2f%s)",
+                icon, name, avg, unit, vmin, unit, vmax, unit, std, unit)
+    
+    plausible = low <= avg <= high
+    if plausible:
+        logger.info("  ✅ %s plausibel", name)
+    else:
+        logger.warning(f"  ⚠️ {name} außerhalb des normalen Bereichs")
+    
+    # Stabilitätsprüfung - Standardabweichung ist robuster als die Spannweite
+    stable = max_std is None or len(values) < 2 or std < max_std
+    if max_std is not None and len(values) > 1:
+        if stable:
+            logger.info("  ✅ %s-Messwerte stabil", name)
+        else:
+            logger.warning(f"  ⚠️ {name}-Schwankung: σ {std:.2f}{unit} (Spannweite {vmax - vmin:.1f}{unit})")
+    
+    return plausible and stable
+
+def check_influx_batching():
+    """
+    Prüft, ob der HeatingInfluxDBClient Punkte gebündelt schreibt
+    
+    Returns:
+        True bei Batching-Writer, None falls der Client nicht importierbar ist
+    """
+    # Batching-Konfiguration des Monitoring-Clients (benötigt influxdb-client)
+    try:
+        from influxdb_client.client.write_api import WriteType
+        from src.database.influxdb_client import WRITE_OPTIONS
+    except ImportError as e:
+        logger.warning(f"⚠️ Batching-Konfiguration nicht prüfbar: {e}")
+        return None
+    
+    if WRITE_OPTIONS.write_type != WriteType.batching:
+        logger.error("❌ HeatingInfluxDBClient schreibt nicht im Batching-Modus - jeder Punkt wäre ein eigener Request")
+        return False
+    
+    logger.info(f"✅ Batching aktiv: {WRITE_OPTIONS.batch_size} Punkte / {WRITE_OPTIONS.flush_interval} ms")
+    return True
+
+def run_influx_batch_write(session, influxdb_url, headers, org, bucket):
+    """
+    Schreibt einen synthetischen Batch mit einem Request und entfernt ihn wieder
+    
+    Returns:
+        True wenn Schreiben und Aufräumen erfolgreich waren
+    """
+    now_ns = time.time_ns()
+    # Ein Punkt pro Millisekunde rückwärts - eindeutige Zeitstempel, eine Serie
+    lines = "\n".join(
+        f"{INFLUX_TEST_MEASUREMENT},quelle=test_sensors wert={i}i {now_ns - i * 1_000_000}"
+        for i in range(INFLUX_TEST_BATCH_SIZE)
+    )
+    
+    start = time.monotonic()
+    response = session.post(
+        f"{influxdb_url}/api/v2/write",
+        params={'org': org, 'bucket': bucket, 'precision': 'ns'},
+        headers=headers, data=lines.encode(), timeout=30
+    )
+    elapsed = time.monotonic() - start
+    
+    if response.status_code != 204:
+        logger.error(f"❌ Batch-Schreibtest fehlgeschlagen: {response.status_code} {response.text}")
+        return False
+    
+    logger.info("✅ %d Punkte in einem Request geschrieben (%.0f ms, %.0f Punkte/s)",
+                INFLUX_TEST_BATCH_SIZE, elapsed * 1000, INFLUX_TEST_BATCH_SIZE / max(elapsed, 1e-6))
+    
+    # Testdaten wieder entfernen (Token benötigt Lösch-Berechtigung für den Test-Bucket)
+    start_ns = now_ns - INFLUX_TEST_BATCH_SIZE * 1_000_000
+    response = session.post(
+        f"{influxdb_url}/api/v2/delete",
+        params={'org': org, 'bucket': bucket},
+        headers=headers,
+        json={
+            'start': datetime.fromtimestamp(start_ns / 1e9 - 1, timezone.utc).isoformat(),
+            'stop': datetime.fromtimestamp(now_ns / 1e9 + 1, timezone.utc).isoformat(),
+            'predicate': f'_measurement="{INFLUX_TEST_MEASUREMENT}"'
+        },
+        timeout=30
+    )
+    if response.status_code != 204:
+        logger.error(f"❌ Testdaten konnten nicht aus '{bucket}' entfernt werden: {response.status_code}")
+        return False
+    
+    logger.info(f"✅ Testdaten aus '{bucket}' entfernt")
+    return True
+
+# Messwerte kurzzeitig wiederverwenden (kürzer als ein Monitoring-Zyklus)
+DS18B20_CACHE_TTL = 2.0
+_ds18b20_cache = TTLCache(maxsize=64, ttl=DS18B20_CACHE_TTL)
+
+def read_ds18b20_bulk(sensor_ids):
+    """
+    Liest mehrere DS18B20 mit einer gemeinsamen Wandlung
+    
+    Ab Linux 5.10 startet "trigger" in therm_bulk_read die Messung aller Sensoren
+    eines Busses gleichzeitig (SKIP ROM + CONVERT T). Die anschließenden w1_slave Reads
+    liefern nur noch das Scratchpad - 1× Wandlung statt N×. Ältere Kernel messen beim
+    Lesen einzeln; die Reads laufen deshalb parallel, damit sich die Wandlungen überlappen.
+    
+    Gültige Messwerte werden DS18B20_CACHE_TTL Sekunden wiederverwendet - der Heizkreis-Test
+    liest direkt nach dem 1-Wire Test dieselben Sensoren.
+    
+    Returns:
+        Dictionary {Sensor-ID: Temperatur in °C oder Exception}
+    """
+    sensor_ids = list(dict.fromkeys(sensor_ids))
+    readings = {sensor_id: _ds18b20_cache.get(sensor_id) for sensor_id in sensor_ids}
+    missing = [sensor_id for sensor_id, temp in readings.items() if temp is None]
+    if not missing:
+        return readings
+    
+    try:
+        with os.scandir(W1_DEVICES_DIR) as entries:
+            masters = [e.path for e in entries if e.name.startswith('w1_bus_master')]
+    except OSError:
+        masters = []
+    
+    bulk = False
+    for master in masters:
+        try:
+            with open(f"{master}/therm_bulk_read", 'w') as f:
+                f.write('trigger\n')
+            bulk = True
+        except OSError:
+            pass  # Kein Bulk-Read - Sensoren wandeln beim Lesen einzeln
+    
+    # Parallel lesen - ohne Bulk-Read überlappen sich so die Einzelwandlungen
+    read = functools.partial(_read_ds18b20, bulk=bulk)
+    with ThreadPoolExecutor(max_workers=min(16, len(missing))) as executor:
+        for sensor_id, temp in zip(missing, executor.map(read, missing)):
+            readings[sensor_id] = temp
+            if not isinstance(temp, Exception):
+                _ds18b20_cache.set(sensor_id, temp)
+    
+    return readings
+
+def _read_ds18b20(sensor_id, bulk=False):
+    """
+    Liest einen DS18B20 - Temperatur in °C oder die aufgetretene Exception
+    
+    Nach einem Bulk-Trigger liefert das "temperature" Attribut den Wert der gemeinsamen
+    Wandlung als Milligrad (der Kernel wartet selbst auf deren Ende, CRC ist geprüft).
+    Ohne Bulk-Read oder auf Kerneln ohne das Attribut wird w1_slave gelesen.
+    """
+    try:
+        if bulk:
+            try:
+                with open(f"{W1_DEVICES_DIR}/{sensor_id}/temperature", 'r') as f:
+                    raw = int(f.read())
+                if raw == 85000:  # Power-On-Reset Wert - keine gültige Messung
+                    return ValueError("Lesefehler")
+                return raw / 1000.0
+            except FileNotFoundError:
+                pass
+        
+        with open(f"{W1_DEVICES_DIR}/{sensor_id}/w1_slave", 'rb') as f:
+            temp = _parse_w1_slave(f.read())
+        return ValueError("Lesefehler") if temp is None else temp
+    except Exception as e:
+        return e
+
+def _parse_w1_slave(buf):
+    """
+    Wertet den Inhalt einer w1_slave Datei aus (Bytes, ohne Dekodierung)
+    
+    Returns:
+        Temperatur in °C oder None bei CRC-Fehler bzw. fehlendem Messwert
+    """
+    # Zeile 1 endet mit "YES" bei gültiger CRC, "t=" steht am Ende von Zeile 2
+    if not buf.endswith(b'YES', 0, buf.find(b'\n')):
+        return None
+    i = buf.rfind(b't=')
+    if i < 0:
+        return None
+    return int(buf[i + 2:]) / 1000.0
+
 def test_1wire_interface():
     """Testet das 1-Wire Interface und alle DS18B20 Sensoren"""
     logger.info("🔍 Teste 1-Wire Interface...")
     
     try:
-        # 1-Wire Interface prüfen
-        devices = glob.glob('/sys/bus/w1/devices/28-*')
+        # 1-Wire Interface prüfen (ein scandir, Sortierung nach ID)
+        with os.scandir(W1_DEVICES_DIR) as entries:
+            devices = sorted(e.name for e in entries if e.name.startswith('28-'))
         if not devices:
             logger.error("❌ Keine 1-Wire Sensoren gefunden!")
             logger.info("💡 Prüfe /boot/firmware/config.txt: dtoverlay=w1-gpio")
@@ -41,21 +347,16 @@ def test_1wire_interface():
             
         logger.info(f"✅ {len(devices)} DS18B20 Sensoren gefunden")
         
-        # Alle Sensoren testen
+        # Alle Sensoren mit einer gemeinsamen Wandlung testen
         working_sensors = 0
-        for device in devices:
-            device_id = device.split('/')[-1]
-            try:
-                with open(f"{device}/w1_slave", 'r') as f:
-                    data = f.read()
-                    if "YES" in data and "t=" in data:
-                        temp = int(data.split("t=")[1]) / 1000.0
-                        logger.info(f"  📡 {device_id}: {temp:.1f}°C")
-                        working_sensors += 1
-                    else:
-                        logger.warning(f"  ⚠️ {device_id}: Lesefehler")
-            except Exception as e:
-                logger.error(f"  ❌ {device_id}: {e}")
+        for device_id, temp in read_ds18b20_bulk(devices).items():
+            if isinstance(temp, ValueError):
+                logger.warning(f"  ⚠️ {device_id}: {temp}")
+            elif isinstance(temp, Exception):
+                logger.error(f"  ❌ {device_id}: {temp}")
+            else:
+                logger.info("  📡 %s: %.1f°C", device_id, temp)
+                working_sensors += 1
                 
         logger.info(f"✅ {working_sensors}/{len(devices)} Sensoren funktionsfähig")
         return working_sensors > 0
@@ -68,32 +369,38 @@ def test_room_sensor():
     """Testet den DHT22 Raumsensor (Basic-Version)"""
     logger.info("🌡️ Teste DHT22 Raumsensor...")
     
+    gpio_error = gpio_import_error()
+    if gpio_error is not None:
+        logger.error(f"❌ DHT22 Test fehlgeschlagen: {gpio_error}")
+        return False
+    
     try:
-        import board
-        import adafruit_dht
-        
-        # DHT22 am GPIO 18 initialisieren
-        dht = adafruit_dht.DHT22(board.D18)
+        # DHT22 am GPIO 18 (gemeinsame Instanz)
+        dht = _get_dht22()
         
-        # 3 Versuche für stabile Messung
+        # 3 Versuche für stabile Messung - Wiederholungen nur im DHT22-Mindestabstand
+        last_read = None
         for attempt in range(3):
+            if last_read is not None:
+                remaining = DHT22_MIN_INTERVAL - (time.monotonic() - last_read)
+                if remaining > 0:
+                    time.sleep(remaining)
+            last_read = time.monotonic()
+            
             try:
                 temperature = dht.temperature
                 humidity = dht.humidity
                 
                 if temperature is not None and humidity is not None:
-                    logger.info(f"  🌡️ Temperatur: {temperature:.1f}°C")
-                    logger.info(f"  💧 Luftfeuchtigkeit: {humidity:.1f}%")
-                    dht.exit()
+                    logger.info("  🌡️ Temperatur: %.1f°C", temperature)
+                    logger.info("  💧 Luftfeuchtigkeit: %.1f%%", humidity)
                     return True
                 else:
-                    logger.warning(f"  ⚠️ Versuch {attempt + 1}: Keine Daten")
+                    logger.warning("  ⚠️ Versuch %d: Keine Daten", attempt + 1)
                     
             except RuntimeError as e:
-                logger.warning(f"  ⚠️ Versuch {attempt + 1}: {e}")
-                time.sleep(2)
+                logger.warning("  ⚠️ Versuch %d: %s", attempt + 1, e)
                 
-        dht.exit()
         logger.error("❌ DHT22 Sensor nicht lesbar")
         return False
         
@@ -105,75 +412,65 @@ def test_dht22_detailed():
     """Erweiterte DHT22-Tests mit Statistiken"""
     logger.info("🌡️ Detaillierte DHT22-Analyse...")
     
+    gpio_error = gpio_import_error()
+    if gpio_error is not None:
+        logger.error(f"❌ DHT22 Detailtest fehlgeschlagen: {gpio_error}")
+        return False
+    
     try:
-        import board
-        import adafruit_dht
-        
-        dht = adafruit_dht.DHT22(board.D18)
+        dht = _get_dht22()
         
-        temperatures = []
-        humidities = []
         successful_reads = 0
         total_attempts = 5
         
+        # Messwerte vorab für alle Versuche reservieren (Zeile 0: Temperatur, 1: Luftfeuchtigkeit)
+        if NUMPY_AVAILABLE:
+            samples = np.empty((2, total_attempts), dtype=np.float64)
+        else:
+            samples = [[0.0] * total_attempts, [0.0] * total_attempts]
+        
         logger.info(f"📊 Führe {total_attempts} Messungen durch...")
         
+        last_read = None
         for attempt in range(total_attempts):
+            # Nur die Restzeit bis zum DHT22-Mindestabstand warten, nach der letzten Messung gar nicht
+            if last_read is not None:
+                remaining = DHT22_MIN_INTERVAL - (time.monotonic() - last_read)
+                if remaining > 0:
+                    time.sleep(remaining)
+            last_read = time.monotonic()
+            
             try:
                 temperature = dht.temperature
                 humidity = dht.humidity
                 
                 if temperature is not None and humidity is not None:
-                    temperatures.append(temperature)
-                    humidities.append(humidity)
+                    samples[0][successful_reads] = temperature
+                    samples[1][successful_reads] = humidity
                     successful_reads += 1
-                    logger.info(f"  ✅ Messung {attempt + 1}: {temperature:.1f}°C, {humidity:.1f}%")
+                    logger.info("  ✅ Messung %d: %.1f°C, %.1f%%", attempt + 1, temperature, humidity)
                 else:
-                    logger.warning(f"  ❌ Messung {attempt + 1}: Keine Daten")
+                    logger.warning("  ❌ Messung %d: Keine Daten", attempt + 1)
                     
             except RuntimeError as e:
-                logger.warning(f"  ❌ Messung {attempt + 1}: {e}")
-                
-            time.sleep(2)
-        
-        dht.exit()
+                logger.warning("  ❌ Messung %d: %s", attempt + 1, e)
         
         # Statistiken berechnen
         success_rate = (successful_reads / total_attempts) * 100
-        logger.info(f"\n📈 DHT22 Statistiken:")
-        logger.info(f"  📊 Erfolgsrate: {success_rate:.1f}% ({successful_reads}/{total_attempts})")
+        logger.info("\n📈 DHT22 Statistiken:")
+        logger.info("  📊 Erfolgsrate: %.1f%% (%d/%d)", success_rate, successful_reads, total_attempts)
         
-        if temperatures:
-            temp_avg = statistics.mean(temperatures)
-            temp_min = min(temperatures)
-            temp_max = max(temperatures)
-            logger.info(f"  🌡️ Temperatur: {temp_avg:.1f}°C (Min: {temp_min:.1f}°C, Max: {temp_max:.1f}°C)")
+        if successful_reads:
+            temperatures = samples[0][:successful_reads]
+            humidities = samples[1][:successful_reads]
             
-            # Plausibilitätsprüfung
-            if -40 <= temp_avg <= 80:
-                logger.info("  ✅ Temperatur plausibel")
-            else:
-                logger.warning("  ⚠️ Temperatur außerhalb des normalen Bereichs")
-        
-        if humidities:
-            hum_avg = statistics.mean(humidities)
-            hum_min = min(humidities)
-            hum_max = max(humidities)
-            logger.info(f"  💧 Luftfeuchtigkeit: {hum_avg:.1f}% (Min: {hum_min:.1f}%, Max: {hum_max:.1f}%)")
+            # Taupunkte aller Messungen in einem Aufruf (vektorisiert, falls NumPy verfügbar)
+            from src.sensors.dht22_sensor import compute_dew_points
+            dew_points = compute_dew_points(temperatures, humidities)
             
-            # Plausibilitätsprüfung
-            if 0 <= hum_avg <= 100:
-                logger.info("  ✅ Luftfeuchtigkeit plausibel")
-            else:
-                logger.warning("  ⚠️ Luftfeuchtigkeit außerhalb des normalen Bereichs")
-        
-        # Stabilitätsprüfung
-        if len(temperatures) > 1:
-            temp_range = max(temperatures) - min(temperatures)
-            if temp_range < 2.0:
-                logger.info("  ✅ Temperatur-Messwerte stabil")
-            else:
-                logger.warning(f"  ⚠️ Temperatur-Schwankung: {temp_range:.1f}°C")
+            for name, values in (('Temperatur', temperatures), ('Luftfeuchtigkeit', humidities),
+                                 ('Taupunkt', dew_points)):
+                check_dht22_series(name, values)
         
         return successful_reads > 0
         
@@ -186,10 +483,12 @@ def run_dht22_only_test():
     logger.info("🎯 DHT22-spezifischer Test...")
     
     # Prüfe zuerst GPIO-Verfügbarkeit
+    gpio_error = gpio_import_error()
+    if gpio_error is not None:
+        logger.error(f"❌ GPIO 18 Test fehlgeschlagen: {gpio_error}")
+        return False
+    
     try:
-        import board
-        import digitalio
-        
         # GPIO 18 testen
         pin = digitalio.DigitalInOut(board.D18)
         pin.direction = digitalio.Direction.INPUT
@@ -201,31 +500,120 @@ def run_dht22_only_test():
         logger.error(f"❌ GPIO 18 Test fehlgeschlagen: {e}")
         return False
     
-    # Versuche zuerst das dedizierte Test-Script
+    # Versuche zuerst das dedizierte Test-Script - im selben Interpreter, ohne zweiten Python-Start
     try:
         logger.info("🔧 Versuche dediziertes DHT22-Test-Script...")
-        result = subprocess.run([sys.executable, "test_dht22.py"], 
-                              capture_output=True, text=True, timeout=60)
+        # print()-Ausgaben des Scripts (auch beim Import) zeilenweise über den Logger ausgeben
+        with _LogLineWriter() as out, contextlib.redirect_stdout(out):
+            import test_dht22
+            success = _call_with_timeout(test_dht22.main, DHT22_SCRIPT_TIMEOUT)
         
-        if result.returncode == 0:
+        if success:
             logger.info("✅ Dediziertes DHT22-Test erfolgreich")
-            # Output anzeigen
-            for line in result.stdout.split('\n'):
-                if line.strip():
-                    logger.info(f"  {line}")
             return True
         else:
             logger.warning("⚠️ Dediziertes DHT22-Test fehlgeschlagen, versuche Basic-Test...")
             return test_dht22_detailed()
             
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+    except ImportError:
         logger.warning("⚠️ Spezifisches DHT22-Test-Script nicht gefunden")
         return test_dht22_detailed()
+    
+    except FutureTimeoutError:
+        logger.warning(f"⚠️ DHT22-Test-Script nach {DHT22_SCRIPT_TIMEOUT} s abgebrochen, versuche Basic-Test...")
+        return test_dht22_detailed()
             
     except Exception as e:
         logger.error(f"❌ DHT22-Test Fehler: {e}")
         return test_dht22_detailed()
 
+def _call_with_timeout(func, timeout):
+    """
+    Führt func in einem Daemon-Thread aus und wartet höchstens timeout Sekunden
+    
+    Ein hängender Thread lässt sich nicht abbrechen - als Daemon blockiert er aber
+    weder den Aufrufer noch das Beenden des Interpreters (anders als ThreadPoolExecutor).
+    
+    Raises:
+        concurrent.futures.TimeoutError: func nicht rechtzeitig fertig
+    """
+    future = Future()
+    
+    def worker():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=worker, name=getattr(func, '__name__', 'worker'), daemon=True).start()
+    return future.result(timeout=timeout)
+
+class _LogLineWriter(io.TextIOBase):
+    """Stream für redirect_stdout - gibt jede vollständige Zeile als Log-Eintrag aus"""
+    
+    def __init__(self):
+        super().__init__()
+        self._partial = ''
+    
+    def writable(self):
+        return True
+    
+    def write(self, text):
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                logger.info("  %s", line)
+        return len(text)
+    
+    def close(self):
+        if self._partial.strip():
+            logger.info("  %s", self._partial)
+        self._partial = ''
+        super().close()
+
+# Geparste Heizkreis-Konfiguration je Pfad: {Pfad: (mtime_ns, Konfiguration)}
+_config_cache = {}
+
+def load_heating_config(config_file):
+    """
+    Lädt die Heizkreis-Konfiguration - erneut geparst wird nur nach einer Änderung der Datei
+    
+    Returns:
+        Konfiguration als Dictionary (leer bei leerer Datei)
+    """
+    mtime = os.stat(config_file).st_mtime_ns
+    cached = _config_cache.get(config_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    with open(config_file, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    _config_cache[config_file] = (mtime, config)
+    return config
+
+def _circuit_reading(readings, sensor_id, icon, label):
+    """
+    Meldet den Messwert eines Heizkreis-Sensors aus read_ds18b20_bulk()
+    
+    Returns:
+        Temperatur in °C oder None (nicht konfiguriert oder nicht lesbar)
+    """
+    if not sensor_id:
+        return None
+    
+    reading = readings[sensor_id]
+    if isinstance(reading, ValueError):
+        return None  # CRC-/Formatfehler - wird als unvollständig gemeldet
+    if isinstance(reading, Exception):
+        logger.error(f"  ❌ {label}-Sensor: {reading}")
+        return None
+    
+    logger.info("  %s %s: %.1f°C", icon, label, reading)
+    return reading
+
 def test_heating_circuits():
     """Testet die konfigurierten Heizungskreise"""
     logger.info("🏠 Teste Heizungskreise...")
@@ -237,9 +625,7 @@ def test_heating_circuits():
             logger.warning("⚠️ Keine Heizkreis-Konfiguration gefunden")
             return test_1wire_interface()  # Fallback auf 1-Wire Test
         
-        import yaml
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_heating_config(config_file)
         
         circuits = config.get('heating_circuits', {})
         if not circuits:
@@ -248,41 +634,25 @@ def test_heating_circuits():
         
         logger.info(f"📋 Teste {len(circuits)} Heizungskreise...")
         
+        # Alle Vor-/Rücklauf-Sensoren vorab mit einer gemeinsamen Wandlung lesen
+        sensor_ids = [sensor_id
+                      for circuit_config in circuits.values()
+                      for sensor_id in (circuit_config.get('vorlauf_sensor'), circuit_config.get('ruecklauf_sensor'))
+                      if sensor_id]
+        readings = read_ds18b20_bulk(sensor_ids)
+        
         working_circuits = 0
         for circuit_name, circuit_config in circuits.items():
             logger.info(f"\n🔍 Teste Heizkreis: {circuit_name}")
             
-            # Vorlauf-Sensor testen
-            vorlauf_id = circuit_config.get('vorlauf_sensor')
-            ruecklauf_id = circuit_config.get('ruecklauf_sensor')
-            
-            vorlauf_temp = None
-            ruecklauf_temp = None
-            
-            if vorlauf_id:
-                try:
-                    with open(f"/sys/bus/w1/devices/{vorlauf_id}/w1_slave", 'r') as f:
-                        data = f.read()
-                        if "YES" in data and "t=" in data:
-                            vorlauf_temp = int(data.split("t=")[1]) / 1000.0
-                            logger.info(f"  🔥 Vorlauf: {vorlauf_temp:.1f}°C")
-                except Exception as e:
-                    logger.error(f"  ❌ Vorlauf-Sensor: {e}")
-            
-            if ruecklauf_id:
-                try:
-                    with open(f"/sys/bus/w1/devices/{ruecklauf_id}/w1_slave", 'r') as f:
-                        data = f.read()
-                        if "YES" in data and "t=" in data:
-                            ruecklauf_temp = int(data.split("t=")[1]) / 1000.0
-                            logger.info(f"  🔄 Rücklauf: {ruecklauf_temp:.1f}°C")
-                except Exception as e:
-                    logger.error(f"  ❌ Rücklauf-Sensor: {e}")
+            # Vor- und Rücklauf-Sensor testen
+            vorlauf_temp = _circuit_reading(readings, circuit_config.get('vorlauf_sensor'), "🔥", "Vorlauf")
+            ruecklauf_temp = _circuit_reading(readings, circuit_config.get('ruecklauf_sensor'), "🔄", "Rücklauf")
             
             # Temperaturdifferenz berechnen
-            if vorlauf_temp and ruecklauf_temp:
+            if vorlauf_temp is not None and ruecklauf_temp is not None:
                 diff = vorlauf_temp - ruecklauf_temp
-                logger.info(f"  📊 Temperaturdifferenz: {diff:.1f}°C")
+                logger.info("  📊 Temperaturdifferenz: %.1f°C", diff)
                 
                 if diff > 0:
                     logger.info(f"  ✅ Heizkreis {circuit_name} funktional")
@@ -299,51 +669,92 @@ def test_heating_circuits():
         logger.error(f"❌ Heizkreis-Test fehlgeschlagen: {e}")
         return False
 
+_bucket_cache = TTLCache(maxsize=8, ttl=BUCKET_CACHE_TTL)
+
+def check_influx_server(session, influxdb_url, influxdb_token, influxdb_org, influxdb_bucket,
+                        test_bucket=None):
+    """
+    Health-Check, Authentifizierung, Buckets und Batch-Schreibtest über eine Session
+    
+    Der Batch-Schreibtest läuft nur mit eigenem test_bucket (INFLUXDB_TEST_BUCKET) -
+    der Heizungs-Bucket bekommt keine synthetischen Punkte.
+    
+    Returns:
+        True wenn alle Prüfungen erfolgreich waren
+    """
+    # Health-Check
+    response = session.get(f"{influxdb_url}/health", timeout=10)
+    if response.status_code == 200:
+        logger.info("✅ InfluxDB Server erreichbar")
+    else:
+        logger.error(f"❌ InfluxDB Health-Check fehlgeschlagen: {response.status_code}")
+        return False
+    
+    # Ping-Test mit Token
+    headers = {'Authorization': f'Token {influxdb_token}'}
+    response = session.get(f"{influxdb_url}/ping", headers=headers, timeout=10)
+    if response.status_code == 204:
+        logger.info("✅ InfluxDB Authentifizierung erfolgreich")
+    else:
+        logger.error(f"❌ InfluxDB Authentifizierung fehlgeschlagen: {response.status_code}")
+        return False
+    
+    # Bucket-Test (Ergebnis für BUCKET_CACHE_TTL zwischengespeichert)
+    cache_key = (influxdb_url, influxdb_token)
+    bucket_names = _bucket_cache.get(cache_key)
+    if bucket_names is None:
+        response = session.get(f"{influxdb_url}/api/v2/buckets", headers=headers, timeout=10)
+        if response.status_code != 200:
+            logger.error(f"❌ Bucket-Abfrage fehlgeschlagen: {response.status_code}")
+            return False
+        bucket_names = [b['name'] for b in response.json().get('buckets', [])]
+        _bucket_cache.set(cache_key, bucket_names)
+    
+    logger.info(f"✅ Verfügbare Buckets: {bucket_names}")
+    if influxdb_bucket in bucket_names:
+        logger.info(f"✅ Ziel-Bucket '{influxdb_bucket}' gefunden")
+    else:
+        logger.warning(f"⚠️ Ziel-Bucket '{influxdb_bucket}' nicht gefunden")
+    
+    # Batching des Monitoring-Clients und Batch-Durchsatz prüfen
+    if check_influx_batching() is False:
+        return False
+    
+    if not test_bucket:
+        logger.info("ℹ️ Batch-Schreibtest übersprungen (INFLUXDB_TEST_BUCKET nicht gesetzt)")
+        return True
+    
+    if test_bucket == influxdb_bucket:
+        logger.error(f"❌ INFLUXDB_TEST_BUCKET darf nicht der Heizungs-Bucket '{influxdb_bucket}' sein")
+        return False
+    
+    if test_bucket not in bucket_names:
+        logger.error(f"❌ Test-Bucket '{test_bucket}' nicht gefunden")
+        return False
+    
+    return run_influx_batch_write(session, influxdb_url, headers, influxdb_org, test_bucket)
+
 def test_influxdb_connection():
     """Testet die InfluxDB-Verbindung"""
     logger.info("📊 Teste InfluxDB-Verbindung...")
     
+    if not REQUESTS_AVAILABLE:
+        logger.error("❌ InfluxDB-Test fehlgeschlagen: requests nicht installiert")
+        return False
+    
     try:
-        import os
-        import requests
-        
         # InfluxDB-Parameter aus Umgebungsvariablen
         influxdb_url = os.getenv('INFLUXDB_URL', 'http://localhost:8086')
         influxdb_token = os.getenv('INFLUXDB_TOKEN', 'heizung-monitoring-token-2024')
         influxdb_org = os.getenv('INFLUXDB_ORG', 'heizung-monitoring')
         influxdb_bucket = os.getenv('INFLUXDB_BUCKET', 'heizung-daten')
+        influxdb_test_bucket = os.getenv('INFLUXDB_TEST_BUCKET')
         
-        # Health-Check
-        response = requests.get(f"{influxdb_url}/health", timeout=10)
-        if response.status_code == 200:
-            logger.info("✅ InfluxDB Server erreichbar")
-        else:
-            logger.error(f"❌ InfluxDB Health-Check fehlgeschlagen: {response.status_code}")
-            return False
-        
-        # Ping-Test mit Token
-        headers = {'Authorization': f'Token {influxdb_token}'}
-        response = requests.get(f"{influxdb_url}/ping", headers=headers, timeout=10)
-        if response.status_code == 204:
-            logger.info("✅ InfluxDB Authentifizierung erfolgreich")
-        else:
-            logger.error(f"❌ InfluxDB Authentifizierung fehlgeschlagen: {response.status_code}")
-            return False
-        
-        # Bucket-Test
-        response = requests.get(f"{influxdb_url}/api/v2/buckets", headers=headers, timeout=10)
-        if response.status_code == 200:
-            buckets = response.json().get('buckets', [])
-            bucket_names = [b['name'] for b in buckets]
-            logger.info(f"✅ Verfügbare Buckets: {bucket_names}")
-            
-            if influxdb_bucket in bucket_names:
-                logger.info(f"✅ Ziel-Bucket '{influxdb_bucket}' gefunden")
-            else:
-                logger.warning(f"⚠️ Ziel-Bucket '{influxdb_bucket}' nicht gefunden")
-        else:
-            logger.error(f"❌ Bucket-Abfrage fehlgeschlagen: {response.status_code}")
-            return False
+        # Eine Session für alle Anfragen - die TCP-Verbindung wird wiederverwendet
+        with requests.Session() as session:
+            if not check_influx_server(session, influxdb_url, influxdb_token, influxdb_org,
+                                       influxdb_bucket, influxdb_test_bucket):
+                return False
         
         logger.info("✅ InfluxDB-Verbindung erfolgreich")
         return True
@@ -352,39 +763,112 @@ def test_influxdb_connection():
         logger.error(f"❌ InfluxDB-Test fehlgeschlagen: {e}")
         return False
 
+class _GroupLogBuffer(logging.Handler):
+    """Sammelt Log-Einträge pro Testgruppe, damit parallele Tests nicht durcheinander ausgeben"""
+    
+    def __init__(self):
+        super().__init__()
+        self.records = {}
+        self._local = threading.local()
+    
+    def set_group(self, group):
+        """Ordnet alle weiteren Einträge des aktuellen Threads der Gruppe zu"""
+        self._local.group = group
+    
+    def emit(self, record):
+        self.records.setdefault(getattr(self._local, 'group', None), []).append(record)
+
+def _run_buffered(buffer, group, test_funcs):
+    """
+    Führt die Tests einer Gruppe nacheinander aus (Logs landen im Puffer)
+    
+    Ist eine Voraussetzung fehlgeschlagen, wird der Test nicht ausgeführt und als
+    übersprungen (None) eingetragen.
+    """
+    buffer.set_group(group)
+    results = {}
+    for name, test_func, depends_on in test_funcs:
+        failed = [dep for dep in depends_on if not results.get(dep)]
+        if failed:
+            logger.info("\n" + _SEP)
+            logger.warning(f"⏭️ Test '{name}' übersprungen - Voraussetzung fehlgeschlagen: {', '.join(failed)}")
+            results[name] = None
+            continue
+        
+        try:
+            logger.info("\n" + _SEP)
+            results[name] = test_func()
+        except Exception as e:
+            logger.error(f"❌ Test '{name}' abgebrochen: {e}")
+            results[name] = False
+    return results
+
 def run_all_tests():
-    """Führt alle Sensor-Tests durch"""
-    tests = [
-        ("1-Wire Sensoren", test_1wire_interface),
-        ("DHT22 Raumsensor", test_dht22_detailed),
-        ("Heizungskreise", test_heating_circuits),
-        ("InfluxDB Verbindung", test_influxdb_connection)
+    """
+    Führt alle Sensor-Tests durch
+    
+    Die Gruppen nutzen getrennte Ressourcen (1-Wire Bus, DHT22-GPIO, Netzwerk) und laufen
+    parallel - die Gesamtdauer entspricht der langsamsten Gruppe. Beide 1-Wire Tests
+    teilen sich den Bus und bleiben deshalb in einer Gruppe nacheinander; die
+    Heizungskreise werden nur geprüft, wenn der 1-Wire Bus funktioniert.
+    """
+    groups = [
+        [("1-Wire Sensoren", test_1wire_interface, []),
+         ("Heizungskreise", test_heating_circuits, ["1-Wire Sensoren"])],
+        [("DHT22 Raumsensor", test_dht22_detailed, [])],
+        [("InfluxDB Verbindung", test_influxdb_connection, [])],
     ]
     
+    # Ausgabe während der parallelen Tests puffern und danach gruppenweise ausgeben
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    buffer = _GroupLogBuffer()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(buffer)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = [executor.submit(_run_buffered, buffer, index, group)
+                       for index, group in enumerate(groups)]
+            outcomes = [future.result() for future in futures]
+    finally:
+        root.removeHandler(buffer)
+        for handler in handlers:
+            root.addHandler(handler)
+    
     results = {}
+    for group_results in outcomes:
+        results.update(group_results)
     
-    for test_name, test_func in tests:
-        try:
-            logger.info("\n" + "=" * 50)
-            results[test_name] = test_func()
-            time.sleep(2)  # Pause zwischen Tests
-        except Exception as e:
-            logger.error(f"❌ Test '{test_name}' abgebrochen: {e}")
-            results[test_name] = False
+    # Gruppen in fester Reihenfolge, danach Einträge von Threads ohne Gruppe
+    # (Worker innerhalb eines Tests, Bibliotheks-Threads)
+    for key in [*range(len(groups)), None]:
+        for record in buffer.records.get(key, []):
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+    
+    # Reihenfolge der Zusammenfassung wie bisher
+    order = ["1-Wire Sensoren", "DHT22 Raumsensor", "Heizungskreise", "InfluxDB Verbindung"]
+    results = {name: results[name] for name in order}
     
     # Ergebnisse zusammenfassen
-    logger.info("\n" + "=" * 50)
+    logger.info("\n" + _SEP)
     logger.info("📋 TEST-ZUSAMMENFASSUNG:")
-    logger.info("=" * 50)
+    logger.info(_SEP)
     
     all_passed = True
     for test_name, result in results.items():
-        status = "✅ BESTANDEN" if result else "❌ FEHLGESCHLAGEN"
-        logger.info(f"{test_name:20} : {status}")
+        if result is None:
+            status = "⏭️ ÜBERSPRUNGEN"
+        else:
+            status = "✅ BESTANDEN" if result else "❌ FEHLGESCHLAGEN"
+        logger.info("%-20s : %s", test_name, status)
         if not result:
             all_passed = False
     
-    logger.info("=" * 50)
+    logger.info(_SEP)
     
     if all_passed:
         logger.info("🎉 ALLE TESTS BESTANDEN - System bereit!")
@@ -393,43 +877,62 @@ def run_all_tests():
         logger.error("⚠️ EINIGE TESTS FEHLGESCHLAGEN - Prüfe Konfiguration!")
         return False
 
+# Kommandozeilen-Schalter und Hilfetexte
+CLI_FLAGS = {
+    '--dht22': 'Führe nur DHT22-Test durch',
+    '--1wire': 'Führe nur 1-Wire-Test durch',
+    '--heating': 'Führe nur Heizungskreis-Test durch',
+    '--influxdb': 'Führe nur InfluxDB-Test durch',
+    '--all': 'Führe alle Tests durch (Standard)',
+}
+
+def parse_flags(argv):
+    """
+    Wertet die Kommandozeilen-Schalter aus
+    
+    Für fünf boolesche Schalter reicht ein Set - argparse wird nur für --help geladen.
+    
+    Returns:
+        Set der gesetzten Schalter
+    """
+    flags = set(argv)
+    if flags & {'-h', '--help'}:
+        import argparse
+        parser = argparse.ArgumentParser(description='Test-Skript für Heizungsüberwachung Sensoren')
+        for flag, help_text in CLI_FLAGS.items():
+            parser.add_argument(flag, action='store_true', help=help_text)
+        parser.parse_args(argv)  # Gibt die Hilfe aus und beendet das Skript
+    
+    unknown = flags - CLI_FLAGS.keys()
+    if unknown:
+        print(f"Unbekannte Argumente: {' '.join(sorted(unknown))} (verfügbar: {' '.join(CLI_FLAGS)})",
+              file=sys.stderr)
+        sys.exit(2)
+    
+    return flags
+
 def main():
     """Hauptfunktion"""
-    parser = argparse.ArgumentParser(description='Test-Skript für Heizungsüberwachung Sensoren')
-    parser.add_argument('--dht22', action='store_true', 
-                       help='Führe nur DHT22-Test durch')
-    parser.add_argument('--1wire', action='store_true', 
-                       help='Führe nur 1-Wire-Test durch')
-    parser.add_argument('--heating', action='store_true', 
-                       help='Führe nur Heizungskreis-Test durch')
-    parser.add_argument('--influxdb', action='store_true', 
-                       help='Führe nur InfluxDB-Test durch')
-    parser.add_argument('--all', action='store_true', 
-                       help='Führe alle Tests durch (Standard)')
-    
-    args = parser.parse_args()
+    flags = parse_flags(sys.argv[1:])
     
     try:
         # .env-Datei laden falls vorhanden
-        try:
-            from dotenv import load_dotenv
+        if load_dotenv is not None:
             load_dotenv()
-        except ImportError:
-            pass  # dotenv ist optional
         
         success = True
         
         # Spezifische Tests ausführen
-        if args.dht22:
+        if '--dht22' in flags:
             logger.info("🌡️ Führe nur DHT22-Test durch...")
             success = run_dht22_only_test()
-        elif getattr(args, '1wire', False):  # Workaround für 1wire Argument
+        elif '--1wire' in flags:
             logger.info("🔍 Führe nur 1-Wire-Test durch...")
             success = test_1wire_interface()
-        elif args.heating:
+        elif '--heating' in flags:
             logger.info("🏠 Führe nur Heizungskreis-Test durch...")
             success = test_heating_circuits()
-        elif args.influxdb:
+        elif '--influxdb' in flags:
             logger.info("📊 Führe nur InfluxDB-Test durch...")
             success = test_influxdb_connection()
         else:
@@ -4,12 +4,32 @@ Web-Dashboard für die Heizungsüberwachung
 Bietet eine einfache Weboberfläche zur System-Überwachung
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 import sys
+import time
+import logging
+import threading
 from pathlib import Path
 import json
 from datetime import datetime
 
+# orjson ist optional - serialisiert API-Antworten (inkl. Dataclasses) in C
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# flask-compress ist optional - gzip für API-Antworten und das Dashboard
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    Compress = None
+    COMPRESS_AVAILABLE = False
+
 # Projekt-Root zum Python-Pfad hinzufügen
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -17,23 +37,97 @@ sys.path.insert(0, str(project_root))
 from src.sensors.heating_sensors import HeatingSystemManager
 from src.sensors.dht22_sensor import HeatingRoomSensor
 
+logger = logging.getLogger(__name__)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON-Provider für Flask auf Basis von orjson"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+if COMPRESS_AVAILABLE:
+    Compress(app)
 
 # Globale Instanzen
 heating_manager = None
 room_sensor = None
 
+# Sensoren werden im Hintergrund gelesen - Requests liefern nur den letzten Stand
+REFRESH_INTERVAL = 5.0
+_snapshot = {'system': None, 'room': None, 'temperatures': None, 'ts': None}
+_snapshot_lock = threading.Lock()
+_refresh_thread = None
+
+def refresh_snapshot():
+    """Liest alle Sensoren einmal und ersetzt den Stand für die API"""
+    temperatures = heating_manager.get_all_temperatures()
+    system_status = heating_manager.get_system_status(temperatures)
+    room_conditions = room_sensor.check_heating_room_conditions()
+    
+    with _snapshot_lock:
+        _snapshot.update(system=system_status, room=room_conditions,
+                         temperatures=temperatures, ts=time.time())
+
+def _refresh_loop():
+    """Aktualisiert den Stand alle REFRESH_INTERVAL Sekunden"""
+    while True:
+        started = time.monotonic()
+        try:
+            refresh_snapshot()
+        except Exception as e:
+            logger.warning(f"⚠️ Sensor-Aktualisierung fehlgeschlagen: {e}")
+        time.sleep(max(0.0, REFRESH_INTERVAL - (time.monotonic() - started)))
+
+def get_snapshot():
+    """Letzter Sensor-Stand (Kopie) - None, solange noch keine Messung vorliegt"""
+    with _snapshot_lock:
+        if _snapshot['ts'] is None:
+            return None
+        return dict(_snapshot)
+
+def snapshot_response(snapshot, payload):
+    """
+    JSON-Antwort mit ETag des Snapshots
+    
+    Solange der Hintergrund-Thread keinen neuen Stand geschrieben hat, beantworten
+    wiederholte Abfragen mit passendem If-None-Match ein 304 ohne Body.
+    """
+    response = jsonify(payload)
+    response.set_etag(f"{snapshot['ts']:.3f}", weak=True)
+    response.cache_control.no_cache = True  # Browser soll immer per ETag nachfragen
+    return response.make_conditional(request)
+
 def initialize_sensors():
     """Initialisiert die Sensoren"""
-    global heating_manager, room_sensor
+    global heating_manager, room_sensor, _refresh_thread
     
     try:
         heating_manager = HeatingSystemManager()
         room_sensor = HeatingRoomSensor()
-        return True
+        # Requests sollen nicht auf die 2-3 s einer DHT22-Messung warten
+        room_sensor.start_background()
     except Exception as e:
-        print(f"Fehler bei Sensor-Initialisierung: {e}")
+        logger.error(f"Fehler bei Sensor-Initialisierung: {e}")
         return False
+    
+    # Erste Messung vor dem Start, damit der erste Request bereits Daten bekommt
+    try:
+        refresh_snapshot()
+    except Exception as e:
+        logger.warning(f"⚠️ Erste Sensor-Messung fehlgeschlagen: {e}")
+    
+    if _refresh_thread is None:
+        _refresh_thread = threading.Thread(target=_refresh_loop, name='dashboard-refresh', daemon=True)
+        _refresh_thread.start()
+    return True
 
 @app.route('/')
 def dashboard():
@@ -47,16 +141,15 @@ def api_status():
         if not heating_manager:
             return jsonify({'error': 'Sensoren nicht initialisiert'}), 500
         
-        # System-Status
-        system_status = heating_manager.get_system_status()
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return jsonify({'error': 'Noch keine Sensordaten verfügbar'}), 503
         
-        # Raumdaten
-        room_conditions = room_sensor.check_heating_room_conditions()
-        
-        return jsonify({
+        return snapshot_response(snapshot, {
             'timestamp': datetime.utcnow().isoformat(),
-            'system': system_status,
-            'room': room_conditions,
+            'age_seconds': round(time.time() - snapshot['ts'], 1),
+            'system': snapshot['system'],
+            'room': snapshot['room'],
             'status': 'ok'
         })
         
@@ -70,20 +163,31 @@ def api_temperatures():
         if not heating_manager:
             return jsonify({'error': 'Sensoren nicht initialisiert'}), 500
         
-        temperatures = heating_manager.get_all_temperatures()
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return jsonify({'error': 'Noch keine Sensordaten verfügbar'}), 503
         
-        return jsonify({
+        return snapshot_response(snapshot, {
             'timestamp': datetime.utcnow().isoformat(),
-            'temperatures': temperatures
+            'age_seconds': round(time.time() - snapshot['ts'], 1),
+            'temperatures': snapshot['temperatures']
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # Keine Zugriffszeile pro Request - das Dashboard fragt die API laufend ab
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    
     if initialize_sensors():
-        print("🌐 Starte Web-Dashboard auf http://localhost:5000")
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        logger.info("🌐 Starte Web-Dashboard auf http://localhost:5000")
+        # Ein Thread pro Request - die Handler lesen nur den Snapshot und blockieren nicht
+        app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
     else:
-        print("❌ Sensor-Initialisierung fehlgeschlagen")
+        logger.error("❌ Sensor-Initialisierung fehlgeschlagen")
         sys.exit(1)